@@ -0,0 +1,145 @@
+"""Bulk-load a JSONL file of Q&A pairs into a Chroma collection.
+
+Each line is a JSON object with ``question`` and ``answer`` and optionally
+``usecase`` and ``metadata``. Progress is checkpointed (byte offset) after
+every committed batch, so an interrupted run resumes where it stopped:
+
+    python -m app.cli.bulk_import seed.jsonl --usecase "Basic Chatbot"
+
+Imported pairs are served to every model unless ``--model`` tags them, and
+expire after the usecase's cache TTL unless ``--ttl-seconds`` overrides it
+(0 never expires).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from ..common.logger import logger
+from ..database import cache_policy
+from ..repositories.chroma_repository import ChromaRepository
+
+
+def _read_checkpoint(path: str) -> Dict[str, int]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"offset": 0, "imported": 0, "skipped": 0}
+
+
+def _write_checkpoint(path: str, state: Dict[str, int]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _expiry(ttl_seconds: Optional[int]) -> Dict[str, Any]:
+    if ttl_seconds is None:
+        return {}
+    created_at = cache_policy.now()
+    return {"created_at": created_at, "expires_at": created_at + ttl_seconds if ttl_seconds > 0 else cache_policy.NEVER}
+
+
+def _parse(line: str, default_usecase: str, model: str = cache_policy.ANY_MODEL, ttl_seconds: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(record, dict) or not record.get("question") or record.get("answer") is None:
+        return None
+    return {
+        "question": str(record["question"]),
+        "answer": str(record["answer"]),
+        "usecase": record.get("usecase") or default_usecase,
+        "metadata": {"method": "bulk_import", "model": model, **_expiry(ttl_seconds), **(record.get("metadata") or {})},
+    }
+
+
+def bulk_import(path: str, repo: ChromaRepository, usecase: str = "Basic Chatbot", batch_size: int = 500,
+                checkpoint_path: Optional[str] = None, resume: bool = True, progress_every: float = 2.0,
+                model: str = cache_policy.ANY_MODEL, ttl_seconds: Optional[int] = None) -> Dict[str, Any]:
+    checkpoint_path = checkpoint_path or f"{path}.progress"
+    state = _read_checkpoint(checkpoint_path) if resume else {"offset": 0, "imported": 0, "skipped": 0}
+    if state["offset"]:
+        logger.info(f"Resuming {path} at byte {state['offset']} ({state['imported']} already imported)")
+
+    started = time.perf_counter()
+    last_report = started
+    imported_this_run = 0
+    batch: List[Dict[str, Any]] = []
+
+    def commit(offset: int) -> None:
+        nonlocal imported_this_run
+        if batch:
+            written = repo.upsert_many(batch, batch_size=batch_size)
+            if written < len(batch):
+                raise RuntimeError(f"Upsert failed near byte {offset}; rerun to resume from the last checkpoint")
+            imported_this_run += written
+            state["imported"] += written
+            batch.clear()
+        state["offset"] = offset
+        _write_checkpoint(checkpoint_path, state)
+
+    with open(path, "rb") as f:
+        f.seek(state["offset"])
+        while True:
+            raw = f.readline()
+            if not raw:
+                break
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            record = _parse(line, usecase, model, ttl_seconds)
+            if record is None:
+                state["skipped"] += 1
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                commit(f.tell())
+                now = time.perf_counter()
+                if now - last_report >= progress_every:
+                    rate = imported_this_run / (now - started)
+                    print(f"imported {state['imported']} pairs ({rate:.0f}/s), skipped {state['skipped']}", file=sys.stderr)
+                    last_report = now
+        commit(f.tell())
+
+    elapsed = time.perf_counter() - started
+    result = {
+        **state,
+        "imported_this_run": imported_this_run,
+        "seconds": round(elapsed, 2),
+        "pairs_per_second": round(imported_this_run / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info(f"Bulk import finished: {result}")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Bulk-load Q&A pairs from JSONL into ChromaDB")
+    parser.add_argument("path", help="JSONL file with question/answer[/usecase/metadata] objects")
+    parser.add_argument("--collection", default=os.getenv("CHROMA_COLLECTION_NAME", "qa_collection"))
+    parser.add_argument("--usecase", default="Basic Chatbot", help="usecase for lines that don't set one")
+    parser.add_argument("--embedding-model", default="nomic-embed-text")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("CHROMA_UPSERT_BATCH_SIZE", "500")))
+    parser.add_argument("--checkpoint", help="progress file (default: <path>.progress)")
+    parser.add_argument("--restart", action="store_true", help="ignore any existing checkpoint")
+    parser.add_argument("--model", default=cache_policy.ANY_MODEL, help="only serve the pairs to this model (default: any model)")
+    parser.add_argument("--ttl-seconds", type=int, help="expire the pairs after this long, 0 never (default: the usecase's CACHE_TTL)")
+    args = parser.parse_args(argv)
+
+    repo = ChromaRepository(collection_name=args.collection, embedding_model=args.embedding_model)
+    result = bulk_import(args.path, repo, usecase=args.usecase, batch_size=args.batch_size,
+                         checkpoint_path=args.checkpoint, resume=not args.restart, model=args.model, ttl_seconds=args.ttl_seconds)
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Measure cold-start time and memory of the API process.
+
+Each run is a fresh interpreter that imports ``app.main`` and then, with
+``--prewarm``, runs the startup pre-warm. Runs are repeated with lazy imports
+on and off so the two can be compared:
+
+    python -m app.cli.startup_benchmark --runs 3 --prewarm
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+_CHILD = r"""
+import asyncio, json, resource, sys, time
+t0 = time.perf_counter()
+import app.main
+imported = time.perf_counter() - t0
+heavy = ["chromadb", "langchain_tavily", "langchain_groq", "numpy", "onnxruntime"]
+result = {"import_seconds": imported, "loaded_at_import": [m for m in heavy if m in sys.modules]}
+result["rss_after_import_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+if PREWARM:
+    from app.services.prewarm import prewarmer
+    t1 = time.perf_counter()
+    stats = asyncio.run(prewarmer.run())
+    result["prewarm_seconds"] = time.perf_counter() - t1
+    result["prewarm_failed"] = [name for name, step in stats["steps"].items() if not step["ok"]]
+result["cold_start_seconds"] = time.perf_counter() - t0
+result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print("STARTUP_RESULT " + json.dumps(result))
+"""
+
+
+def run_once(lazy: bool, prewarm: bool) -> Dict[str, Any]:
+    env = {**os.environ, "LAZY_IMPORTS": "true" if lazy else "false", "LOG_LEVEL": "WARNING", "PYTHONWARNINGS": "ignore"}
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD.replace("PREWARM", repr(prewarm))],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    line = next(l for l in proc.stdout.splitlines() if l.startswith("STARTUP_RESULT "))
+    return json.loads(line[len("STARTUP_RESULT "):])
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {}
+    for key in ("import_seconds", "prewarm_seconds", "cold_start_seconds", "rss_after_import_mb", "max_rss_mb"):
+        values = [r[key] for r in results if key in r]
+        if values:
+            summary[key] = round(statistics.median(values), 3)
+    summary["loaded_at_import"] = results[-1]["loaded_at_import"]
+    if "prewarm_failed" in results[-1]:
+        summary["prewarm_failed"] = results[-1]["prewarm_failed"]
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark API cold start (import time, pre-warm time, RSS)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per mode; medians are reported")
+    parser.add_argument("--prewarm", action="store_true", help="also run the startup pre-warm in each process")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for lazy in (True, False):
+        mode = "lazy imports" if lazy else "eager imports"
+        report[mode] = summarize([run_once(lazy, args.prewarm) for _ in range(args.runs)])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for mode, summary in report.items():
+        print(f"{mode}:")
+        for key, value in summary.items():
+            print(f"  {key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
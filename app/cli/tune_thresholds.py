@@ -0,0 +1,203 @@
+"""Recommend per-usecase semantic-cache thresholds from recorded traffic.
+
+Reads the lookup/feedback log written by ``ThresholdRecorder``. By default it
+re-runs every recorded query against the current collection, then computes
+hit rate vs. false-hit rate curves per usecase. A false hit is a served
+candidate that the user marked unhelpful. For each usecase it walks the
+threshold down while the false-hit rate stays under the target. It only
+settles on a threshold that has labelled hits just above it. Labels below
+the current threshold exist only when THRESHOLD_EXPLORE_RATE serves some
+near misses. The result is written to the file the chatbot node loads at
+startup:
+
+    python -m app.cli.tune_thresholds --max-false-hit-rate 0.05
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from ..repositories.answer_cache import normalize_question
+from ..repositories.cache_thresholds import DEFAULT_THRESHOLD
+
+SearchMany = Callable[[List[str], str, int], List[List[Dict[str, Any]]]]
+
+
+def load_log(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, bool]]:
+    """Return the recorded lookups and the latest feedback per lookup id, including the rotated <path>.1."""
+    lookups: List[Dict[str, Any]] = []
+    feedback: Dict[str, bool] = {}
+    for part in (f"{path}.1", path):
+        if not os.path.exists(part):
+            continue
+        with open(part) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a torn last line from a crash
+                if entry.get("t") == "l":
+                    lookups.append(entry)
+                elif entry.get("t") == "f":
+                    feedback[entry["id"]] = bool(entry["ok"])
+    return lookups, feedback
+
+
+def label(lookups: List[Dict[str, Any]], feedback: Dict[str, bool]) -> List[Dict[str, Any]]:
+    """Attach feedback to served lookups: it judges the cached candidate only when that is what the user saw."""
+    return [{**l, "label": feedback.get(l["id"]) if l.get("hit") else None} for l in lookups]
+
+
+def replay(lookups: List[Dict[str, Any]], search_many: SearchMany, limit: int = 3) -> List[Dict[str, Any]]:
+    """Re-score recorded queries against the collection as it is now.
+
+    A query that missed was stored afterwards, so its own entry is skipped as a
+    candidate. A label is kept only while the best candidate is still the one
+    it judged.
+    """
+    by_usecase: Dict[str, List[int]] = defaultdict(list)
+    for i, lookup in enumerate(lookups):
+        by_usecase[lookup["u"]].append(i)
+    replayed = list(lookups)
+    for usecase, indexes in by_usecase.items():
+        results = search_many([lookups[i]["q"] for i in indexes], usecase, limit + 1)
+        for i, hits in zip(indexes, results):
+            lookup = lookups[i]
+            own = normalize_question(lookup["q"])
+            recorded_self = lookup.get("c") is not None and normalize_question(lookup["c"]) == own
+            candidates = [h for h in hits if recorded_self or normalize_question(h["question"]) != own][:limit]
+            candidate = candidates[0]["question"] if candidates else None
+            replayed[i] = {
+                **lookup,
+                "s": [round(float(h["score"]), 4) for h in candidates],
+                "c": candidate,
+                "label": lookup.get("label") if candidate == lookup.get("c") else None,
+            }
+    return replayed
+
+
+def curve(lookups: List[Dict[str, Any]], thresholds: List[float], band: float = 0.05) -> List[Dict[str, Any]]:
+    """Hit rate and false-hit rate at each threshold (a lookup hits when its best score is above it).
+
+    The band_* fields cover labelled hits scoring within band above the
+    threshold, i.e. the matches that threshold admits last; a cumulative rate
+    alone would let a threshold creep into a bad band hidden by good ones.
+    """
+    points = []
+    total = len(lookups)
+    for threshold in thresholds:
+        hits = [l for l in lookups if l["s"] and l["s"][0] > threshold]
+        labelled = [l for l in hits if l.get("label") is not None]
+        false_hits = sum(1 for l in labelled if l["label"] is False)
+        in_band = [l for l in labelled if l["s"][0] <= threshold + band]
+        points.append({
+            "threshold": round(threshold, 4),
+            "hit_rate": round(len(hits) / total, 4) if total else 0.0,
+            "hits": len(hits),
+            "labelled_hits": len(labelled),
+            "false_hit_rate": round(false_hits / len(labelled), 4) if labelled else None,
+            "band_labelled": len(in_band),
+            "band_false_hit_rate": round(sum(1 for l in in_band if l["label"] is False) / len(in_band), 4) if in_band else None,
+        })
+    return points
+
+
+def recommend(points: List[Dict[str, Any]], max_false_hit_rate: float, min_labels: int, fallback: float, min_band_labels: int = 5) -> Dict[str, Any]:
+    """Lowest threshold (most cache hits) reached before the overall or marginal false-hit rate exceeds budget, else fallback."""
+    best = None
+    for point in sorted(points, key=lambda p: p["threshold"], reverse=True):
+        if point["labelled_hits"] < min_labels or point["false_hit_rate"] is None:
+            continue
+        if point["false_hit_rate"] > max_false_hit_rate:
+            break
+        if point["band_labelled"] >= min_band_labels:
+            if point["band_false_hit_rate"] > max_false_hit_rate:
+                break
+            best = point
+    if best is not None:
+        return {**best, "reason": f"false-hit rate {best['false_hit_rate']:.3f} <= {max_false_hit_rate} over {best['labelled_hits']} labelled hits"}
+    point = min(points, key=lambda p: abs(p["threshold"] - fallback)) if points else {"hit_rate": 0.0, "false_hit_rate": None, "labelled_hits": 0, "band_labelled": 0, "band_false_hit_rate": None}
+    return {**point, "threshold": fallback, "reason": f"not enough labelled hits within the false-hit budget, keeping {fallback}"}
+
+
+def tune(lookups: List[Dict[str, Any]], max_false_hit_rate: float = 0.05, min_labels: int = 20, fallback: float = DEFAULT_THRESHOLD,
+         step: float = 0.01, low: float = 0.5) -> Dict[str, Any]:
+    thresholds = [low + i * step for i in range(int(round((1.0 - low) / step)))]
+    by_usecase: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for lookup in lookups:
+        by_usecase[lookup["u"]].append(lookup)
+    usecases = {}
+    for usecase, usecase_lookups in sorted(by_usecase.items()):
+        points = curve(usecase_lookups, thresholds)
+        best = recommend(points, max_false_hit_rate, min_labels, fallback)
+        current = curve(usecase_lookups, [fallback])[0]
+        usecases[usecase] = {
+            "threshold": round(best["threshold"], 4),
+            "hit_rate": best["hit_rate"],
+            "false_hit_rate": best["false_hit_rate"],
+            "labelled_hits": best["labelled_hits"],
+            "lookups": len(usecase_lookups),
+            # Every extra cache hit is an LLM call that isn't made
+            "llm_calls_saved_vs_default": round((best["hit_rate"] - current["hit_rate"]) * len(usecase_lookups)),
+            "reason": best["reason"],
+            "curve": points[::5],
+        }
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "max_false_hit_rate": max_false_hit_rate,
+        "min_labels": min_labels,
+        "usecases": usecases,
+    }
+
+
+def _collection_search(collection_name: str, embedding_model: str) -> SearchMany:
+    from ..repositories.chroma_repository import ChromaRepository
+
+    repo = ChromaRepository(collection_name=collection_name, embedding_model=embedding_model)
+    return lambda queries, usecase, limit: repo.search_many(queries, usecase=usecase, limit=limit, score_threshold=0.0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Recommend semantic-cache thresholds from recorded lookups and feedback")
+    parser.add_argument("--log", default=os.getenv("THRESHOLD_LOG_PATH", "./cache/threshold_log.jsonl"))
+    parser.add_argument("--output", default=os.getenv("CACHE_THRESHOLDS_PATH", "./cache/cache_thresholds.json"))
+    parser.add_argument("--no-replay", action="store_true", help="use the recorded scores instead of re-querying the collection")
+    parser.add_argument("--collection", default="qa_collection")
+    parser.add_argument("--embedding-model", default="nomic-embed-text")
+    parser.add_argument("--max-false-hit-rate", type=float, default=0.05)
+    parser.add_argument("--min-labels", type=int, default=20, help="labelled hits needed before a threshold is trusted")
+    parser.add_argument("--dry-run", action="store_true", help="print the recommendation without writing --output")
+    args = parser.parse_args(argv)
+
+    lookups, feedback = load_log(args.log)
+    if not lookups:
+        print(f"No lookups recorded in {args.log}")
+        return 1
+    lookups = label(lookups, feedback)
+    if not args.no_replay:
+        lookups = replay(lookups, _collection_search(args.collection, args.embedding_model))
+    fallback = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", str(DEFAULT_THRESHOLD)))
+    report = tune(lookups, args.max_false_hit_rate, args.min_labels, fallback)
+
+    for usecase, result in report["usecases"].items():
+        fhr = "n/a" if result["false_hit_rate"] is None else f"{result['false_hit_rate']:.3f}"
+        print(f"{usecase}: threshold {result['threshold']:.2f}, hit rate {result['hit_rate']:.3f}, false-hit rate {fhr}, "
+              f"{result['lookups']} lookups, ~{result['llm_calls_saved_vs_default']} LLM calls saved ({result['reason']})")
+    if not args.dry_run:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}; restart the API (or redeploy) to load it")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+# Bounded pool for blocking ChromaDB work (embedding, HNSW query, SQLite commit) so the
+# event loop never blocks on it and a burst of requests can't spawn unbounded threads.
+chroma_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHROMA_EXECUTOR_WORKERS", "8")),
+    thread_name_prefix="chroma",
+)
+
+
+async def run_in_executor(executor: ThreadPoolExecutor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking callable on the given executor, preserving the caller's contextvars."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def submit(executor: ThreadPoolExecutor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "Future[Any]":
+    """Executor.submit for sync callers, preserving the caller's contextvars like run_in_executor."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# Tool calls (web search etc.) from the tools graph node's sync path run here so one AI message's calls execute side by side.
+# A call that times out keeps its worker until the tool returns; ParallelToolNode logs when that happens.
+tool_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TOOL_EXECUTOR_WORKERS", "16")),
+    thread_name_prefix="tool",
+)
@@ -0,0 +1,71 @@
+import importlib
+import os
+import sys
+import threading
+import types
+from typing import Any, Dict, List
+
+
+_import_lock = threading.RLock()
+
+
+def lazy_imports_enabled() -> bool:
+    return os.getenv("LAZY_IMPORTS", "true").lower() == "true"
+
+
+def import_module(name: str) -> types.ModuleType:
+    """importlib.import_module, serialized: packages with circular imports (chromadb) deadlock when two threads import them first."""
+    module = sys.modules.get(name)
+    if module is not None and not getattr(getattr(module, "__spec__", None), "_initializing", False):
+        return module
+    with _import_lock:
+        return importlib.import_module(name)
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a heavy third-party module that imports it on first attribute access.
+
+    Attributes set on the proxy (monkeypatching in tests) shadow the real
+    module's, like they would on the module itself.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def _load(self) -> types.ModuleType:
+        if self._module is None:
+            self._module = import_module(self.__name__)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+
+_lazy_modules: List[LazyModule] = []
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return name as a LazyModule, or the real module if it is already imported or LAZY_IMPORTS=false."""
+    if name in sys.modules or not lazy_imports_enabled():
+        return import_module(name)
+    module = LazyModule(name)
+    _lazy_modules.append(module)
+    return module
+
+
+def load_lazy_modules() -> None:
+    """Import every deferred module now (used by the startup pre-warm)."""
+    for module in _lazy_modules:
+        module._load()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "enabled": lazy_imports_enabled(),
+        "modules": {module.__name__: module.loaded for module in _lazy_modules},
+    }
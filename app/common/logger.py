@@ -1,22 +1,168 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
 from dotenv import load_dotenv
 
+from .tracing import current_span
+
 load_dotenv()
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id"}
+
+
+def max_field_chars() -> int:
+    return int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+
+
+def truncate(value: Any, limit: Optional[int] = None) -> Any:
+    """Cut long strings down to limit characters, noting how much was dropped."""
+    limit = limit or max_field_chars()
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}...[{len(value) - limit} more chars]"
+    return value
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse LOG_SAMPLE_RATES, e.g. "enhanced_chatbot_node=0.1,chroma_manager=0.5" (keys are module names)."""
+    rates = {}
+    for part in spec.split(","):
+        module, sep, rate = part.partition("=")
+        if sep and module.strip():
+            rates[module.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of a module's records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rates = rates if rates is not None else parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.module)
+        if rate is None or rate >= 1 or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: fixed fields, the message, and any extra={...} fields, each truncated."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        limit = max_field_chars()
+        payload: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": truncate(record.getMessage(), limit),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            payload["trace_id"] = trace_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                payload[key] = truncate(value if isinstance(value, (int, float, bool, type(None))) else str(value), limit)
+        if record.exc_info:
+            payload["exc_info"] = truncate(self.formatException(record.exc_info), limit * 4)
+        elif record.exc_text:
+            payload["exc_info"] = truncate(record.exc_text, limit * 4)
+        return json.dumps(payload, default=str)
 
-# Configure logging format
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+class DeferredQueueHandler(QueueHandler):
+    """Hand records to the writer thread with the message resolved but JSON encoding and I/O left to the listener.
 
-# Remove any existing handlers to avoid duplicates
-logger.propagate = False
+    The stock QueueHandler runs the full formatter on the calling thread; here
+    the caller only interpolates (and truncates) the message, since its args
+    may be mutated once the call returns.
+    """
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = truncate(record.getMessage())
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        active = current_span()
+        record.trace_id = active.trace.trace_id if active is not None else None
+        return record
+
+
+sampling_filter = SamplingFilter()
+_listener: Optional[QueueListener] = None
+
+
+def _formatter() -> logging.Formatter:
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return JsonFormatter()
+
+
+def configure_logging(target: logging.Logger) -> None:
+    """Attach the stderr handler to target: through a QueueListener writer thread unless LOG_ASYNC=false."""
+    global _listener
+    for handler in list(target.handlers):
+        target.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    target.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    target.propagate = False
+    target.addFilter(sampling_filter)
+
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(_formatter())
+    if os.getenv("LOG_ASYNC", "true").lower() != "true":
+        target.addHandler(console_handler)
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    target.addHandler(DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def flush_logs() -> None:
+    """Stop the writer thread after it has written everything queued; later records are written synchronously."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        for handler in list(logger.handlers):
+            if isinstance(handler, DeferredQueueHandler):
+                logger.removeHandler(handler)
+                fallback = logging.StreamHandler(sys.stderr)
+                fallback.setFormatter(_formatter())
+                logger.addHandler(fallback)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "level": logging.getLevelName(logger.level),
+        "format": os.getenv("LOG_FORMAT", "json").lower(),
+        "async": _listener is not None,
+        "sample_rates": sampling_filter.rates,
+        "sampled_out": sampling_filter.dropped,
+    }
+
+
+logger = logging.getLogger(__name__)
+configure_logging(logger)
+atexit.register(flush_logs)
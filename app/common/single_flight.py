@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one upstream call whose result is shared.
+
+    Only in-flight calls are deduplicated; once the leader finishes the key is
+    released, so nothing is cached here.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._futures: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._futures[key] = future
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._futures.pop(key, None)
+        return future.result()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._tasks[key] = task
+                self.calls += 1
+                task.add_done_callback(lambda _, key=key: self._release(key))
+            else:
+                self.shared += 1
+        # Shield so a cancelled caller doesn't cancel the call other waiters depend on
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable) -> None:
+        with self._lock:
+            self._tasks.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "in_flight": len(self._futures) + len(self._tasks),
+                "upstream_calls": self.calls,
+                "shared_results": self.shared,
+            }
+
+
+llm_flight = SingleFlight("llm")
+search_flight = SingleFlight("tavily")
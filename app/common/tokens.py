@@ -0,0 +1,11 @@
+from typing import Any, Iterable
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English), good enough for budgeting prompts."""
+    return (len(text) + 3) // 4
+
+
+def estimate_message_tokens(messages: Iterable[Any]) -> int:
+    # A few tokens of per-message overhead for role markers
+    return sum(estimate_tokens(str(getattr(m, "content", m))) + 4 for m in messages)
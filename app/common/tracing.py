@@ -0,0 +1,247 @@
+import asyncio
+import functools
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableLambda
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_TIMING_NAME = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """One span in the OTLP/JSON shape (resourceSpans[].scopeSpans[].spans[])."""
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+class Trace:
+    """Spans collected for one sampled request; list.append is atomic, so worker threads can add to it."""
+
+    def __init__(self, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.trace_id = trace_id or "%032x" % random.getrandbits(128)
+        self.parent_id = parent_id
+        self.spans: List[Span] = []
+
+    def server_timing(self) -> str:
+        """Sum span durations by name into a Server-Timing header value."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            name = _TIMING_NAME.sub("_", span.name)
+            totals[name] = totals.get(name, 0.0) + span.duration_ms
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in totals.items())
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def sample_rate() -> float:
+    return float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+
+
+def should_sample(traceparent: Optional[str] = None) -> Optional[Trace]:
+    """Return a new Trace if this request is sampled: an incoming W3C traceparent's flag wins, else TRACE_SAMPLE_RATE."""
+    if traceparent:
+        match = _TRACEPARENT.match(traceparent.strip().lower())
+        if match:
+            return Trace(match.group(1), match.group(2)) if int(match.group(3), 16) & 1 else None
+    rate = sample_rate()
+    if rate > 0 and random.random() < rate:
+        return Trace()
+    return None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """Open a child of the current span without making it current (for callback-style begin/end pairs)."""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span; a no-op costing one contextvar read when not sampled."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+@contextmanager
+def root_span(trace: Optional[Trace], name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Make name the root span of trace for the block, exporting the trace when it closes."""
+    if trace is None:
+        yield None
+        return
+    root = Span(trace, name, trace.parent_id, attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end()
+        exporter.export(trace)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span() for sync and async functions."""
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _current_span.get() is None:
+                    return await fn(*args, **kwargs)
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SpanExporter:
+    """Writes finished traces as OTLP/JSON lines to stdout or a file from a background thread.
+
+    TRACE_EXPORT is "stdout", "none", or a file path; each line is one
+    ExportTraceServiceRequest, so collectors' file receivers can ingest it.
+    """
+
+    def __init__(self, target: Optional[str] = None):
+        self._target = target
+        self._queue: "queue.SimpleQueue[Optional[Trace]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.processed = 0
+        self.exported = 0
+
+    @property
+    def target(self) -> str:
+        return self._target or os.getenv("TRACE_EXPORT", "stdout")
+
+    def export(self, trace: Trace) -> None:
+        if self.target == "none":
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self.queued += 1
+        self._queue.put(trace)
+
+    @staticmethod
+    def payload(trace: Trace) -> Dict[str, Any]:
+        service = os.getenv("TRACE_SERVICE_NAME", "genai-chat-bot")
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": [s.to_otlp() for s in trace.spans]}],
+        }]}
+
+    def _write(self, line: str) -> None:
+        if self.target == "stdout":
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+            return
+        with open(self.target, "a") as f:
+            f.write(line + "\n")
+
+    def _run(self) -> None:
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                self._write(json.dumps(self.payload(trace), default=str))
+                self.exported += 1
+            except Exception as e:
+                sys.stderr.write(f"Trace export failed: {e}\n")
+            finally:
+                self.processed += 1
+
+    def flush(self, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.processed < self.queued and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+
+exporter = SpanExporter()
+
+
+def traced_node(name: str, fn: Callable, afunc: Optional[Callable] = None) -> "RunnableLambda":
+    """A LangGraph node runnable whose sync and async bodies each record a node.<name> span."""
+    # Imported here: logger imports this module, so a top-level import would load LangChain for every importer
+    from langchain_core.runnables import RunnableLambda
+
+    return RunnableLambda(traced(f"node.{name}")(fn), afunc=traced(f"node.{name}")(afunc) if afunc else None, name=name)
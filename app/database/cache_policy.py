@@ -0,0 +1,84 @@
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Stored as expires_at for entries that never expire (Chroma metadata filters need an int)
+NEVER = 253402300799  # 9999-12-31T23:59:59Z
+
+# model tag of entries any model may serve (bulk-imported seeds, entries stored before model tags)
+ANY_MODEL = "*"
+
+# Web and news answers go stale quickly; plain chatbot answers age slowly
+DEFAULT_TTLS = {
+    "Basic Chatbot": 30 * 86400,
+    "Chatbot With Web": 86400,
+    "AI News": 86400,
+}
+
+
+def now() -> int:
+    return int(time.time())
+
+
+def _env_key(usecase: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in usecase.upper())
+
+
+def ttl_seconds(usecase: str) -> int:
+    """CACHE_TTL_<USECASE>_SECONDS (e.g. CACHE_TTL_CHATBOT_WITH_WEB_SECONDS), else the usecase default, else CACHE_TTL_SECONDS; 0 never expires."""
+    value = os.getenv(f"CACHE_TTL_{_env_key(usecase)}_SECONDS")
+    if value is None:
+        value = DEFAULT_TTLS.get(usecase) if usecase in DEFAULT_TTLS else os.getenv("CACHE_TTL_SECONDS", str(30 * 86400))
+    return int(value)
+
+
+def cache_version() -> str:
+    return os.getenv("CACHE_VERSION", "1")
+
+
+def match_model() -> bool:
+    return os.getenv("CACHE_MATCH_MODEL", "true").lower() == "true"
+
+
+def model_tag(llm: Any) -> str:
+    """Short, stable name for the model that produced an answer (not the client's repr)."""
+    name = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    return name if isinstance(name, str) else type(llm).__name__
+
+
+def expiry_metadata(usecase: str, created_at: Optional[int] = None) -> Dict[str, Any]:
+    """created_at, expires_at and cache_version fields stored with every cache entry."""
+    created_at = now() if created_at is None else created_at
+    ttl = ttl_seconds(usecase)
+    return {
+        "created_at": created_at,
+        "expires_at": created_at + ttl if ttl > 0 else NEVER,
+        "cache_version": cache_version(),
+    }
+
+
+def backfill_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Expiry fields for an entry stored before they existed, aged from its ISO timestamp when it has one."""
+    created_at = None
+    try:
+        created_at = int(datetime.fromisoformat(str(metadata["timestamp"])).timestamp())
+    except (KeyError, ValueError):
+        pass
+    return {"model": ANY_MODEL, **metadata, **expiry_metadata(metadata.get("usecase", ""), created_at)}
+
+
+def live_filter(usecase: str, model: Optional[str] = None) -> Dict[str, Any]:
+    """Chroma where clause matching unexpired entries of the current cache version (and model or ANY_MODEL, if CACHE_MATCH_MODEL)."""
+    conditions = [
+        {"usecase": usecase},
+        {"expires_at": {"$gt": now()}},
+        {"cache_version": cache_version()},
+    ]
+    if model and match_model():
+        conditions.append({"model": {"$in": [model, ANY_MODEL]}})
+    return {"$and": conditions}
+
+
+def expired_filter() -> Dict[str, Any]:
+    return {"expires_at": {"$lte": now()}}
@@ -1,90 +1,103 @@
 import os
 import hashlib
+import functools
+import time
 from typing import List, Dict, Optional, Any
-import chromadb
-from chromadb.config import Settings
 
 from ..common.logger import logger
-import numpy as np
+from ..common.metrics import CHROMA_SECONDS
+from ..common.tracing import span
+from . import cache_policy
+from .client_pool import client_pool
+from .embedding_engine import EmbeddingEngine, get_embedding_engine
+from ..common.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def _timed(operation: str):
+    """Record the wrapped ChromaManager method's latency in chroma_operation_duration_seconds and a chroma.<operation> span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with span(f"chroma.{operation}", collection=self.collection_name):
+                    return fn(self, *args, **kwargs)
+            finally:
+                CHROMA_SECONDS.observe(time.perf_counter() - start, operation=operation, collection=self.collection_name)
+        return wrapper
+    return decorator
 
 
 class ChromaManager:
-    def __init__(self, collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text"):
-        host_addr = os.getenv("CHROMA_HOST_ADDR", "").strip()
-        host_port = int(os.getenv("CHROMA_HOST_PORT", "8000"))
+    def __init__(self, collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text", embedding_engine: Optional[EmbeddingEngine] = None):
         self.collection_name = collection_name
         self.embedding_model = embedding_model
-        self._is_remote = bool(host_addr)
-
-        if host_addr:
-            self.client = chromadb.HttpClient(host=host_addr, port=host_port, ssl=False)
-            logger.info(f"Connected to remote ChromaDB at {host_addr}:{host_port}")
-        else:
-            persist_directory = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
-            self.client = chromadb.PersistentClient(
-                path=persist_directory,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
-            logger.info(f"Using local ChromaDB at {persist_directory}")
+        self.embedder = embedding_engine or get_embedding_engine()
+        # Clients and collection handles are shared process-wide through the pool
+        self._pool_key = client_pool.key_from_env()
+        self._is_remote = client_pool.is_remote(client_pool.resolve(self._pool_key))
 
         self._ensure_collection_exists()
 
+    @property
+    def client(self):
+        return client_pool.get_client(self._pool_key)
+
+    @property
+    def collection(self):
+        return client_pool.get_collection(self.collection_name, self._open_collection, self._pool_key)
+
     def _switch_to_local_client(self):
-        persist_directory = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+        client_pool.fallback_to_local(self._pool_key)
         self._is_remote = False
-        logger.info(f"Falling back to local ChromaDB at {persist_directory}")
 
-    def _ensure_collection_exists(self, allow_fallback: bool = True):
-        """Ensure the collection exists, create if it doesn't"""
+    def _open_collection(self, client):
+        """Find or create the collection on client"""
         try:
-            try:
-                collections = self.client.list_collections()
-                for coll in collections:
-                    if getattr(coll, "name", None) == self.collection_name:
-                        self.collection = coll
-                        logger.info(f"Using existing collection from list_collections: {self.collection_name}")
-                        return
-            except Exception as list_error:
-                logger.warning(f"Could not list collections: {list_error}")
+            collections = client.list_collections()
+            for coll in collections:
+                if getattr(coll, "name", None) == self.collection_name:
+                    logger.info(f"Using existing collection from list_collections: {self.collection_name}")
+                    return coll
+        except Exception as list_error:
+            logger.warning(f"Could not list collections: {list_error}")
 
-            try:
-                self.collection = self.client.get_collection(name=self.collection_name)
-                logger.info(f"Using existing collection via get_collection: {self.collection_name}")
-                return
-            except Exception as get_error:
-                logger.info(f"Collection {self.collection_name} not found via get_collection, will create: {get_error}")
+        try:
+            collection = client.get_collection(name=self.collection_name)
+            logger.info(f"Using existing collection via get_collection: {self.collection_name}")
+            return collection
+        except Exception as get_error:
+            logger.info(f"Collection {self.collection_name} not found via get_collection, will create: {get_error}")
 
-            try:
-                self.collection = self.client.create_collection(
-                    name=self.collection_name,
-                    metadata={"hnsw:space": "cosine"}
-                )
-                logger.info(f"Created new collection with metadata: {self.collection_name}")
-            except Exception as create_error:
-                msg = str(create_error)
-                logger.warning(f"Standard create_collection failed: {msg}")
-                if "already exists" in msg:
-                    self.collection = self.client.get_collection(name=self.collection_name)
-                    logger.info(f"Collection already exists, fetched via get_collection: {self.collection_name}")
-                else:
-                    try:
-                        self.collection = self.client.create_collection(name=self.collection_name)
-                        logger.info(f"Created collection with minimal metadata: {self.collection_name}")
-                    except Exception as minimal_error:
-                        logger.error(f"All collection creation attempts failed: {minimal_error}")
-                        raise minimal_error
-
-            logger.info(f"Ensured collection exists: {self.collection_name}")
+        try:
+            collection = client.create_collection(
+                name=self.collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+            logger.info(f"Created new collection with metadata: {self.collection_name}")
+        except Exception as create_error:
+            msg = str(create_error)
+            logger.warning(f"Standard create_collection failed: {msg}")
+            if "already exists" in msg:
+                collection = client.get_collection(name=self.collection_name)
+                logger.info(f"Collection already exists, fetched via get_collection: {self.collection_name}")
+            else:
+                try:
+                    collection = client.create_collection(name=self.collection_name)
+                    logger.info(f"Created collection with minimal metadata: {self.collection_name}")
+                except Exception as minimal_error:
+                    logger.error(f"All collection creation attempts failed: {minimal_error}")
+                    raise minimal_error
+
+        logger.info(f"Ensured collection exists: {self.collection_name}")
+        return collection
+
+    def _ensure_collection_exists(self, allow_fallback: bool = True):
+        """Ensure the collection exists, create if it doesn't"""
+        try:
+            client_pool.get_collection(self.collection_name, self._open_collection, self._pool_key)
         except Exception as e:
             logger.error(f"Error ensuring collection exists: {e}")
             if allow_fallback and self._is_remote and "_type" in str(e):
@@ -98,23 +111,29 @@ class ChromaManager:
         """Generate a unique ID for a document"""
         return hashlib.md5(text.encode()).hexdigest()
 
+    def _qa_record(self, question: str, answer: str, usecase: str, metadata: Optional[Dict] = None):
+        """Build the document id and metadata stored for a question-answer pair"""
+        doc_id = self._generate_id(f"{question}_{usecase}")
+        chroma_metadata = {
+            "question": question,
+            "answer": answer,
+            "usecase": usecase,
+            "timestamp": np.datetime64('now').astype('datetime64[s]').item().isoformat(),
+            **cache_policy.expiry_metadata(usecase),
+            "model": cache_policy.ANY_MODEL,
+            **(metadata or {})
+        }
+        return doc_id, chroma_metadata
+
+    @_timed("store")
     def store_qa_pair(self, question: str, answer: str, usecase: str, metadata: Optional[Dict] = None) -> bool:
         """Store a question-answer pair in ChromaDB"""
         try:
-            # Generate unique ID
-            doc_id = self._generate_id(f"{question}_{usecase}")
-            
-            # Prepare metadata
-            chroma_metadata = {
-                "question": question,
-                "answer": answer,
-                "usecase": usecase,
-                "timestamp": np.datetime64('now').astype('datetime64[s]').item().isoformat(),
-                **(metadata or {})
-            }
-            
-            # Store in ChromaDB
-            self.collection.add(
+            doc_id, chroma_metadata = self._qa_record(question, answer, usecase, metadata)
+
+            # Upsert so a repeated question refreshes its answer; reuse the embedding from the preceding search
+            self.collection.upsert(
+                embeddings=[self.embedder.embed(question)],
                 documents=[question],
                 metadatas=[chroma_metadata],
                 ids=[doc_id]
@@ -127,45 +146,87 @@ class ChromaManager:
             logger.error(f"Error storing Q&A pair: {e}")
             return False
 
-    def search_similar_questions(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.7) -> List[Dict[str, Any]]:
-        """Search for similar questions in ChromaDB"""
+    @_timed("store_batch")
+    def store_qa_pairs(self, items: List[Dict[str, Any]]) -> bool:
+        """Upsert a batch of question-answer pairs with a single collection call"""
         try:
-            # Query ChromaDB with usecase filter
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=min(limit, 10),  # ChromaDB limit
-                where={"usecase": usecase},
-                include=["documents", "metadatas", "distances"]
+            # Later entries for the same id win; Chroma rejects duplicate ids within one call
+            records = {}
+            for item in items:
+                doc_id, chroma_metadata = self._qa_record(item["question"], item["answer"], item["usecase"], item.get("metadata"))
+                records[doc_id] = (item["question"], chroma_metadata)
+            ids = list(records)
+            documents = [records[doc_id][0] for doc_id in ids]
+            self.collection.upsert(
+                ids=ids,
+                embeddings=self.embedder.embed_many(documents),
+                documents=documents,
+                metadatas=[records[doc_id][1] for doc_id in ids]
             )
-            
-            # Process results
-            similar_questions = []
-            
-            if results['ids'] and results['ids'][0]:
-                for i, doc_id in enumerate(results['ids'][0]):
-                    distance = results['distances'][0][i]
-                    # Convert distance to similarity score (ChromaDB uses L2 distance by default)
-                    # For cosine similarity, lower distance = higher similarity
-                    similarity_score = 1 - distance if distance <= 1 else 0
-                    
-                    if similarity_score >= score_threshold:
-                        metadata = results['metadatas'][0][i]
-                        similar_questions.append({
-                            "question": metadata.get("question", ""),
-                            "answer": metadata.get("answer", ""),
-                            "score": similarity_score,
-                            "metadata": {k: v for k, v in metadata.items() if k not in ["question", "answer"]}
-                        })
-            
-            # Sort by score (highest first)
-            similar_questions.sort(key=lambda x: x["score"], reverse=True)
-            
-            logger.info(f"Found {len(similar_questions)} similar questions for query: {query}")
-            return similar_questions
-            
+            logger.info(f"Upserted {len(ids)} Q&A pairs into {self.collection_name}")
+            return True
         except Exception as e:
-            logger.error(f"Error searching similar questions: {e}")
+            logger.error(f"Error upserting Q&A pairs: {e}")
+            return False
+
+    def search_similar_questions(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.7, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for similar questions in ChromaDB"""
+        similar_questions = self.search_many([query], usecase=usecase, limit=limit, score_threshold=score_threshold, model=model)[0]
+        logger.debug("Found %d similar questions for query: %s", len(similar_questions), query)
+        return similar_questions
+
+    @_timed("search")
+    def search_many(self, queries: List[str], usecase: str, limit: int = 5, score_threshold: float = 0.7, model: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Search for similar questions for many queries with one collection query per chunk"""
+        if not queries:
             return []
+        # Expired, other-version and (given model) other-model entries are left to the compactor
+        where = cache_policy.live_filter(usecase, model)
+        chunk_size = int(os.getenv("CHROMA_QUERY_BATCH_SIZE", "1000"))
+        hits: List[List[Dict[str, Any]]] = []
+        for start in range(0, len(queries), chunk_size):
+            chunk = queries[start:start + chunk_size]
+            try:
+                results = self.collection.query(
+                    query_embeddings=self.embedder.embed_many(chunk),
+                    n_results=min(limit, 10),  # ChromaDB limit
+                    where=where,
+                    include=["metadatas", "distances"]
+                )
+                hits.extend(self._hits_from_results(results, len(chunk), score_threshold))
+            except Exception as e:
+                logger.error(f"Error searching similar questions: {e}")
+                # Drop a dead client/handle from the pool so the next request reconnects
+                client_pool.health_check(self._pool_key, force=True)
+                hits.extend([] for _ in chunk)
+        return hits
+
+    @staticmethod
+    def _hits_from_results(results: Dict[str, Any], n_queries: int, score_threshold: float) -> List[List[Dict[str, Any]]]:
+        """Convert a query result to per-query hits, filtering the whole distance matrix at once"""
+        rows = results.get('distances') or []
+        width = max((len(row) for row in rows), default=0)
+        if width == 0:
+            return [[] for _ in range(n_queries)]
+        # Pad ragged rows with +inf so they can never pass the threshold
+        distances = np.full((n_queries, width), np.inf)
+        for i, row in enumerate(rows):
+            distances[i, :len(row)] = row
+        # Convert distance to similarity score (collections use cosine distance: lower = more similar)
+        scores = np.where(distances <= 1, 1 - distances, 0.0)
+        # Padding scores 0.0 too, so mask it explicitly or a 0.0 threshold would index past a short row
+        keep = np.isfinite(distances) & (scores >= score_threshold)
+        # Chroma returns each row nearest-first, so kept hits are already sorted by score (highest first)
+        hits: List[List[Dict[str, Any]]] = [[] for _ in range(n_queries)]
+        for i, j in zip(*np.nonzero(keep)):
+            metadata = results['metadatas'][i][j]
+            hits[i].append({
+                "question": metadata.get("question", ""),
+                "answer": metadata.get("answer", ""),
+                "score": float(scores[i, j]),
+                "metadata": {k: v for k, v in metadata.items() if k not in ["question", "answer"]}
+            })
+        return hits
 
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the collection"""
@@ -184,6 +245,7 @@ class ChromaManager:
         """Clear all documents from the collection"""
         try:
             self.client.delete_collection(self.collection_name)
+            client_pool.invalidate_collection(self.collection_name, self._pool_key)
             self._ensure_collection_exists()
             logger.info(f"Cleared collection: {self.collection_name}")
             return True
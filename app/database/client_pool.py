@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..common.lazy import lazy_import
+from ..common.logger import logger
+
+chromadb = lazy_import("chromadb")
+
+PoolKey = Tuple[Optional[str], Optional[int], Optional[str]]
+
+
+def _local_client(persist_directory: str):
+    return chromadb.PersistentClient(
+        path=persist_directory,
+        settings=chromadb.config.Settings(
+            anonymized_telemetry=False,
+            allow_reset=True
+        )
+    )
+
+
+class ChromaClientPool:
+    """Process-wide ChromaDB clients keyed by (host, port, persist dir), with cached collection handles.
+
+    Sharing one HttpClient per server reuses its keep-alive connection pool; sharing
+    one PersistentClient per directory avoids re-opening SQLite and HNSW segments.
+    A remote endpoint that falls back to local storage does so for every caller.
+    Clients are built and collections opened outside the pool lock, behind a lock
+    per client or collection, so a slow open only holds up callers waiting for
+    that same handle.
+    """
+
+    def __init__(self, health_check_interval: Optional[float] = None):
+        self.health_check_interval = health_check_interval if health_check_interval is not None else float(os.getenv("CHROMA_HEALTH_CHECK_INTERVAL_SECONDS", "30"))
+        self._lock = threading.RLock()
+        self._clients: Dict[PoolKey, Any] = {}
+        self._fallbacks: Dict[PoolKey, PoolKey] = {}
+        self._collections: Dict[Tuple[PoolKey, str], Any] = {}
+        self._last_healthy: Dict[PoolKey, float] = {}
+        self._open_locks: Dict[Any, threading.Lock] = {}
+        self.clients_created = 0
+        self.collection_hits = 0
+        self.collection_misses = 0
+
+    @staticmethod
+    def key_from_env() -> PoolKey:
+        host_addr = os.getenv("CHROMA_HOST_ADDR", "").strip()
+        if host_addr:
+            return (host_addr, int(os.getenv("CHROMA_HOST_PORT", "8000")), None)
+        return (None, None, os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db"))
+
+    def resolve(self, key: Optional[PoolKey] = None) -> PoolKey:
+        key = key or self.key_from_env()
+        with self._lock:
+            return self._fallbacks.get(key, key)
+
+    @staticmethod
+    def is_remote(key: PoolKey) -> bool:
+        return key[0] is not None
+
+    def _open_lock(self, key: Any) -> threading.Lock:
+        # Called with self._lock held
+        return self._open_locks.setdefault(key, threading.Lock())
+
+    def get_client(self, key: Optional[PoolKey] = None):
+        key = self.resolve(key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+            open_lock = self._open_lock(key)
+        with open_lock:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is not None:
+                    return client
+            host, port, persist_directory = key
+            client = None
+            try:
+                if host:
+                    client = chromadb.HttpClient(host=host, port=port, ssl=False)
+                    logger.info(f"Connected to remote ChromaDB at {host}:{port}")
+                else:
+                    client = _local_client(persist_directory)
+                    logger.info(f"Using local ChromaDB at {persist_directory}")
+                return client
+            finally:
+                with self._lock:
+                    if client is not None:
+                        self._clients[key] = client
+                        self.clients_created += 1
+                    self._open_locks.pop(key, None)
+
+    def get_collection(self, name: str, opener: Callable[[Any], Any], key: Optional[PoolKey] = None):
+        """Return the cached handle for collection name, opening it with opener(client) once per pool key.
+
+        Concurrent misses for one collection share a single open; cached lookups never wait on it.
+        """
+        key = self.resolve(key)
+        with self._lock:
+            collection = self._collections.get((key, name))
+            if collection is not None:
+                self.collection_hits += 1
+                return collection
+            open_lock = self._open_lock((key, name))
+        with open_lock:
+            with self._lock:
+                collection = self._collections.get((key, name))
+                if collection is not None:
+                    self.collection_hits += 1
+                    return collection
+                self.collection_misses += 1
+            client = self.get_client(key)
+            collection = None
+            try:
+                collection = opener(client)
+                return collection
+            finally:
+                with self._lock:
+                    # Don't cache a handle on a client that was dropped (health check, fallback) while it opened
+                    if collection is not None and self._clients.get(key) is client:
+                        self._collections[(key, name)] = collection
+                    self._open_locks.pop((key, name), None)
+
+    def invalidate_collection(self, name: str, key: Optional[PoolKey] = None) -> None:
+        with self._lock:
+            self._collections.pop((self.resolve(key), name), None)
+
+    def fallback_to_local(self, key: Optional[PoolKey] = None) -> PoolKey:
+        """Route every future lookup for a remote key to the local persistent client."""
+        key = key or self.key_from_env()
+        local_key: PoolKey = (None, None, os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db"))
+        with self._lock:
+            if self.is_remote(key):
+                self._fallbacks[key] = local_key
+                self._clients.pop(key, None)
+                for cached in [k for k in self._collections if k[0] == key]:
+                    del self._collections[cached]
+                logger.info(f"Falling back to local ChromaDB at {local_key[2]}")
+        return local_key
+
+    def health_check(self, key: Optional[PoolKey] = None, force: bool = False) -> bool:
+        """Heartbeat the client, at most once per interval; an unhealthy client is dropped and rebuilt on next use."""
+        key = self.resolve(key)
+        now = time.monotonic()
+        if not force and now - self._last_healthy.get(key, float("-inf")) < self.health_check_interval:
+            return True
+        try:
+            self.get_client(key).heartbeat()
+            with self._lock:
+                self._last_healthy[key] = now
+            return True
+        except Exception as e:
+            logger.warning(f"ChromaDB health check failed for {key}: {e}")
+            with self._lock:
+                self._clients.pop(key, None)
+                for cached in [k for k in self._collections if k[0] == key]:
+                    del self._collections[cached]
+                self._last_healthy.pop(key, None)
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            self._fallbacks.clear()
+            self._collections.clear()
+            self._last_healthy.clear()
+            self._open_locks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "clients_created": self.clients_created,
+                "collections": len(self._collections),
+                "collection_hits": self.collection_hits,
+                "collection_misses": self.collection_misses,
+                "fallbacks": {f"{k[0]}:{k[1]}": v[2] for k, v in self._fallbacks.items()},
+            }
+
+
+client_pool = ChromaClientPool()
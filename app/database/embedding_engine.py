@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..common.lazy import import_module
+from ..common.logger import logger
+from ..common.lru_cache import LRUCache
+
+Embedding = List[float]
+
+
+class EmbeddingEngine:
+    """Computes embeddings explicitly so ChromaDB never embeds the same text twice.
+
+    Results are memoized by content hash in a bounded LRU. Cache misses from
+    concurrent callers are queued and coalesced by a single batcher thread into
+    one embedding-function call of up to ``max_batch_size`` texts, waiting at
+    most ``max_wait_ms`` for a batch to fill.
+    """
+
+    def __init__(
+        self,
+        embedding_function: Optional[Callable[[List[str]], Sequence[Any]]] = None,
+        cache_size: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        self._embedding_function = embedding_function
+        self.cache = LRUCache(maxsize=cache_size or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000")), name="embeddings")
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+        wait_ms = max_wait_ms if max_wait_ms is not None else float(os.getenv("EMBEDDING_MAX_WAIT_MS", "2"))
+        self.max_wait = wait_ms / 1000.0
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, str, Future]] = []
+        self._inflight: Dict[str, Future] = {}
+        self._worker: Optional[threading.Thread] = None
+        self.model_calls = 0
+        self.texts_embedded = 0
+
+    @property
+    def embedding_function(self) -> Callable[[List[str]], Sequence[Any]]:
+        if self._embedding_function is None:
+            # Same default ONNX model ChromaDB uses when a collection has no embedding function
+            embedding_functions = import_module("chromadb.utils.embedding_functions")
+            self._embedding_function = embedding_functions.DefaultEmbeddingFunction()
+            logger.info("Loaded default ChromaDB embedding function")
+        return self._embedding_function
+
+    @property
+    def loaded(self) -> bool:
+        return self._embedding_function is not None
+
+    def warm_up(self) -> None:
+        """Load the embedding model and run it once, outside the cache and batch counters."""
+        self.embedding_function(["warm up"])
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed(self, text: str) -> Embedding:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> List[Embedding]:
+        results: List[Optional[Embedding]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self.cache.get(self.key(text))
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+        if missing:
+            futures = self._submit(list(missing))
+            for (text, positions), future in zip(missing.items(), futures):
+                embedding = future.result()
+                for i in positions:
+                    results[i] = embedding
+        return results  # type: ignore[return-value]
+
+    def _submit(self, texts: List[str]) -> List[Future]:
+        futures = []
+        with self._cond:
+            for text in texts:
+                key = self.key(text)
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    self._pending.append((text, key, future))
+                futures.append(future)
+            self._ensure_worker()
+            self._cond.notify()
+        return futures
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._worker.start()
+
+    def _next_batch(self) -> List[Tuple[str, str, Future]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                embeddings = self.embedding_function([text for text, _, _ in batch])
+                self.model_calls += 1
+                self.texts_embedded += len(batch)
+                for (_, key, future), embedding in zip(batch, embeddings):
+                    vector = embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+                    self.cache.set(key, vector)
+                    future.set_result(vector)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    for _, key, _ in batch:
+                        self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.stats(),
+            "model_calls": self.model_calls,
+            "texts_embedded": self.texts_embedded,
+            "avg_batch_size": round(self.texts_embedded / self.model_calls, 2) if self.model_calls else 0.0,
+        }
+
+
+_engine: Optional[EmbeddingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_embedding_engine() -> EmbeddingEngine:
+    """Process-wide engine shared by every ChromaManager."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = EmbeddingEngine()
+        return _engine
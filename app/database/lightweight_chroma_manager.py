@@ -1,31 +1,15 @@
-import os
 import hashlib
 from typing import List, Dict, Optional, Any
-import chromadb
-from chromadb.config import Settings
 
 from ..common.logger import logger
+from . import cache_policy
+from .client_pool import client_pool
 
 
 class LightweightChromaManager:
     def __init__(self, collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text"):
-        host_addr = os.getenv("CHROMA_HOST_ADDR", "").strip()
-        host_port = int(os.getenv("CHROMA_HOST_PORT", "8000"))
         self.collection_name = collection_name
-
-        if host_addr:
-            self.client = chromadb.HttpClient(host=host_addr, port=host_port, ssl=False)
-            logger.info(f"Connected to remote ChromaDB at {host_addr}:{host_port}")
-        else:
-            persist_directory = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
-            self.client = chromadb.PersistentClient(
-                path=persist_directory,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
-            logger.info(f"Using local ChromaDB at {persist_directory}")
+        self.client = client_pool.get_client()
 
         self._ensure_collection_exists()
 
@@ -48,13 +32,15 @@ class LightweightChromaManager:
             doc_metadata = {
                 "usecase": usecase,
                 "question": question,
-                "answer": answer
+                "answer": answer,
+                "model": cache_policy.ANY_MODEL,
+                **cache_policy.expiry_metadata(usecase)
             }
             if metadata:
                 doc_metadata.update(metadata)
             
-            # Store in ChromaDB
-            self.collection.add(
+            # Upsert so a repeated question refreshes its answer
+            self.collection.upsert(
                 documents=[question],
                 metadatas=[doc_metadata],
                 ids=[doc_id]
@@ -65,44 +51,63 @@ class LightweightChromaManager:
             logger.error(f"Failed to store QA pair: {str(e)}")
             return False
 
-    def search_similar_questions(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.8) -> List[Dict[str, Any]]:
-        """Search for similar questions and return relevant answers"""
+    def store_qa_pairs(self, items: List[Dict[str, Any]]) -> bool:
+        """Upsert a batch of question-answer pairs with a single collection call"""
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=min(limit, 10),
-                where={"usecase": usecase}
+            records = {}
+            for item in items:
+                doc_id = hashlib.md5(f"{item['question']}_{item['usecase']}".encode()).hexdigest()
+                doc_metadata = {"usecase": item["usecase"], "question": item["question"], "answer": item["answer"], "model": cache_policy.ANY_MODEL, **cache_policy.expiry_metadata(item["usecase"])}
+                doc_metadata.update(item.get("metadata") or {})
+                records[doc_id] = (item["question"], doc_metadata)
+            ids = list(records)
+            self.collection.upsert(
+                ids=ids,
+                documents=[records[doc_id][0] for doc_id in ids],
+                metadatas=[records[doc_id][1] for doc_id in ids]
             )
-            
-            if not results['documents'] or not results['documents'][0]:
-                return []
-            
-            # Format results
-            formatted_results = []
-            for i, doc in enumerate(results['documents'][0]):
-                metadata = results['metadatas'][0][i] if results['metadatas'] and results['metadatas'][0] else {}
-                distance = results['distances'][0][i] if results['distances'] and results['distances'][0] else 0
-                
-                # Convert distance to similarity score (lower distance = higher similarity)
-                similarity_score = max(0, 1 - distance)
-                
-                if similarity_score >= score_threshold:
-                    formatted_results.append({
-                        "question": doc,
-                        "answer": metadata.get("answer", ""),
-                        "similarity_score": similarity_score,
-                        "metadata": metadata
-                    })
-            
-            # Sort by similarity score
-            formatted_results.sort(key=lambda x: x["similarity_score"], reverse=True)
-            
-            logger.info(f"Found {len(formatted_results)} similar questions for usecase: {usecase}")
-            return formatted_results
-            
+            logger.info(f"Upserted {len(ids)} QA pairs")
+            return True
         except Exception as e:
-            logger.error(f"Failed to search similar questions: {str(e)}")
+            logger.error(f"Failed to upsert QA pairs: {str(e)}")
+            return False
+
+    def search_similar_questions(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for similar questions and return relevant answers"""
+        similar_questions = self.search_many([query], usecase=usecase, limit=limit, score_threshold=score_threshold, model=model)[0]
+        logger.debug("Found %d similar questions for usecase: %s", len(similar_questions), usecase)
+        return similar_questions
+
+    @staticmethod
+    def _hit(question: str, metadata: Dict[str, Any], score: float) -> Dict[str, Any]:
+        # Same shape as ChromaManager's hits
+        return {
+            "question": metadata.get("question", question),
+            "answer": metadata.get("answer", ""),
+            "score": score,
+            "metadata": {k: v for k, v in metadata.items() if k not in ["question", "answer"]},
+        }
+
+    def search_many(self, queries: List[str], usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Search for similar questions for many queries in a single collection query"""
+        if not queries:
             return []
+        try:
+            results = self.collection.query(query_texts=queries, n_results=min(limit, 10), where=cache_policy.live_filter(usecase, model))
+            batched = []
+            for i, docs in enumerate(results['documents'] or []):
+                hits = []
+                for j, doc in enumerate(docs):
+                    # Convert distance to similarity score (lower distance = higher similarity)
+                    score = max(0.0, 1 - results['distances'][i][j])
+                    if score >= score_threshold:
+                        hits.append(self._hit(doc, results['metadatas'][i][j] or {}, score))
+                # Chroma returns each row nearest-first
+                batched.append(hits)
+            return batched
+        except Exception as e:
+            logger.error(f"Failed to batch search similar questions: {str(e)}")
+            return [[] for _ in queries]
 
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get collection statistics"""
@@ -1,8 +1,10 @@
 import os
 from fastapi import HTTPException
-from langchain_groq import ChatGroq
+from ..common.lazy import lazy_import
 from ..common.logger import logger
 
+langchain_groq = lazy_import("langchain_groq")
+
 class LLMFactory:
     @staticmethod
     def create(provider: str, model: str):
@@ -12,6 +14,6 @@ class LLMFactory:
             if not api_key:
                 raise HTTPException(status_code=400, detail="Missing GROQ_API_KEY")
             logger.info(f"llm_factory groq {model}")
-            return ChatGroq(api_key=api_key, model=model)
+            return langchain_groq.ChatGroq(api_key=api_key, model=model)
         raise HTTPException(status_code=400, detail="Invalid provider. Only 'groq' is supported.")
 
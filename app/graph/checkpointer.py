@@ -0,0 +1,160 @@
+import os
+import pickle
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ..common.logger import logger
+
+
+class SnapshotMemorySaver(InMemorySaver):
+    """In-memory LangGraph checkpointer that periodically snapshots itself to a file.
+
+    Checkpoint writes stay dict operations on the request path; a background
+    thread pickles the store (atomic rename) when it has changed, and a new
+    process loads the last snapshot so interrupted threads can be resumed.
+    """
+
+    def __init__(self, path: str, interval: Optional[float] = None):
+        super().__init__()
+        self.path = path
+        self.interval = interval if interval is not None else float(os.getenv("CHECKPOINT_SNAPSHOT_INTERVAL_SECONDS", "5"))
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.snapshots = 0
+        self.load()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            self._dirty = True
+            return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            self._dirty = True
+            return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._dirty = True
+            return super().delete_thread(thread_id)
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint snapshot {self.path}: {e}")
+            return
+        with self._lock:
+            for thread_id, namespaces in data["storage"].items():
+                for checkpoint_ns, checkpoints in namespaces.items():
+                    self.storage[thread_id][checkpoint_ns].update(checkpoints)
+            for key, writes in data["writes"].items():
+                self.writes[key].update(writes)
+            self.blobs.update(data["blobs"])
+        logger.info(f"Loaded {len(data['storage'])} checkpoint threads from {self.path}")
+
+    def snapshot(self) -> bool:
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = {
+                "storage": {t: {ns: dict(cps) for ns, cps in nss.items()} for t, nss in self.storage.items()},
+                "writes": {k: dict(v) for k, v in self.writes.items()},
+                "blobs": dict(self.blobs),
+            }
+            self._dirty = False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.snapshots += 1
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                self._dirty = True
+                logger.error(f"Checkpoint snapshot failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="checkpoint-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.snapshot()
+
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_checkpointer_lock = threading.Lock()
+_checkpointer_created = False
+
+
+def create_checkpointer(mode: Optional[str] = None) -> Optional[BaseCheckpointSaver]:
+    mode = (mode or os.getenv("CHECKPOINTER", "none")).lower()
+    if mode == "memory":
+        return InMemorySaver()
+    if mode == "snapshot":
+        return SnapshotMemorySaver(os.getenv("CHECKPOINT_SNAPSHOT_PATH", "./cache/checkpoints.pkl"))
+    if mode not in ("", "none"):
+        logger.warning(f"Unknown CHECKPOINTER={mode!r}, graphs will run without checkpoints")
+    return None
+
+
+def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """Process-wide checkpointer shared by every compiled graph, or None when checkpointing is off."""
+    global _checkpointer, _checkpointer_created
+    with _checkpointer_lock:
+        if not _checkpointer_created:
+            _checkpointer = create_checkpointer()
+            _checkpointer_created = True
+        return _checkpointer
+
+
+def thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@asynccontextmanager
+async def checkpointed_run(graph, state: Dict[str, Any], thread_id: str, resumable: bool = True) -> AsyncIterator[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """Yield the (input, config) to invoke graph with.
+
+    If the thread stopped part-way (crash, upstream error) the input is None so
+    LangGraph continues from the last completed step instead of starting over.
+    A thread is deleted once it completes, and always when it isn't resumable,
+    so the store only ever holds in-flight runs.
+    """
+    checkpointer = getattr(graph, "checkpointer", None)
+    if checkpointer is None:
+        yield state, None
+        return
+    config = thread_config(thread_id)
+    snapshot = await graph.aget_state(config)
+    if snapshot.next:
+        logger.info(f"Resuming thread {thread_id} at {list(snapshot.next)}")
+    completed = False
+    try:
+        yield (None if snapshot.next else state), config
+        completed = True
+    finally:
+        if completed or not resumable:
+            await checkpointer.adelete_thread(thread_id)
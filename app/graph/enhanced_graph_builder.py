@@ -1,35 +1,41 @@
 from langgraph.graph import StateGraph
 from langgraph.graph import START, END
-from ..state.state import State
+from ..common.tracing import traced_node
+from typing import Optional
+from ..state.state import State, NewsState
 from ..nodes.enhanced_chatbot_node import EnhancedChatbotNode
 from ..nodes.enhanced_ai_news_node import EnhancedAINewsNode
 from ..tools.search_tool import get_tools, create_tool_node
 from langgraph.prebuilt import tools_condition
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from ..nodes.chatbot_with_Tool_node import ChatbotWithToolNode
 from ..common.logger import logger
 from ..repositories.chroma_repository import ChromaRepository
 import traceback
 
 class EnhancedGraphBuilder:
-    def __init__(self, model, embedding_model: str = "nomic-embed-text"):
+    def __init__(self, model, embedding_model: str = "nomic-embed-text", chroma_repo: Optional[ChromaRepository] = None, news_repo: Optional[ChromaRepository] = None, checkpointer: Optional[BaseCheckpointSaver] = None):
         self.llm = model
+        self.checkpointer = checkpointer
         self.embedding_model = embedding_model
         self.graph_builder = StateGraph(State)
-        self.chroma_repo = ChromaRepository(embedding_model=embedding_model)
+        self.chroma_repo = chroma_repo or ChromaRepository(embedding_model=embedding_model)
+        self.news_repo = news_repo
 
     def enhanced_basic_chatbot_build_graph(self):
         logger.info("Building enhanced basic chatbot graph")
-        enhanced_chatbot_node = EnhancedChatbotNode(model=self.llm, embedding_model=self.embedding_model)
-        self.graph_builder.add_node("chatbot", enhanced_chatbot_node.process)
+        enhanced_chatbot_node = EnhancedChatbotNode(model=self.llm, embedding_model=self.embedding_model, chroma_repo=self.chroma_repo)
+        self.graph_builder.add_node("chatbot", traced_node("chatbot", enhanced_chatbot_node.process, enhanced_chatbot_node.aprocess))
         self.graph_builder.add_edge(START, "chatbot")
         self.graph_builder.add_edge("chatbot", END)
 
     def enhanced_ai_news_builder_graph(self):
         logger.info("Building enhanced AI news graph")
-        enhanced_ai_news_node = EnhancedAINewsNode(model=self.llm, embedding_model=self.embedding_model)
-        self.graph_builder.add_node("fetch_news", enhanced_ai_news_node.fetch_news)
-        self.graph_builder.add_node("summarize_news", enhanced_ai_news_node.summarize_news)
-        self.graph_builder.add_node("save_result", enhanced_ai_news_node.save_result)
+        self.graph_builder = StateGraph(NewsState)
+        enhanced_ai_news_node = EnhancedAINewsNode(model=self.llm, embedding_model=self.embedding_model, chroma_repo=self.news_repo)
+        self.graph_builder.add_node("fetch_news", traced_node("fetch_news", enhanced_ai_news_node.fetch_news, enhanced_ai_news_node.afetch_news))
+        self.graph_builder.add_node("summarize_news", traced_node("summarize_news", enhanced_ai_news_node.summarize_news, enhanced_ai_news_node.asummarize_news))
+        self.graph_builder.add_node("save_result", traced_node("save_result", enhanced_ai_news_node.save_result, enhanced_ai_news_node.asave_result))
         self.graph_builder.set_entry_point("fetch_news")
         self.graph_builder.add_edge("fetch_news", "summarize_news")
         self.graph_builder.add_edge("summarize_news", "save_result")
@@ -60,7 +66,7 @@ class EnhancedGraphBuilder:
                 logger.error(f"Invalid use case selected: {usecase}")
                 raise ValueError(f"Invalid use case: {usecase}")
             logger.info("Enhanced graph setup completed successfully")
-            return self.graph_builder.compile()
+            return self.graph_builder.compile(checkpointer=self.checkpointer)
         except Exception as e:
             tb = traceback.format_exc()
             logger.critical(f"Failed to setup enhanced graph for {usecase}: {e}\n{tb}")
@@ -1,5 +1,11 @@
 import os
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
 from .common.logger import logger
+from .common.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, LLM_CALL_SECONDS
+from .common.tracing import Span, root_span, should_sample, start_span
 
 def configure_observability():
     api_key = os.getenv('LANGCHAIN_API_KEY')
@@ -10,3 +16,112 @@ def configure_observability():
         logger.info('LangSmith tracing enabled')
     else:
         logger.info('LangSmith tracing disabled (no API key)')
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests and latency per route template (until the body is fully sent)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                path=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            )
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Times every call made through an LLM client into llm_call_duration_seconds and, when traced, an llm span."""
+
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self._started: Dict[UUID, Tuple[float, Optional[Span]]] = {}
+
+    def _start(self, run_id: UUID) -> None:
+        self._started[run_id] = (time.perf_counter(), start_span("llm", model=self.model))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def _finish(self, run_id: UUID, status: str, error: Optional[BaseException] = None) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        start, llm_span = started
+        LLM_CALL_SECONDS.observe(time.perf_counter() - start, model=self.model, status=status)
+        if llm_span is not None:
+            llm_span.end(error)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "ok")
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error", error)
+
+
+def instrument_llm(llm, model: str):
+    """Attach the latency callback to an LLM client (once); returns the same client."""
+    callbacks = list(llm.callbacks or [])
+    if not any(isinstance(cb, LLMMetricsCallback) for cb in callbacks):
+        llm.callbacks = callbacks + [LLMMetricsCallback(model)]
+    return llm
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of sampled requests and reporting their spans in a Server-Timing header.
+
+    Unsampled requests pass straight through, so with TRACE_SAMPLE_RATE=0 the
+    only cost is the sampling check.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = next((v.decode("latin-1") for k, v in scope.get("headers", []) if k == b"traceparent"), None)
+        trace = should_sample(traceparent)
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                timing = trace.server_timing()
+                total = f"total;dur={(time.perf_counter() - start) * 1000:.1f}"
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", (f"{timing}, {total}" if timing else total).encode("latin-1")))
+                headers.append((b"x-trace-id", trace.trace_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with root_span(trace, f"{scope['method']} {scope['path']}", method=scope["method"], path=scope["path"]):
+            await self.app(scope, receive, send_wrapper)
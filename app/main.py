@@ -1,26 +1,83 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import os
 import time
+from datetime import datetime, timezone
 from dotenv import load_dotenv
-from .common.logger import logger
-from .factories.llm_factory import LLMFactory
+from .common.logger import logger, stats as logging_stats
 from .services.chat_service import ChatService
 from .services.news_service import NewsService
-from .repositories.chroma_repository import ChromaRepository
-from .instrumentation import configure_observability
+from .services.registry import registry
+from .repositories.answer_cache import answer_cache
+from .repositories.cache_thresholds import cache_thresholds, threshold_recorder
+from .repositories.news_cache import news_cache
+from .nodes.news_preprocessor import news_preprocessor
+from .repositories.search_cache import search_cache
+from .repositories.write_behind import write_behind_queue
+from .common.single_flight import llm_flight, search_flight
+from .services.news_digest import news_digests
+from .services.session_store import session_store
+from .graph.checkpointer import SnapshotMemorySaver, get_checkpointer
+from .instrumentation import MetricsMiddleware, TracingMiddleware, configure_observability
+from .common.metrics import metrics
+from .common.tracing import exporter as trace_exporter
+from .common import lazy
+from .services.prewarm import prewarmer
+from .services.health import health_monitor
+from .services.cache_compactor import cache_compactor
 
 load_dotenv()
 
 configure_observability()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    write_behind_queue.start()
+    cache_thresholds.load()
+    checkpointer = get_checkpointer()
+    if isinstance(checkpointer, SnapshotMemorySaver):
+        checkpointer.start()
+    health_monitor.start()
+    if os.getenv("PREWARM_ON_STARTUP", "true").lower() == "true":
+        # In the background so uvicorn accepts connections (and /health answers) within the container's start
+        # period; the graphs check keeps /ready at 503 until it finishes, then readiness is re-checked at once
+        prewarmer.start(on_done=health_monitor.check)
+    if os.getenv("NEWS_DIGEST_SCHEDULER_ENABLED", "true").lower() == "true":
+        news_digests.start()
+    if os.getenv("CACHE_COMPACTOR_ENABLED", "true").lower() == "true":
+        cache_compactor.start()
+    yield
+    await prewarmer.stop()
+    await health_monitor.stop()
+    await cache_compactor.stop()
+    await news_digests.stop()
+    await session_store.drain()
+    # Drain queued Q&A writes before the process exits
+    await asyncio.to_thread(write_behind_queue.stop)
+    search_cache.close()
+    if isinstance(checkpointer, SnapshotMemorySaver):
+        await asyncio.to_thread(checkpointer.stop)
+    await asyncio.to_thread(trace_exporter.flush)
+    await asyncio.to_thread(threshold_recorder.flush)
+
+
 app = FastAPI(
     title="Agentic AI Chatbot API",
     version="0.1.0",
-    description="FastAPI backend for GenAI Chatbot with ChromaDB and LangGraph"
+    description="FastAPI backend for GenAI Chatbot with ChromaDB and LangGraph",
+    lifespan=lifespan
 )
 
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # Configure CORS for Railway deployment
 app.add_middleware(
     CORSMiddleware,
@@ -37,41 +94,71 @@ class ChatRequest(BaseModel):
     usecase: str
     message: str
     embedding_model: Optional[str] = "nomic-embed-text"
+    session_id: Optional[str] = Field(None, max_length=128)
 
 
 class ChatResponse(BaseModel):
     content: str
     from_cache: bool = False
+    session_id: Optional[str] = None
+    query_id: Optional[str] = None
+
+
+class FeedbackRequest(BaseModel):
+    query_id: str = Field(..., min_length=1, max_length=64)
+    helpful: bool
 
 
 class NewsRequest(BaseModel):
     timeframe: str
-    embedding_model: Optional[str] = "nomic-embed-text"
 
 
 class NewsResponse(BaseModel):
     summary: str
     saved_file: Optional[str] = None
     from_cache: bool = False
+    frequency: Optional[str] = None
+    age_seconds: Optional[float] = None
+    stale: bool = False
+
+
+class CacheSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1)
+    usecase: str = "Basic Chatbot"
+    limit: int = Field(3, ge=1, le=10)
+    score_threshold: Optional[float] = None
+    # Only the app's own collections: opening an unknown name would create it (see ChromaManager._open_collection)
+    collection_name: Literal["qa_collection", "ai_news_collection"] = "qa_collection"
+    embedding_model: Optional[str] = "nomic-embed-text"
+
+
+class CacheSearchResult(BaseModel):
+    query: str
+    hits: List[Dict[str, Any]]
+
+
+class CacheSearchResponse(BaseModel):
+    results: List[CacheSearchResult]
+    hit_count: int
+    elapsed_ms: float
 
 
 # Application startup time
 start_time = time.time()
 
 @app.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     try:
-        logger.info(f"Chat request received: provider={req.provider}, model={req.model}, usecase={req.usecase}, message={req.message}")
+        logger.info("Chat request received: provider=%s, model=%s, usecase=%s", req.provider, req.model, req.usecase)
+        logger.debug("Chat message: %s", req.message)
         service = ChatService(provider=req.provider, model=req.model, embedding_model=req.embedding_model)
-        logger.info("ChatService initialized successfully")
-        result = service.run(req.usecase, req.message)
-        logger.info(f"ChatService.run() returned: {result}")
+        query_id = threshold_recorder.start_query()
+        result = await service.run(req.usecase, req.message, session_id=req.session_id)
         
         if req.usecase == "AI News":
             raise HTTPException(status_code=400, detail="Use /news/summary for AI News")
             
         messages = result.get("messages")
-        logger.info(f"Messages from result: {messages} (type: {type(messages)})")
         
         if hasattr(messages, "content"):
             content = messages.content
@@ -85,8 +172,8 @@ def chat(req: ChatRequest):
         if isinstance(content, str) and "[This response was retrieved from previous similar questions]" in content:
             from_cache = True
             
-        logger.info(f"Returning ChatResponse: content={content}, from_cache={from_cache}")
-        return ChatResponse(content=content, from_cache=from_cache)
+        logger.info("Returning ChatResponse: %d chars, from_cache=%s", len(content) if isinstance(content, str) else 0, from_cache)
+        return ChatResponse(content=content, from_cache=from_cache, session_id=req.session_id, query_id=query_id)
         
     except HTTPException:
         raise
@@ -97,6 +184,32 @@ def chat(req: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    if req.usecase == "AI News":
+        raise HTTPException(status_code=400, detail="Use /news/summary for AI News")
+    service = ChatService(provider=req.provider, model=req.model, embedding_model=req.embedding_model)
+
+    async def event_stream():
+        # Flush an event straight away so time-to-first-byte doesn't wait on the cache lookup or the LLM
+        yield f"event: start\ndata: {json.dumps({'query_id': threshold_recorder.start_query()})}\n\n"
+        try:
+            async for event, payload in service.stream(req.usecase, req.message, session_id=req.session_id):
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/chat/feedback")
+def chat_feedback(req: FeedbackRequest):
+    """Mark the answer to a query_id (from /chat or /chat/stream) as helpful or not, for cache threshold tuning."""
+    threshold_recorder.record_feedback(req.query_id, req.helpful)
+    return {"recorded": threshold_recorder.enabled}
+
+
 def map_timeframe_to_frequency(text: str) -> str:
     t = text.lower()
     if "24" in t or "day" in t:
@@ -111,14 +224,18 @@ def map_timeframe_to_frequency(text: str) -> str:
 
 
 @app.post("/news/summary", response_model=NewsResponse)
-def news_summary(req: NewsRequest):
+async def news_summary(req: NewsRequest):
     try:
-        service = NewsService(embedding_model=req.embedding_model)
-        result = service.run(req.timeframe)
-        summary = result.get("summary", "")
-        saved_file = result.get("filename") or result.get("saved_file")
-        from_cache = result.get("from_cache", False)
-        return NewsResponse(summary=summary, saved_file=saved_file, from_cache=from_cache)
+        # Served from the precomputed digest; a stale digest is returned immediately and refreshed in the background
+        digest = await news_digests.get_or_refresh(NewsService.map_timeframe(req.timeframe))
+        return NewsResponse(
+            summary=digest.get("summary", ""),
+            saved_file=digest.get("filename"),
+            from_cache=digest.get("from_cache", False),
+            frequency=digest["frequency"],
+            age_seconds=digest["age_seconds"],
+            stale=digest["stale"],
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -126,6 +243,114 @@ def news_summary(req: NewsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/cache/search", response_model=CacheSearchResponse)
+async def cache_search(req: CacheSearchRequest):
+    try:
+        t0 = time.perf_counter()
+        repo = await asyncio.to_thread(registry.get_repository, req.collection_name, req.embedding_model)
+        batched = await repo.asearch_many(req.queries, usecase=req.usecase, limit=req.limit, score_threshold=req.score_threshold if req.score_threshold is not None else cache_thresholds.get(req.usecase))
+        results = [CacheSearchResult(query=query, hits=hits) for query, hits in zip(req.queries, batched)]
+        return CacheSearchResponse(
+            results=results,
+            hit_count=sum(1 for r in results if r.hits),
+            elapsed_ms=round((time.perf_counter() - t0) * 1000, 3),
+        )
+    except Exception as e:
+        logger.error(f"Cache search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/stats/registry")
+def registry_stats():
+    return registry.stats()
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    return {**answer_cache.stats(), "news": news_cache.stats(), "search": search_cache.stats()}
+
+
+@app.get("/stats/write-behind")
+def write_behind_stats():
+    return write_behind_queue.stats()
+
+
+@app.get("/stats/single-flight")
+def single_flight_stats():
+    return {"llm": llm_flight.stats(), "tavily": search_flight.stats()}
+
+
+@app.get("/stats/news-digests")
+def news_digest_stats():
+    return news_digests.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/stats/sessions")
+def session_stats():
+    return session_store.stats()
+
+
+@app.get("/stats/checkpoints")
+def checkpoint_stats():
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "type": type(checkpointer).__name__,
+        "threads": len(checkpointer.storage),
+        "snapshots": getattr(checkpointer, "snapshots", 0),
+    }
+
+
+@app.get("/stats/news-preprocessing")
+def news_preprocessing_stats():
+    return news_preprocessor.stats()
+
+
+@app.get("/stats/startup")
+def startup_stats():
+    return {"prewarm": prewarmer.stats(), "lazy_imports": lazy.stats()}
+
+
+@app.get("/stats/cache-thresholds")
+def cache_threshold_stats():
+    return {**cache_thresholds.stats(), "recorder": threshold_recorder.stats()}
+
+
+@app.get("/stats/cache-compaction")
+def cache_compaction_stats():
+    return cache_compactor.stats()
+
+
+@app.get("/stats/logging")
+def logging_stats_endpoint():
+    return logging_stats()
+
+
+@app.get("/health")
+def health():
+    """Liveness: answers from memory only; dependency states come from the last background check."""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "version": app.version,
+        "uptime_seconds": round(time.time() - start_time, 1),
+        "services": {name: health_monitor.service_status(name) for name in ("chroma_db", "llm_provider", "embedding_model", "graphs")},
+    }
+
+
+@app.get("/ready")
+def ready():
+    readiness = health_monitor.readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
 @app.get("/")
 def root():
     return {"message": "Agentic AI Chatbot API", "version": "0.1.0", "status": "running"}
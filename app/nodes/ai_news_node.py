@@ -1,49 +1,72 @@
-from tavily import TavilyClient
+import asyncio
+import os
 from langchain_core.prompts import ChatPromptTemplate
+from ..common.lazy import lazy_import
 from ..common.logger import logger
+from ..common.single_flight import search_flight
+from ..repositories.search_cache import search_cache
+from .news_preprocessor import news_preprocessor
+from .news_summarizer import MapReduceSummarizer, format_article
+
+tavily = lazy_import("tavily")
 
 class AINewsNode:
     def __init__(self,llm):
         logger.info("Initializing AINewsNode")
-        self.tavily = TavilyClient()
+        self.tavily = tavily.TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
         self.llm = llm
-        self.state = {}
+        self.summarizer = MapReduceSummarizer(llm, self._summary_prompt)
+        self.preprocessor = news_preprocessor
 
-    def fetch_news(self, state: dict) -> dict:
-        logger.info("Starting news fetch process")
+    @staticmethod
+    def resolve_frequency(state: dict) -> str:
         msg = state.get('messages')
         if isinstance(msg, list) and len(msg) > 0:
             first = msg[0]
             if hasattr(first, 'content'):
-                frequency = str(first.content).lower()
-            else:
-                frequency = str(first).lower()
-        elif isinstance(msg, str):
-            frequency = msg.lower()
-        else:
-            frequency = str(state.get('frequency', 'daily')).lower()
-        logger.debug(f"Fetching news with frequency: {frequency}")
-        self.state['frequency'] = frequency
+                return str(first.content).lower()
+            return str(first).lower()
+        if isinstance(msg, str):
+            return msg.lower()
+        return str(state.get('frequency', 'daily')).lower()
+
+    def _search_news(self, frequency: str) -> list:
         time_range_map = {'daily': 'd', 'weekly': 'w', 'monthly': 'm', 'year': 'y'}
         days_map = {'daily': 1, 'weekly': 7, 'monthly': 30, 'year': 366}
-        logger.info(f"Querying Tavily API for {frequency} AI news")
-        response = self.tavily.search(
-            query="Top Artificial Intelligence (AI) technology news India and globally",
-            topic="news",
-            time_range=time_range_map[frequency],
-            include_answer="advanced",
-            max_results=20,
-            days=days_map[frequency],
-        )
-        state['news_data'] = response.get('results', [])
-        self.state['news_data'] = state['news_data']
-        logger.info(f"Successfully fetched {len(state['news_data'])} news articles")
-        return state
-    
-    def summarize_news(self, state: dict) -> dict:
-        logger.info("Starting news summarization process")
-        news_items = self.state['news_data']
-        logger.debug(f"Summarizing {len(news_items)} news articles")
+        query = "Top Artificial Intelligence (AI) technology news India and globally"
+        params = {
+            "topic": "news",
+            "time_range": time_range_map[frequency],
+            "include_answer": "advanced",
+            "max_results": 20,
+            "days": days_map[frequency],
+        }
+
+        def search():
+            logger.info(f"Querying Tavily API for {frequency} AI news")
+            return self.tavily.search(query=query, **params)
+
+        response = search_cache.get_or_fetch(query, params, search)
+        return response.get('results', [])
+
+    def fetch_news(self, state: dict) -> dict:
+        logger.info("Starting news fetch process")
+        frequency = self.resolve_frequency(state)
+        logger.debug(f"Fetching news with frequency: {frequency}")
+        news_data = search_flight.do(("news", frequency), lambda: self._search_news(frequency))
+        logger.info(f"Successfully fetched {len(news_data)} news articles")
+        return {"frequency": frequency, "news_data": news_data}
+
+    async def afetch_news(self, state: dict) -> dict:
+        logger.info("Starting news fetch process")
+        frequency = self.resolve_frequency(state)
+        # TavilyClient is blocking (requests), keep it off the event loop; concurrent requests share one search
+        news_data = await search_flight.ado(("news", frequency), lambda: asyncio.to_thread(self._search_news, frequency))
+        logger.info(f"Successfully fetched {len(news_data)} news articles")
+        return {"frequency": frequency, "news_data": news_data}
+
+    @staticmethod
+    def _summary_prompt(news_items: list) -> str:
         prompt_template = ChatPromptTemplate.from_messages([
             ("system", """Summarize AI news articles into markdown format. For each item include:
             - Date in **YYYY-MM-DD** format in IST timezone
@@ -55,27 +78,36 @@ class AINewsNode:
             - [Summary](URL)"""),
             ("user", "Articles:\n{articles}")
         ])
-        articles_str = "\n\n".join([
-            f"Content: {item.get('content', '')}\nURL: {item.get('url', '')}\nDate: {item.get('published_date', '')}"
-            for item in news_items
-        ])
+        articles_str = "\n\n".join(format_article(item) for item in news_items)
+        return prompt_template.format(articles=articles_str)
+
+    def summarize_news(self, state: dict) -> dict:
+        logger.info("Starting news summarization process")
+        news_items, preprocessing = self.preprocessor.process(state.get('news_data') or [])
+        logger.debug(f"Summarizing {len(news_items)} news articles")
         logger.info("Invoking LLM for news summarization")
-        response = self.llm.invoke(prompt_template.format(articles=articles_str))
-        state['summary'] = response.content
-        self.state['summary'] = state['summary']
+        summary = self.summarizer.summarize(news_items)
+        logger.info("News summarization completed")
+        return {"summary": summary, "preprocessing": preprocessing}
+
+    async def asummarize_news(self, state: dict) -> dict:
+        logger.info("Starting news summarization process")
+        news_items, preprocessing = self.preprocessor.process(state.get('news_data') or [])
+        summary = await self.summarizer.asummarize(news_items)
         logger.info("News summarization completed")
-        return self.state
-    
+        return {"summary": summary, "preprocessing": preprocessing}
+
     def save_result(self,state):
         logger.info("Starting to save summarized results")
-        frequency = self.state['frequency']
-        summary = self.state['summary']
+        frequency = state.get('frequency') or self.resolve_frequency(state)
+        summary = state.get('summary', '')
         filename = f"./AINews/{frequency}_summary.md"
         logger.debug(f"Saving summary to file: {filename}")
         with open(filename, 'w') as f:
             f.write(f"# {frequency.capitalize()} AI News Summary\n\n")
             f.write(summary)
-        self.state['filename'] = filename
         logger.info(f"Successfully saved summary to {filename}")
-        return self.state
+        return {"filename": filename}
 
+    async def asave_result(self, state):
+        return await asyncio.to_thread(self.save_result, state)
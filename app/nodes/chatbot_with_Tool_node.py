@@ -1,5 +1,5 @@
-from langgraph.prebuilt import ToolNode
 from ..common.logger import logger
+from ..common.tracing import traced_node
 
 class ChatbotWithToolNode:
     def __init__(self, llm):
@@ -7,5 +7,12 @@ class ChatbotWithToolNode:
 
     def create_chatbot(self, tools):
         logger.info("Creating chatbot with tool node")
-        return ToolNode(tools=tools)
+        llm_with_tools = self.llm.bind_tools(tools)
 
+        def chatbot(state: dict) -> dict:
+            return {"messages": [llm_with_tools.invoke(state["messages"])]}
+
+        async def achatbot(state: dict) -> dict:
+            return {"messages": [await llm_with_tools.ainvoke(state["messages"])]}
+
+        return traced_node("chatbot", chatbot, achatbot)
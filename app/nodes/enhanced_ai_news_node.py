@@ -1,53 +1,62 @@
-from typing import Dict, Any
-import json
-from ..state.state import State
+from typing import Dict, Any, Optional
+from ..state.state import NewsState
 from ..common.logger import logger
 from ..repositories.chroma_repository import ChromaRepository
+from ..repositories.news_cache import NewsCache, dedupe_by_url, news_cache
 from .ai_news_node import AINewsNode
 
 class EnhancedAINewsNode(AINewsNode):
-    def __init__(self, model, embedding_model: str = "nomic-embed-text"):
+    def __init__(self, model, embedding_model: str = "nomic-embed-text", chroma_repo: Optional[ChromaRepository] = None, cache: Optional[NewsCache] = None):
         super().__init__(model)
-        self.chroma_repo = ChromaRepository(collection_name="ai_news_collection", embedding_model=embedding_model)
-        self.similarity_threshold = 0.75
-
-    def fetch_news(self, state: State) -> Dict[str, Any]:
-        logger.info("Enhanced AI News: Fetching news with vector search")
-        messages = state.get('messages', [])
-        if messages:
-            user_query = messages[-1].content if hasattr(messages[-1], 'content') else str(messages[-1])
-        else:
-            user_query = state.get('user_message', 'latest AI news')
-        similar_requests = self.chroma_repo.search(query=user_query, usecase="AI News", limit=3, score_threshold=self.similarity_threshold)
-        if similar_requests:
-            logger.info(f"Found similar news request with score: {similar_requests[0]['score']}")
-            cached_news = similar_requests[0]['answer']
-            try:
-                if isinstance(cached_news, str) and cached_news.startswith('{'):
-                    cached_data = json.loads(cached_news)
-                    return {"news_data": cached_data, "from_cache": True}
-            except json.JSONDecodeError:
-                logger.warning("Could not parse cached news data")
-        result = super().fetch_news(state)
-        news_data = result.get('news_data', {})
-        self.chroma_repo.store(
-            question=user_query,
-            answer=json.dumps(news_data) if news_data else "No news data available",
-            usecase="AI News",
-            metadata={"type": "news_fetch", "from_cache": False}
-        )
-        return result
+        self.chroma_repo = chroma_repo or ChromaRepository(collection_name="ai_news_collection", embedding_model=embedding_model)
+        # News is time-sensitive, so fetched articles are cached by frequency with a TTL rather than by semantic similarity
+        self.news_cache = cache or news_cache
+
+    def _cached_news(self, frequency: str) -> Optional[Dict[str, Any]]:
+        cached = self.news_cache.get(frequency)
+        if cached is None:
+            return None
+        logger.info(f"Serving {len(cached)} cached {frequency} news articles")
+        return {"frequency": frequency, "news_data": cached, "from_cache": True}
+
+    def _remember(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        news_data = dedupe_by_url(result.get('news_data') or [])
+        self.news_cache.put(result['frequency'], news_data)
+        return {**result, "news_data": news_data, "from_cache": False}
+
+    @staticmethod
+    def _summary_store_kwargs(state: NewsState, summary: str) -> Dict[str, Any]:
+        query = f"AI news summary for {state.get('frequency', 'recent')}"
+        return {"question": query, "answer": summary, "usecase": "AI News", "metadata": {"type": "news_summary", "from_cache": state.get('from_cache', False)}}
+
+    def fetch_news(self, state: NewsState) -> Dict[str, Any]:
+        logger.info("Enhanced AI News: Fetching news")
+        cached = self._cached_news(self.resolve_frequency(state))
+        if cached:
+            return cached
+        return self._remember(super().fetch_news(state))
 
-    def summarize_news(self, state: State) -> Dict[str, Any]:
+    async def afetch_news(self, state: NewsState) -> Dict[str, Any]:
+        logger.info("Enhanced AI News: Fetching news")
+        cached = self._cached_news(self.resolve_frequency(state))
+        if cached:
+            return cached
+        return self._remember(await super().afetch_news(state))
+
+    def summarize_news(self, state: NewsState) -> Dict[str, Any]:
         logger.info("Enhanced AI News: Summarizing news")
-        from_cache = state.get('from_cache', False)
-        if from_cache:
+        if state.get('from_cache', False):
             logger.info("Processing cached news data")
         result = super().summarize_news(state)
         summary = result.get('summary', '')
         if summary:
-            news_data = state.get('news_data', {})
-            query = f"AI news summary for {news_data.get('timeframe', 'recent')}"
-            self.chroma_repo.store(question=query, answer=summary, usecase="AI News", metadata={"type": "news_summary", "from_cache": from_cache})
+            self.chroma_repo.store(**self._summary_store_kwargs(state, summary))
         return result
 
+    async def asummarize_news(self, state: NewsState) -> Dict[str, Any]:
+        logger.info("Enhanced AI News: Summarizing news")
+        result = await super().asummarize_news(state)
+        summary = result.get('summary', '')
+        if summary:
+            await self.chroma_repo.astore(**self._summary_store_kwargs(state, summary))
+        return result
@@ -1,51 +1,130 @@
-from typing import Dict, Any
+import hashlib
+from typing import Dict, Any, Hashable, List, Optional
 from langchain_core.messages import AIMessage
 from ..state.state import State
 from ..common.logger import logger
+from ..common.single_flight import llm_flight
+from ..database import cache_policy
+from ..database.cache_policy import model_tag
 from ..repositories.chroma_repository import ChromaRepository
+from ..repositories.answer_cache import AnswerCache, answer_cache, normalize_question
+from ..repositories.cache_thresholds import CacheThresholds, ThresholdRecorder, cache_thresholds, threshold_recorder
+
+CACHE_NOTICE = "*[This response was retrieved from previous similar questions]*"
 
 class EnhancedChatbotNode:
-    def __init__(self, model, embedding_model: str = "nomic-embed-text"):
+    def __init__(self, model, embedding_model: str = "nomic-embed-text", chroma_repo: Optional[ChromaRepository] = None, cache: Optional[AnswerCache] = None,
+                 thresholds: Optional[CacheThresholds] = None, recorder: Optional[ThresholdRecorder] = None):
         self.llm = model
-        self.chroma_repo = ChromaRepository(embedding_model=embedding_model)
-        self.similarity_threshold = 0.8
+        # Stored with each answer; searches only serve answers this model produced (CACHE_MATCH_MODEL)
+        self.model_tag = model_tag(model)
+        self.chroma_repo = chroma_repo or ChromaRepository(embedding_model=embedding_model)
+        self.answer_cache = cache or answer_cache
+        # Tuned per usecase offline from recorded lookups, see app.cli.tune_thresholds
+        self.thresholds = thresholds or cache_thresholds
+        self.recorder = recorder or threshold_recorder
+
+    def similarity_threshold(self, usecase: str) -> float:
+        return self.thresholds.get(usecase)
+
+    @staticmethod
+    def _user_question(messages: List[Any]) -> str:
+        # Get the last message content properly
+        last_message = messages[-1]
+        if hasattr(last_message, 'content'):
+            return last_message.content
+        if isinstance(last_message, dict):
+            return last_message.get('content', str(last_message))
+        return str(last_message)
+
+    def _flight_key(self, usecase: str, user_question: str, messages: List[Any]) -> Hashable:
+        """Identical concurrent questions (same model, usecase and prior turns) share one LLM call"""
+        history = "\x00".join(str(getattr(m, 'content', m)) for m in messages[:-1])
+        return (id(self.llm), usecase, normalize_question(user_question), hashlib.sha1(history.encode()).hexdigest())
+
+    @staticmethod
+    def _has_context(messages: List[Any]) -> bool:
+        # Answers to follow-ups depend on earlier turns, so they can't be served from or stored in question-keyed caches
+        return len(messages) > 1
+
+    @staticmethod
+    def _cached_message(cached_answer: str) -> Dict[str, Any]:
+        # Return proper AIMessage
+        return {"messages": [AIMessage(content=f"{cached_answer}\n\n{CACHE_NOTICE}")]}
+
+    def _cached_response(self, user_question: str, usecase: str, similar_questions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        threshold = self.similarity_threshold(usecase)
+        served = bool(similar_questions) and similar_questions[0]['score'] > threshold
+        explored = bool(similar_questions) and not served and self.recorder.explore(similar_questions[0]['score'])
+        self.recorder.record_lookup(usecase, user_question, similar_questions, served or explored, threshold, explored)
+        if explored:
+            # Not put in the L1 cache: one exploratory answer shouldn't be repeated to everyone asking the same
+            self.answer_cache.record(usecase, "l2_hits")
+            return self._cached_message(similar_questions[0]['answer'])
+        if served:
+            logger.info("Found similar question with score: %s", similar_questions[0]['score'])
+            cached_answer = similar_questions[0]['answer']
+            self.answer_cache.record(usecase, "l2_hits")
+            self.answer_cache.put(usecase, user_question, cached_answer, self.model_tag, similar_questions[0].get('metadata', {}).get('expires_at'))
+            return self._cached_message(cached_answer)
+        self.answer_cache.record(usecase, "misses")
+        return None
+
+    def _store_kwargs(self, user_question: str, usecase: str, response: Any) -> Dict[str, Any]:
+        answer_content = response.content if hasattr(response, 'content') else str(response)
+        return {"question": user_question, "answer": answer_content, "usecase": usecase, "metadata": {"model": self.model_tag, "method": "llm_generated"}}
 
     def process(self, state: State) -> Dict[str, Any]:
-        logger.info(f"EnhancedChatbotNode processing state: {state}")
+        logger.debug("EnhancedChatbotNode processing state: %s", state)
         messages = state.get('messages', [])
         if not messages:
             logger.warning("No messages found in state")
             return {"messages": []}
-            
-        # Get the last message content properly
-        last_message = messages[-1]
-        if hasattr(last_message, 'content'):
-            user_question = last_message.content
-        elif isinstance(last_message, dict):
-            user_question = last_message.get('content', str(last_message))
-        else:
-            user_question = str(last_message)
-            
+
+        user_question = self._user_question(messages)
         usecase = state.get('usecase', 'Basic Chatbot')
-        similar_questions = self.chroma_repo.search(query=user_question, usecase=usecase, limit=3, score_threshold=self.similarity_threshold)
-        
-        if similar_questions and similar_questions[0]['score'] > self.similarity_threshold:
-            logger.info(f"Found similar question with score: {similar_questions[0]['score']}")
-            cached_answer = similar_questions[0]['answer']
-            enhanced_answer_content = f"{cached_answer}\n\n*[This response was retrieved from previous similar questions]*"
-            # Return proper AIMessage
-            return {"messages": [AIMessage(content=enhanced_answer_content)]}
-            
+        if self._has_context(messages):
+            response = llm_flight.do(self._flight_key(usecase, user_question, messages), lambda: self.llm.invoke(messages))
+            return {"messages": response}
+        l1_answer = self.answer_cache.get(usecase, user_question, self.model_tag)
+        if l1_answer is not None:
+            return self._cached_message(l1_answer)
+        similar_questions = self.chroma_repo.search(query=user_question, usecase=usecase, limit=3, score_threshold=self.recorder.search_floor(self.similarity_threshold(usecase)), model=self.model_tag)
+        cached = self._cached_response(user_question, usecase, similar_questions)
+        if cached:
+            return cached
+
         logger.info("No similar questions found, generating new response")
-        response = self.llm.invoke(state['messages'])
-        
-        if hasattr(response, 'content'):
-            answer_content = response.content
-        else:
-            answer_content = str(response)
-            
-        self.chroma_repo.store(question=user_question, answer=answer_content, usecase=usecase, metadata={"model": str(self.llm), "method": "llm_generated"})
-        
+        response = llm_flight.do(self._flight_key(usecase, user_question, messages), lambda: self.llm.invoke(messages))
+        store_kwargs = self._store_kwargs(user_question, usecase, response)
+        self.answer_cache.put(usecase, user_question, store_kwargs["answer"], self.model_tag, cache_policy.expiry_metadata(usecase)["expires_at"])
+        self.chroma_repo.store(**store_kwargs)
+
         # Ensure response is an object or list of objects, but invoke usually returns AIMessage
         return {"messages": response}
 
+    async def aprocess(self, state: State) -> Dict[str, Any]:
+        messages = state.get('messages', [])
+        if not messages:
+            logger.warning("No messages found in state")
+            return {"messages": []}
+
+        user_question = self._user_question(messages)
+        usecase = state.get('usecase', 'Basic Chatbot')
+        if self._has_context(messages):
+            response = await llm_flight.ado(self._flight_key(usecase, user_question, messages), lambda: self.llm.ainvoke(messages))
+            return {"messages": response}
+        l1_answer = self.answer_cache.get(usecase, user_question, self.model_tag)
+        if l1_answer is not None:
+            return self._cached_message(l1_answer)
+        similar_questions = await self.chroma_repo.asearch(query=user_question, usecase=usecase, limit=3, score_threshold=self.recorder.search_floor(self.similarity_threshold(usecase)), model=self.model_tag)
+        cached = self._cached_response(user_question, usecase, similar_questions)
+        if cached:
+            return cached
+
+        logger.info("No similar questions found, generating new response")
+        response = await llm_flight.ado(self._flight_key(usecase, user_question, messages), lambda: self.llm.ainvoke(messages))
+        store_kwargs = self._store_kwargs(user_question, usecase, response)
+        self.answer_cache.put(usecase, user_question, store_kwargs["answer"], self.model_tag, cache_policy.expiry_metadata(usecase)["expires_at"])
+        await self.chroma_repo.astore(**store_kwargs)
+        return {"messages": response}
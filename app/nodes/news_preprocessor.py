@@ -0,0 +1,162 @@
+import os
+import re
+import threading
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..common.lazy import lazy_import
+from ..common.logger import logger
+from ..common.tokens import estimate_tokens
+from .news_summarizer import format_article
+
+np = lazy_import("numpy")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_BOILERPLATE = re.compile(
+    r"^\s*(advertisement|subscribe\b.*|sign up\b.*|read more\b.*|click here\b.*|share this\b.*|follow us\b.*|"
+    r"all rights reserved.*|cookie(s)? (policy|settings).*|skip to (main )?content)\s*$",
+    re.IGNORECASE,
+)
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def clean_content(text: str) -> str:
+    """Drop boilerplate lines (ads, subscribe prompts, cookie banners) and collapse whitespace."""
+    lines = [line for line in str(text or "").splitlines() if not _BOILERPLATE.match(line)]
+    return re.sub(r"\s+", " ", " ".join(lines)).strip()
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[: max_tokens * 4]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > 0 else cut).rstrip() + "…"
+
+
+def parse_published_date(value: Any) -> datetime:
+    """Parse Tavily's RFC 2822 or ISO dates; unknown dates sort last."""
+    if not value:
+        return _EPOCH
+    text = str(value).strip()
+    for parse in (parsedate_to_datetime, lambda v: datetime.fromisoformat(v.replace("Z", "+00:00"))):
+        try:
+            parsed = parse(text)
+        except (TypeError, ValueError, IndexError):
+            continue
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return _EPOCH
+
+
+class MinHasher:
+    """MinHash signatures over word shingles for estimating Jaccard similarity between articles."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.shingle_size = shingle_size
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set:
+        words = re.findall(r"\w+", text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> Optional["np.ndarray"]:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # (a * h + b) mod p for every permutation/shingle pair; uint64 wraparound is fine for hashing
+        permuted = ((np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(a: "np.ndarray", b: "np.ndarray") -> float:
+        return float(np.mean(a == b))
+
+
+class NewsPreprocessor:
+    """Shrinks a Tavily result batch before summarization.
+
+    Articles stream through cleaning and near-duplicate removal, then are
+    sorted latest first, trimmed to a per-article token budget and cut off
+    at a total prompt budget. Tokens saved are tracked per run and overall.
+    """
+
+    def __init__(self, article_max_tokens: Optional[int] = None, total_max_tokens: Optional[int] = None, duplicate_threshold: Optional[float] = None):
+        self.article_max_tokens = article_max_tokens or int(os.getenv("NEWS_ARTICLE_MAX_TOKENS", "300"))
+        self.total_max_tokens = total_max_tokens or int(os.getenv("NEWS_PROMPT_MAX_TOKENS", "6000"))
+        self.duplicate_threshold = duplicate_threshold or float(os.getenv("NEWS_DUPLICATE_THRESHOLD", "0.8"))
+        self._hasher: Optional[MinHasher] = None
+        self._lock = threading.Lock()
+        self.totals = {"runs": 0, "articles_in": 0, "articles_out": 0, "duplicates_removed": 0, "tokens_before": 0, "tokens_after": 0}
+
+    @property
+    def hasher(self) -> MinHasher:
+        # Built on first use so importing this module doesn't import numpy
+        if self._hasher is None:
+            self._hasher = MinHasher()
+        return self._hasher
+
+    def _cleaned(self, articles: Iterable[dict]) -> Iterator[dict]:
+        for article in articles:
+            yield {**article, "content": clean_content(article.get("content", ""))}
+
+    def _deduped(self, articles: Iterable[dict], counts: Dict[str, int]) -> Iterator[dict]:
+        kept: List["np.ndarray"] = []
+        for article in articles:
+            signature = self.hasher.signature(article["content"])
+            if signature is not None:
+                if any(self.hasher.similarity(signature, other) >= self.duplicate_threshold for other in kept):
+                    counts["duplicates_removed"] += 1
+                    continue
+                kept.append(signature)
+            yield article
+
+    def process(self, articles: List[dict]) -> Tuple[List[dict], Dict[str, int]]:
+        counts = {"articles_in": len(articles), "duplicates_removed": 0}
+        tokens_before = sum(estimate_tokens(format_article(a)) for a in articles)
+
+        unique = sorted(
+            self._deduped(self._cleaned(articles), counts),
+            key=lambda a: parse_published_date(a.get("published_date")),
+            reverse=True,
+        )
+        selected: List[dict] = []
+        used = 0
+        for article in unique:
+            article = {**article, "content": trim_to_tokens(article["content"], self.article_max_tokens)}
+            cost = estimate_tokens(format_article(article))
+            if selected and used + cost > self.total_max_tokens:
+                break
+            selected.append(article)
+            used += cost
+
+        stats = {
+            **counts,
+            "articles_out": len(selected),
+            "tokens_before": tokens_before,
+            "tokens_after": used,
+            "tokens_saved": tokens_before - used,
+        }
+        with self._lock:
+            self.totals["runs"] += 1
+            for key in ("articles_in", "articles_out", "duplicates_removed", "tokens_before", "tokens_after"):
+                self.totals[key] += stats[key]
+        logger.info(f"Preprocessed news: {stats['articles_in']} -> {stats['articles_out']} articles, {stats['tokens_before']} -> {stats['tokens_after']} tokens")
+        return selected, stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = dict(self.totals)
+        totals["tokens_saved"] = totals["tokens_before"] - totals["tokens_after"]
+        totals["tokens_saved_ratio"] = round(totals["tokens_saved"] / totals["tokens_before"], 4) if totals["tokens_before"] else 0.0
+        return totals
+
+
+news_preprocessor = NewsPreprocessor()
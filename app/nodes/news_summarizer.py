@@ -0,0 +1,95 @@
+import asyncio
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from ..common.logger import logger
+from ..common.tokens import estimate_tokens
+
+UNDATED = "Undated"
+_DATE_HEADER = re.compile(r"^#{2,4}\s*\[?(?P<date>[^\]]+?)\]?\s*$")
+
+
+def format_article(item: dict) -> str:
+    return f"Content: {item.get('content', '')}\nURL: {item.get('url', '')}\nDate: {item.get('published_date', '')}"
+
+
+def chunk_articles(news_items: List[dict], max_tokens: int) -> List[List[dict]]:
+    """Group articles in order so each group's formatted text stays within max_tokens.
+
+    An article larger than the budget on its own still gets a group of its own.
+    """
+    chunks: List[List[dict]] = []
+    current: List[dict] = []
+    used = 0
+    for item in news_items:
+        cost = estimate_tokens(format_article(item))
+        if current and used + cost > max_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def merge_summaries(summaries: List[str]) -> str:
+    """Merge partial markdown digests into one, grouping bullets under their date headers, latest first."""
+    sections: Dict[str, List[str]] = {}
+    for summary in summaries:
+        date = UNDATED
+        for line in summary.splitlines():
+            stripped = line.strip()
+            header = _DATE_HEADER.match(stripped)
+            if header:
+                date = header.group("date").strip()
+                continue
+            if stripped.startswith(("-", "*")):
+                bullets = sections.setdefault(date, [])
+                if stripped not in bullets:
+                    bullets.append(stripped)
+    dated = sorted((d for d in sections if d != UNDATED), reverse=True)
+    if UNDATED in sections:
+        dated.append(UNDATED)
+    return "\n\n".join(f"### {date}\n" + "\n".join(sections[date]) for date in dated)
+
+
+class MapReduceSummarizer:
+    """Summarizes large article batches by summarizing token-budgeted chunks in parallel and merging the results.
+
+    A batch that fits in a single chunk is summarized with one LLM call, as before.
+    """
+
+    def __init__(self, llm, prompt_builder: Callable[[List[dict]], str], chunk_tokens: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.llm = llm
+        self.prompt_builder = prompt_builder
+        self.chunk_tokens = chunk_tokens or int(os.getenv("NEWS_SUMMARY_CHUNK_TOKENS", "3000"))
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv("NEWS_SUMMARY_MAX_CONCURRENCY", "4")))
+
+    def _summarize_chunk(self, chunk: List[dict]) -> str:
+        return self.llm.invoke(self.prompt_builder(chunk)).content
+
+    def summarize(self, news_items: List[dict]) -> str:
+        chunks = chunk_articles(news_items, self.chunk_tokens)
+        if len(chunks) <= 1:
+            return self._summarize_chunk(news_items)
+        logger.info(f"Summarizing {len(news_items)} articles in {len(chunks)} chunks ({self.max_concurrency} at a time)")
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as pool:
+            partials = list(pool.map(self._summarize_chunk, chunks))
+        return merge_summaries(partials)
+
+    async def asummarize(self, news_items: List[dict]) -> str:
+        chunks = chunk_articles(news_items, self.chunk_tokens)
+        if len(chunks) <= 1:
+            return (await self.llm.ainvoke(self.prompt_builder(news_items))).content
+        logger.info(f"Summarizing {len(news_items)} articles in {len(chunks)} chunks ({self.max_concurrency} at a time)")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def summarize_chunk(chunk: List[dict]) -> str:
+            async with semaphore:
+                return (await self.llm.ainvoke(self.prompt_builder(chunk))).content
+
+        partials = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+        return merge_summaries(list(partials))
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from ..common.lru_cache import LRUCache
+from ..common.metrics import ANSWER_CACHE_REQUESTS
+from ..database import cache_policy
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation so trivial variants share a key."""
+    return _WHITESPACE.sub(" ", question.casefold()).strip().rstrip("?!. ")
+
+
+class AnswerCache:
+    """In-process exact-match (L1) answer cache sitting in front of the Chroma semantic (L2) cache.
+
+    Also keeps per-usecase counters for both tiers so similarity thresholds can be tuned.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.cache = LRUCache(
+            maxsize=maxsize or int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2048")),
+            ttl=ttl if ttl is not None else float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+            name="answer_l1",
+        )
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, int]] = defaultdict(lambda: {"l1_hits": 0, "l2_hits": 0, "misses": 0})
+
+    @staticmethod
+    def key(usecase: str, question: str, model: Optional[str] = None) -> str:
+        # Same isolation as the L2 search: a CACHE_VERSION bump or another model never sees these answers
+        scope = f"{cache_policy.cache_version()}\x00{model if model and cache_policy.match_model() else ''}"
+        return hashlib.sha1(f"{scope}\x00{usecase}\x00{normalize_question(question)}".encode()).hexdigest()
+
+    def get(self, usecase: str, question: str, model: Optional[str] = None) -> Optional[str]:
+        answer = self.cache.get(self.key(usecase, question, model))
+        if answer is not None:
+            self.record(usecase, "l1_hits")
+        return answer
+
+    def put(self, usecase: str, question: str, answer: str, model: Optional[str] = None, expires_at: Optional[int] = None) -> None:
+        """Cache answer for the L1 TTL, or only until expires_at (epoch seconds) when the stored entry expires sooner."""
+        ttl = self.cache.ttl
+        if expires_at is not None and expires_at < cache_policy.NEVER:
+            remaining = expires_at - cache_policy.now()
+            if remaining <= 0:
+                return
+            ttl = min(ttl, remaining) if ttl else remaining
+        self.cache.set(self.key(usecase, question, model), answer, ttl=ttl)
+
+    def record(self, usecase: str, outcome: str) -> None:
+        """Count an 'l1_hits', 'l2_hits' or 'misses' outcome for usecase."""
+        with self._lock:
+            self._tiers[usecase][outcome] += 1
+        ANSWER_CACHE_REQUESTS.inc(usecase=usecase, tier=outcome)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        with self._lock:
+            self._tiers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            usecases = {}
+            for usecase, counts in self._tiers.items():
+                lookups = counts["l1_hits"] + counts["l2_hits"] + counts["misses"]
+                l2_lookups = counts["l2_hits"] + counts["misses"]
+                usecases[usecase] = {
+                    **counts,
+                    "lookups": lookups,
+                    "l1_hit_ratio": round(counts["l1_hits"] / lookups, 4) if lookups else 0.0,
+                    "l2_hit_ratio": round(counts["l2_hits"] / l2_lookups, 4) if l2_lookups else 0.0,
+                    "overall_hit_ratio": round((counts["l1_hits"] + counts["l2_hits"]) / lookups, 4) if lookups else 0.0,
+                }
+        return {"l1": self.cache.stats(), "usecases": usecases}
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,191 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from ..common.logger import logger
+
+DEFAULT_THRESHOLD = 0.8
+
+# Set per request by ThresholdRecorder.start_query(); graph nodes run in a copy of the request's context
+_query_id: ContextVar[Optional[str]] = ContextVar("threshold_query_id", default=None)
+
+
+class ThresholdRecorder:
+    """Appends semantic-cache lookups and later user feedback to a compact JSONL file for offline tuning.
+
+    A lookup line holds the query, the top-k similarity scores, the best
+    candidate's question and whether it was served; a feedback line marks a
+    lookup id's answer as helpful or not. Lines are written by a background
+    thread so recording never blocks a request on file I/O.
+
+    Off unless THRESHOLD_RECORDER_ENABLED=true: the log holds raw user
+    questions, and while recording, cache searches retrieve candidates down to
+    THRESHOLD_RECORDER_MIN_SCORE (see search_floor), so Chroma returns more
+    rows per request. The file is rotated to ``<path>.1`` once it reaches
+    THRESHOLD_LOG_MAX_BYTES; the previous ``.1`` is dropped.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None, sample_rate: Optional[float] = None):
+        self.path = path or os.getenv("THRESHOLD_LOG_PATH", "./cache/threshold_log.jsonl")
+        self.enabled = enabled if enabled is not None else os.getenv("THRESHOLD_RECORDER_ENABLED", "false").lower() == "true"
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("THRESHOLD_RECORDER_SAMPLE_RATE", "1"))
+        # Lookups retrieve candidates down to this score so near misses are recorded too
+        self.min_score = float(os.getenv("THRESHOLD_RECORDER_MIN_SCORE", "0.5"))
+        # Feedback only labels answers that were served, so thresholds can't be lowered on evidence unless a
+        # small share of near misses is served too; off by default since those users see a weaker match
+        self.explore_rate = float(os.getenv("THRESHOLD_EXPLORE_RATE", "0"))
+        self.max_bytes = int(os.getenv("THRESHOLD_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+        self._queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.written = 0
+        self.feedback_count = 0
+        self.rotations = 0
+
+    def start_query(self) -> Optional[str]:
+        """Issue a fresh id for this request's lookup, returned to the client for /chat/feedback (None when not recording)."""
+        if not self.enabled:
+            return None
+        query_id = uuid.uuid4().hex
+        _query_id.set(query_id)
+        return query_id
+
+    def search_floor(self, threshold: float) -> float:
+        """Score floor for the cache search: lowered to min_score while recording so near misses get logged too."""
+        return min(threshold, self.min_score) if self.enabled else threshold
+
+    def explore(self, score: float) -> bool:
+        """Whether to serve a below-threshold candidate anyway so its feedback can label that score band."""
+        return self.enabled and self.explore_rate > 0 and score >= self.min_score and random.random() < self.explore_rate
+
+    def _put(self, entry: Dict[str, Any]) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="threshold-recorder", daemon=True)
+                    self._thread.start()
+        self.queued += 1
+        self._queue.put(entry)
+
+    def record_lookup(self, usecase: str, question: str, hits: List[Dict[str, Any]], served: bool, threshold: float, explored: bool = False) -> None:
+        if not self.enabled or (not explored and self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return
+        entry = {
+            "t": "l",
+            "id": _query_id.get() or uuid.uuid4().hex,
+            "ts": round(time.time(), 3),
+            "u": usecase,
+            "q": question,
+            "s": [round(float(h["score"]), 4) for h in hits],
+            "c": hits[0]["question"] if hits else None,
+            "hit": served,
+            "th": threshold,
+        }
+        if explored:
+            entry["x"] = 1
+        self._put(entry)
+
+    def record_feedback(self, query_id: str, helpful: bool) -> None:
+        if not self.enabled:
+            return
+        self.feedback_count += 1
+        self._put({"t": "f", "id": query_id, "ts": round(time.time(), 3), "ok": helpful})
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            lines = [entry]
+            # Drain whatever else is queued so bursts become one write
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._queue.put(None)
+                    break
+                lines.append(more)
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._rotate()
+                with open(self.path, "a") as f:
+                    f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+            except Exception as e:
+                logger.error(f"Writing threshold log {self.path} failed: {e}")
+            self.written += len(lines)
+
+    def _rotate(self) -> None:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if self.max_bytes > 0 and size >= self.max_bytes:
+            os.replace(self.path, f"{self.path}.1")
+            self.rotations += 1
+
+    def flush(self, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.written < self.queued and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "explore_rate": self.explore_rate,
+            "queued": self.queued,
+            "written": self.written,
+            "feedback": self.feedback_count,
+            "max_bytes": self.max_bytes,
+            "rotations": self.rotations,
+        }
+
+
+class CacheThresholds:
+    """Per-usecase semantic-cache thresholds recommended by ``python -m app.cli.tune_thresholds``.
+
+    Usecases the tuning file doesn't cover (or a missing file) use
+    SEMANTIC_CACHE_THRESHOLD.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("CACHE_THRESHOLDS_PATH", "./cache/cache_thresholds.json")
+        self.default = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", str(DEFAULT_THRESHOLD)))
+        self.thresholds: Dict[str, float] = {}
+        self.generated_at: Optional[str] = None
+
+    def load(self) -> Dict[str, float]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self.thresholds
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache thresholds {self.path}: {e}")
+            return self.thresholds
+        self.thresholds = {usecase: float(entry["threshold"]) for usecase, entry in data.get("usecases", {}).items()}
+        self.generated_at = data.get("generated_at")
+        logger.info(f"Loaded tuned cache thresholds from {self.path}: {self.thresholds}")
+        return self.thresholds
+
+    def get(self, usecase: str) -> float:
+        return self.thresholds.get(usecase, self.default)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "default": self.default, "generated_at": self.generated_at, "usecases": dict(self.thresholds)}
+
+
+threshold_recorder = ThresholdRecorder()
+cache_thresholds = CacheThresholds()
+cache_thresholds.load()
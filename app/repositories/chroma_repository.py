@@ -1,5 +1,7 @@
 import os
 from typing import List, Dict, Any, Optional
+from ..common.executor import chroma_executor, run_in_executor
+from .write_behind import WriteBehindQueue, write_behind_queue
 
 # Configuration switch to use lightweight version
 USE_LIGHTWEIGHT_DB = os.getenv("USE_LIGHTWEIGHT_DB", "false").lower() == "true"
@@ -12,20 +14,28 @@ else:
     print("Using standard ChromaDB manager")
 
 class ChromaRepository:
-    def __init__(self, collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text"):
+    def __init__(self, collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text", write_behind: Optional[WriteBehindQueue] = None):
         self.manager = ChromaManager(collection_name=collection_name, embedding_model=embedding_model)
+        self.write_behind = write_behind or write_behind_queue
 
-    def search(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.8) -> List[Dict[str, Any]]:
-        """Search for similar questions"""
+    def search(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for similar questions (only unexpired entries, and only model's answers when given)"""
         return self.manager.search_similar_questions(
             query=query, 
             usecase=usecase, 
             limit=limit, 
-            score_threshold=score_threshold
+            score_threshold=score_threshold,
+            model=model
         )
 
+    def search_many(self, queries: List[str], usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Search for similar questions for a batch of queries; one result list per query"""
+        return self.manager.search_many(queries=queries, usecase=usecase, limit=limit, score_threshold=score_threshold, model=model)
+
     def store(self, question: str, answer: str, usecase: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
-        """Store a question-answer pair"""
+        """Store a question-answer pair, via the write-behind queue when it is running"""
+        if self.write_behind.submit(self.manager, question, answer, usecase, metadata):
+            return True
         return self.manager.store_qa_pair(
             question=question, 
             answer=answer, 
@@ -33,6 +43,34 @@ class ChromaRepository:
             metadata=metadata or {}
         )
 
+    def upsert_many(self, items: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Upsert question-answer pairs in chunked batches; returns how many were written"""
+        batch_size = batch_size or int(os.getenv("CHROMA_UPSERT_BATCH_SIZE", "500"))
+        written = 0
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            if self.manager.store_qa_pairs(chunk):
+                written += len(chunk)
+        return written
+
+    def store_many(self, items: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Store question-answer pairs synchronously in batches (idempotent, see upsert_many)"""
+        return self.upsert_many(items, batch_size=batch_size)
+
+    async def asearch(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for similar questions without blocking the event loop"""
+        return await run_in_executor(chroma_executor, self.search, query, usecase, limit, score_threshold, model)
+
+    async def asearch_many(self, queries: List[str], usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Batch search without blocking the event loop"""
+        return await run_in_executor(chroma_executor, self.search_many, queries, usecase, limit, score_threshold, model)
+
+    async def astore(self, question: str, answer: str, usecase: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Store a question-answer pair without blocking the event loop"""
+        if self.write_behind.submit(self.manager, question, answer, usecase, metadata):
+            return True
+        return await run_in_executor(chroma_executor, self.store, question, answer, usecase, metadata)
+
     def stats(self) -> Dict[str, Any]:
         """Get collection statistics"""
         return self.manager.get_collection_stats()
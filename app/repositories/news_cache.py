@@ -0,0 +1,49 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from ..common.lru_cache import LRUCache
+from ..common.metrics import CACHE_REQUESTS
+
+DEFAULT_TTL_SECONDS = {"daily": 900, "weekly": 3600, "monthly": 6 * 3600, "year": 24 * 3600}
+
+
+def dedupe_by_url(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop repeated articles (same URL ignoring case and trailing slash), keeping the first occurrence."""
+    seen = set()
+    unique = []
+    for article in articles:
+        url = str(article.get("url") or "").strip().rstrip("/").lower()
+        if url:
+            if url in seen:
+                continue
+            seen.add(url)
+        unique.append(article)
+    return unique
+
+
+class NewsCache:
+    """Fetched news articles keyed by frequency, each frequency with its own TTL."""
+
+    def __init__(self):
+        self.cache = LRUCache(maxsize=len(DEFAULT_TTL_SECONDS) * 2, name="news")
+
+    @staticmethod
+    def ttl(frequency: str) -> float:
+        return float(os.getenv(f"NEWS_CACHE_TTL_{frequency.upper()}_SECONDS", DEFAULT_TTL_SECONDS.get(frequency, 900)))
+
+    def get(self, frequency: str) -> Optional[List[Dict[str, Any]]]:
+        articles = self.cache.get(frequency)
+        CACHE_REQUESTS.inc(cache="news", result="miss" if articles is None else "hit")
+        return articles
+
+    def put(self, frequency: str, articles: List[Dict[str, Any]]) -> None:
+        self.cache.set(frequency, articles, ttl=self.ttl(frequency))
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+news_cache = NewsCache()
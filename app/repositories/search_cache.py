@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..common.logger import logger
+from ..common.lru_cache import LRUCache
+from ..common.metrics import CACHE_REQUESTS, TAVILY_SECONDS
+
+DEFAULT_TTL_SECONDS = {"general": 3600, "news": 900, "finance": 300}
+
+
+def search_cache_key(query: str, **params: Any) -> str:
+    """Normalized query plus the non-empty search parameters, so equivalent searches share an entry."""
+    normalized = " ".join(query.casefold().split())
+    return json.dumps({"query": normalized, **{k: v for k, v in params.items() if v is not None}}, sort_keys=True, default=str)
+
+
+class SearchCache:
+    """Tavily search results cached in an in-memory LRU backed by a SQLite file that survives restarts.
+
+    Entries expire per topic (general/news/finance). A memory miss falls through to
+    disk, and a disk hit is promoted back into memory for its remaining lifetime.
+    """
+
+    def __init__(self, path: Optional[str] = None, maxsize: Optional[int] = None, disk_enabled: Optional[bool] = None):
+        self.memory = LRUCache(maxsize=maxsize or int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024")), name="tavily-search")
+        self._path = path
+        self._disk_enabled = disk_enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_errors = 0
+
+    @property
+    def path(self) -> str:
+        return self._path or os.getenv("SEARCH_CACHE_PATH", "./cache/tavily_search.sqlite3")
+
+    @property
+    def disk_enabled(self) -> bool:
+        if self._disk_enabled is not None:
+            return self._disk_enabled
+        return os.getenv("SEARCH_CACHE_DISK_ENABLED", "true").lower() == "true"
+
+    @staticmethod
+    def ttl(topic: Optional[str]) -> float:
+        topic = (topic or "general").lower()
+        return float(os.getenv(f"SEARCH_CACHE_TTL_{topic.upper()}_SECONDS", DEFAULT_TTL_SECONDS.get(topic, DEFAULT_TTL_SECONDS["general"])))
+
+    def _connection(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS search_results (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            purged = self._conn.execute("DELETE FROM search_results WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._conn.commit()
+            logger.info(f"Opened search cache at {self.path} (purged {purged} expired entries)")
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        if not self.disk_enabled:
+            return None
+        try:
+            with self._lock:
+                row = self._connection().execute("SELECT value, expires_at FROM search_results WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            self.disk_errors += 1
+            logger.warning(f"Search cache read failed: {e}")
+            return None
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _disk_set(self, key: str, value: Any, expires_at: float) -> None:
+        if not self.disk_enabled:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("INSERT OR REPLACE INTO search_results (key, value, expires_at) VALUES (?, ?, ?)", (key, json.dumps(value, default=str), expires_at))
+                conn.commit()
+                self.disk_writes += 1
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.disk_errors += 1
+            logger.warning(f"Search cache write failed: {e}")
+
+    def _from_disk(self, key: str) -> Optional[Any]:
+        found = self._disk_get(key)
+        if found is None:
+            return None
+        value, expires_at = found
+        self.disk_hits += 1
+        self.memory.set(key, value, ttl=expires_at - time.time())
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        return value if value is not None else self._from_disk(key)
+
+    def set(self, key: str, value: Any, topic: Optional[str] = None) -> None:
+        ttl = self.ttl(topic)
+        self.memory.set(key, value, ttl=ttl)
+        self._disk_set(key, value, time.time() + ttl)
+
+    @staticmethod
+    def _observe_fetch(topic: Optional[str], start: float, status: str) -> None:
+        TAVILY_SECONDS.observe(time.perf_counter() - start, topic=topic or "general", status=status)
+
+    def get_or_fetch(self, query: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        key = search_cache_key(query, **params)
+        value = self.get(key)
+        CACHE_REQUESTS.inc(cache="search", result="miss" if value is None else "hit")
+        if value is None:
+            start = time.perf_counter()
+            try:
+                value = fetch()
+            except Exception:
+                self._observe_fetch(params.get("topic"), start, "error")
+                raise
+            self._observe_fetch(params.get("topic"), start, "ok")
+            self.set(key, value, params.get("topic"))
+        return value
+
+    async def aget_or_fetch(self, query: str, params: Dict[str, Any], fetch: Callable[[], Awaitable[Any]]) -> Any:
+        key = search_cache_key(query, **params)
+        value = self.memory.get(key)
+        if value is None:
+            value = await asyncio.to_thread(self._from_disk, key)
+        CACHE_REQUESTS.inc(cache="search", result="miss" if value is None else "hit")
+        if value is None:
+            start = time.perf_counter()
+            try:
+                value = await fetch()
+            except Exception:
+                self._observe_fetch(params.get("topic"), start, "error")
+                raise
+            self._observe_fetch(params.get("topic"), start, "ok")
+            await asyncio.to_thread(self.set, key, value, params.get("topic"))
+        return value
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk_enabled:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM search_results")
+                conn.commit()
+        self.disk_hits = self.disk_writes = self.disk_errors = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.stats(),
+            "disk_enabled": self.disk_enabled,
+            "disk_hits": self.disk_hits,
+            "disk_writes": self.disk_writes,
+            "disk_errors": self.disk_errors,
+        }
+
+
+search_cache = SearchCache()
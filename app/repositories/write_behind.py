@@ -0,0 +1,151 @@
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..common.logger import logger
+
+_FLUSH = object()
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Moves Q&A persistence off the response path.
+
+    Store requests are queued and a single writer thread coalesces them per
+    manager into batched ``store_qa_pairs`` (collection.upsert) calls, flushing
+    when ``max_batch_size`` items are pending or the oldest pending item is
+    ``flush_interval`` seconds old. ``stop()`` drains everything still queued.
+    """
+
+    def __init__(self, max_batch_size: Optional[int] = None, flush_interval: Optional[float] = None, max_queue_size: Optional[int] = None):
+        self.max_batch_size = max_batch_size or int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "64"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_SECONDS", "0.5"))
+        self._queue: "queue.Queue[Tuple[Any, Any]]" = queue.Queue(maxsize=max_queue_size or int(os.getenv("WRITE_BEHIND_MAX_QUEUE_SIZE", "10000")))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending_count = 0
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        logger.info("Write-behind queue started")
+
+    def submit(self, manager: Any, question: str, answer: str, usecase: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue a store; returns False when the caller should write synchronously instead."""
+        if not self.running:
+            return False
+        item = {"question": question, "answer": answer, "usecase": usecase, "metadata": metadata or {}}
+        try:
+            self._queue.put_nowait((manager, item))
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued before this call has been written."""
+        if not self.running:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Drain pending writes and stop the writer thread."""
+        if not self.running:
+            return
+        self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+        logger.info(f"Write-behind queue stopped after writing {self.written} items")
+
+    def _run(self) -> None:
+        pending: Dict[int, Tuple[Any, List[Dict[str, Any]]]] = {}
+        oldest: Optional[float] = None
+        while True:
+            timeout = None if oldest is None else max(0.0, oldest + self.flush_interval - time.monotonic())
+            try:
+                target, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                target = payload = None
+
+            if target is _STOP or target is _FLUSH:
+                self._flush_all(pending)
+                oldest = None
+                if target is _FLUSH:
+                    payload.set()
+                    continue
+                return
+
+            if target is not None:
+                batch = pending.setdefault(id(target), (target, []))[1]
+                batch.append(payload)
+                with self._lock:
+                    self._pending_count += 1
+                oldest = oldest or time.monotonic()
+                if len(batch) >= self.max_batch_size:
+                    self._flush(*pending.pop(id(target)))
+                    if not pending:
+                        oldest = None
+
+            if oldest is not None and time.monotonic() - oldest >= self.flush_interval:
+                self._flush_all(pending)
+                oldest = None
+
+    def _flush_all(self, pending: Dict[int, Tuple[Any, List[Dict[str, Any]]]]) -> None:
+        for target, items in list(pending.values()):
+            self._flush(target, items)
+        pending.clear()
+
+    def _flush(self, manager: Any, items: List[Dict[str, Any]]) -> None:
+        t0 = time.perf_counter()
+        try:
+            ok = manager.store_qa_pairs(items)
+        except Exception as e:
+            logger.error(f"Write-behind flush of {len(items)} items failed: {e}")
+            ok = False
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._pending_count -= len(items)
+            self.batches += 1
+            if ok:
+                self.written += len(items)
+            else:
+                self.failed += len(items)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize() + self._pending_count,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "max_flush_ms": round(self.max_flush_ms, 3),
+                "avg_flush_ms": round(self._total_flush_ms / self.batches, 3) if self.batches else 0.0,
+            }
+
+
+write_behind_queue = WriteBehindQueue()
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Set
+
+from ..common.logger import logger
+from ..database import cache_policy
+from .prewarm import COLLECTIONS
+from .registry import registry
+
+
+class CacheCompactor:
+    """Deletes expired Q&A cache entries in the background so collections stop growing.
+
+    Searches already skip expired entries (see cache_policy.live_filter); this
+    removes them from the collection in batches of ``batch_size`` ids, one
+    worker-thread call per batch, every ``interval`` seconds. On its first pass
+    over a collection it also tags entries stored before expiry metadata existed
+    with created_at/expires_at/cache_version, since the search filter can't
+    match them otherwise.
+    """
+
+    def __init__(self, interval: Optional[float] = None, batch_size: Optional[int] = None):
+        self.interval = interval or float(os.getenv("CACHE_COMPACT_INTERVAL_SECONDS", "3600"))
+        self.batch_size = batch_size or int(os.getenv("CACHE_COMPACT_BATCH_SIZE", "500"))
+        self._backfilled: Set[str] = set()
+        self._task: Optional["asyncio.Task[Any]"] = None
+        self.runs = 0
+        self.deleted = 0
+        self.backfilled = 0
+        self.last_run: Dict[str, Any] = {}
+
+    def backfill_batch(self, collection: Any, offset: int) -> int:
+        """Tag one page of legacy entries; returns the page size (0 once the scan is done)."""
+        page = collection.get(limit=self.batch_size, offset=offset, include=["metadatas"])
+        legacy = [(doc_id, metadata or {}) for doc_id, metadata in zip(page["ids"], page["metadatas"]) if "expires_at" not in (metadata or {})]
+        if legacy:
+            collection.update(ids=[doc_id for doc_id, _ in legacy], metadatas=[cache_policy.backfill_metadata(m) for _, m in legacy])
+            self.backfilled += len(legacy)
+        return len(page["ids"])
+
+    def delete_batch(self, collection: Any) -> int:
+        """Delete up to batch_size expired entries; returns how many were deleted."""
+        ids = collection.get(where=cache_policy.expired_filter(), limit=self.batch_size, include=[])["ids"]
+        if ids:
+            collection.delete(ids=ids)
+            self.deleted += len(ids)
+        return len(ids)
+
+    async def compact(self, name: str, manager: Any) -> Dict[str, Any]:
+        start = time.perf_counter()
+        collection = manager.collection
+        deleted = 0
+        if name not in self._backfilled:
+            offset = 0
+            while True:
+                size = await asyncio.to_thread(self.backfill_batch, collection, offset)
+                if size < self.batch_size:
+                    break
+                offset += size
+            self._backfilled.add(name)
+        while True:
+            # One batch per thread hop so searches sharing the collection interleave with the deletes
+            count = await asyncio.to_thread(self.delete_batch, collection)
+            deleted += count
+            if count < self.batch_size:
+                break
+        remaining = await asyncio.to_thread(collection.count)
+        return {"deleted": deleted, "remaining": remaining, "seconds": round(time.perf_counter() - start, 3)}
+
+    async def run_once(self) -> Dict[str, Any]:
+        results = {}
+        for name in COLLECTIONS:
+            manager = getattr(registry.get_repository(name), "manager", None)
+            if manager is None:
+                continue
+            try:
+                results[name] = await self.compact(name, manager)
+            except Exception as e:
+                logger.error(f"Compacting {name} failed: {e}")
+                results[name] = {"error": str(e)}
+        self.runs += 1
+        self.last_run = {"at": time.time(), "collections": results}
+        deleted = sum(r.get("deleted", 0) for r in results.values())
+        if deleted:
+            logger.info(f"Cache compaction deleted {deleted} expired entries")
+        return self.last_run
+
+    async def run_forever(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "batch_size": self.batch_size,
+            "cache_version": cache_policy.cache_version(),
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "backfilled": self.backfilled,
+            "last_run": self.last_run,
+        }
+
+
+cache_compactor = CacheCompactor()
@@ -1,28 +1,95 @@
-from typing import Dict, Any
-from langchain_core.messages import HumanMessage
-from ..factories.llm_factory import LLMFactory
-from ..graph.enhanced_graph_builder import EnhancedGraphBuilder
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from ..nodes.enhanced_chatbot_node import CACHE_NOTICE
+from .registry import registry
+from .session_store import session_store
+from ..graph.checkpointer import checkpointed_run
+from ..common.metrics import GRAPH_RUN_SECONDS, GRAPH_RUNS_IN_FLIGHT
+from ..common.tracing import span
 from ..common.logger import logger
 
 class ChatService:
     def __init__(self, provider: str, model: str, embedding_model: str = "nomic-embed-text"):
-        self.llm = LLMFactory.create(provider, model)
-        self.graph_builder = EnhancedGraphBuilder(model=self.llm, embedding_model=embedding_model)
+        self.provider = provider
+        self.model = model
+        self.embedding_model = embedding_model
+        self.llm = registry.get_llm(provider, model)
 
-    def run(self, usecase: str, message: str) -> Dict[str, Any]:
-        logger.info(f"ChatService.run() called with usecase={usecase}, message={message}")
-        graph = self.graph_builder.setup_graph(usecase)
-        logger.info(f"Graph setup completed for usecase={usecase}")
-        state: Dict[str, Any] = {
-            "messages": [HumanMessage(content=message)],
+    @staticmethod
+    def _initial_state(usecase: str, question: HumanMessage, session_id: Optional[str] = None) -> Dict[str, Any]:
+        # A session contributes its rolling summary and recent turns; without one every request stands alone
+        messages = session_store.prompt_messages(session_id, question) if session_id else [question]
+        return {
+            "messages": messages,
             "usecase": usecase,
         }
-        logger.info(f"Initial state created: {state}")
+
+    @staticmethod
+    @contextmanager
+    def _thread(session_id: Optional[str], message: str) -> Iterator[Tuple[str, bool]]:
+        """Yield (thread_id, resumable): a session turn gets a thread a retry can resume, anything else a throwaway one."""
+        thread_id = session_store.claim_thread(session_id, message) if session_id else None
+        if thread_id is None:
+            yield f"chat:{uuid.uuid4().hex}", False
+            return
+        try:
+            yield thread_id, True
+        finally:
+            session_store.release_thread(thread_id)
+
+    def _remember(self, session_id: Optional[str], question: HumanMessage, messages: List[BaseMessage]) -> None:
+        if not session_id:
+            return
+        answer = next((m for m in reversed(messages or []) if isinstance(m, AIMessage) and m.content), None)
+        session_store.append(session_id, question, answer)
+        session_store.summarize_in_background(session_id, self.llm)
+
+    async def run(self, usecase: str, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        logger.debug("ChatService.run() called with usecase=%s, message=%s", usecase, message)
+        graph = await registry.aget_graph(self.provider, self.model, usecase, self.embedding_model)
+        question = HumanMessage(content=message)
+        state = self._initial_state(usecase, question, session_id)
+        logger.debug("Initial state created: %s", state)
         try:
-            result = graph.invoke(state)
-            logger.info(f"Graph.invoke() completed successfully: {result}")
-            return result
+            with GRAPH_RUNS_IN_FLIGHT.track_inprogress(usecase=usecase), GRAPH_RUN_SECONDS.time(usecase=usecase, mode="invoke"), span("chat.run", usecase=usecase, model=self.model):
+                with self._thread(session_id, message) as (thread_id, resumable):
+                    async with checkpointed_run(graph, state, thread_id, resumable=resumable) as (graph_input, config):
+                        result = await graph.ainvoke(graph_input, config)
+            logger.info("Graph.ainvoke() completed for usecase=%s with %d messages", usecase, len(result.get("messages") or []), extra={"usecase": usecase, "model": self.model})
+            logger.debug("Graph.ainvoke() result: %s", result)
         except Exception as e:
-            logger.error(f"Graph.invoke() failed: {e}", exc_info=True)
+            logger.error(f"Graph.ainvoke() failed: {e}", exc_info=True)
             raise
+        self._remember(session_id, question, result.get("messages"))
+        return result
 
+    async def stream(self, usecase: str, message: str, session_id: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (event, payload) pairs: LLM tokens as they arrive, or one cache event on a semantic hit."""
+        graph = await registry.aget_graph(self.provider, self.model, usecase, self.embedding_model)
+        question = HumanMessage(content=message)
+        from_cache = False
+        final_state: Dict[str, Any] = {}
+        state = self._initial_state(usecase, question, session_id)
+        with GRAPH_RUNS_IN_FLIGHT.track_inprogress(usecase=usecase), GRAPH_RUN_SECONDS.time(usecase=usecase, mode="stream"), span("chat.stream", usecase=usecase, model=self.model):
+            with self._thread(session_id, message) as (thread_id, resumable):
+                async with checkpointed_run(graph, state, thread_id, resumable=resumable) as (graph_input, config):
+                    async for mode, chunk in graph.astream(graph_input, config, stream_mode=["messages", "values"]):
+                        if mode == "values":
+                            final_state = chunk
+                            continue
+                        message_chunk, metadata = chunk
+                        if metadata.get("langgraph_node") != "chatbot":
+                            continue
+                        content = message_chunk.content if isinstance(message_chunk.content, str) else str(message_chunk.content)
+                        if isinstance(message_chunk, AIMessageChunk):
+                            if content:
+                                yield "token", {"content": content}
+                        elif CACHE_NOTICE in content:
+                            from_cache = True
+                            yield "cache", {"content": content}
+                        elif content:
+                            yield "message", {"content": content}
+        self._remember(session_id, question, final_state.get("messages"))
+        yield "done", {"from_cache": from_cache}
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from ..common.logger import logger
+from ..database.embedding_engine import get_embedding_engine
+from .prewarm import COLLECTIONS, prewarmer
+from .registry import registry
+
+
+class HealthMonitor:
+    """Probes the app's dependencies on a background interval and serves the last result.
+
+    /health and /ready only read the cached snapshot, so orchestrator probes
+    never touch Chroma or the LLM client themselves. Each probe runs in a
+    worker thread with its own timeout.
+    """
+
+    def __init__(self, interval: Optional[float] = None, timeout: Optional[float] = None):
+        self.interval = interval or float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "15"))
+        self.timeout = timeout or float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "5"))
+        self.snapshot: Dict[str, Any] = {"ready": False, "checked_at": None, "checks": {}}
+        self._checked_at: Optional[float] = None
+        self._task: Optional["asyncio.Task[Any]"] = None
+        self.runs = 0
+
+    @staticmethod
+    def check_chroma() -> Dict[str, Any]:
+        collections = {name: registry.get_repository(name).stats() for name in COLLECTIONS}
+        errors = [stats["error"] for stats in collections.values() if "error" in stats]
+        return {"ok": not errors, "collections": collections, **({"error": errors[0]} if errors else {})}
+
+    @staticmethod
+    def check_embedding_model() -> Dict[str, Any]:
+        engine = get_embedding_engine()
+        if not engine.loaded:
+            # Normally done by the startup pre-warm; this thread is off the request path either way
+            engine.warm_up()
+        return {"ok": engine.loaded, "stats": engine.stats()}
+
+    @staticmethod
+    def check_llm_provider() -> Dict[str, Any]:
+        provider = os.getenv("DEFAULT_PROVIDER", "Groq")
+        model = os.getenv("DEFAULT_MODEL", "llama3-8b-8192")
+        registry.get_llm(provider, model)
+        return {"ok": True, "provider": provider, "model": model}
+
+    @staticmethod
+    def check_graphs() -> Dict[str, Any]:
+        return {"ok": prewarmer.state != "running", "prewarm": prewarmer.state, "compiled": len(registry.graphs)}
+
+    async def _probe(self, check: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(check), self.timeout)
+        except asyncio.TimeoutError:
+            result = {"ok": False, "error": f"timed out after {self.timeout:g}s"}
+        except Exception as e:
+            result = {"ok": False, "error": str(getattr(e, "detail", e))}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def check(self) -> Dict[str, Any]:
+        checks = {
+            "chroma_db": self.check_chroma,
+            "embedding_model": self.check_embedding_model,
+            "llm_provider": self.check_llm_provider,
+            "graphs": self.check_graphs,
+        }
+        results = await asyncio.gather(*(self._probe(check) for check in checks.values()))
+        self._checked_at = time.time()
+        self.snapshot = {
+            "ready": all(r["ok"] for r in results),
+            "checked_at": datetime.fromtimestamp(self._checked_at, timezone.utc).isoformat(),
+            "checks": dict(zip(checks, results)),
+        }
+        self.runs += 1
+        failing = [name for name, r in self.snapshot["checks"].items() if not r["ok"]]
+        if failing:
+            logger.warning(f"Readiness checks failing: {', '.join(failing)}")
+        return self.snapshot
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Health check run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def service_status(self, name: str) -> str:
+        check = self.snapshot["checks"].get(name)
+        if check is None:
+            return "unknown"
+        return "up" if check["ok"] else "down"
+
+    def readiness(self) -> Dict[str, Any]:
+        age = round(time.time() - self._checked_at, 1) if self._checked_at else None
+        # A snapshot the background loop stopped refreshing doesn't count as ready
+        fresh = age is not None and age <= self.interval * 3
+        return {**self.snapshot, "ready": self.snapshot["ready"] and fresh, "age_seconds": age}
+
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from ..common.logger import logger
+from ..common.single_flight import SingleFlight
+from .news_service import NewsService
+
+FREQUENCIES = ("daily", "weekly", "monthly", "year")
+DEFAULT_REFRESH_SECONDS = {"daily": 3600, "weekly": 6 * 3600, "monthly": 24 * 3600, "year": 7 * 24 * 3600}
+
+
+def refresh_interval(frequency: str) -> float:
+    return float(os.getenv(f"NEWS_DIGEST_REFRESH_{frequency.upper()}_SECONDS", DEFAULT_REFRESH_SECONDS[frequency]))
+
+
+async def _generate_with_news_service(frequency: str) -> Dict[str, Any]:
+    return await NewsService().run(frequency)
+
+
+class NewsDigestStore:
+    """Serves precomputed news digests per frequency with stale-while-revalidate semantics.
+
+    Digests live in memory and fall back to the ``./AINews/{frequency}_summary.md``
+    files written by the news graph. A background scheduler regenerates each
+    frequency on its own cadence; a request for a stale digest gets the stale
+    copy immediately and triggers a single background refresh. A file's
+    modification time is its generation time, so a restart only regenerates
+    digests that are actually stale. After a failed refresh a frequency is
+    not retried for NEWS_DIGEST_RETRY_SECONDS, doubling per consecutive
+    failure up to NEWS_DIGEST_MAX_RETRY_SECONDS.
+    """
+
+    def __init__(self, generator: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None, directory: str = "./AINews"):
+        self.generator = generator or _generate_with_news_service
+        self.directory = directory
+        self._digests: Dict[str, Dict[str, Any]] = {}
+        self._flight = SingleFlight("news-digest")
+        self._background: Set["asyncio.Task[Any]"] = set()
+        self._scheduler: Optional["asyncio.Task[Any]"] = None
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _load_from_disk(self, frequency: str) -> Optional[Dict[str, Any]]:
+        filename = os.path.join(self.directory, f"{frequency}_summary.md")
+        try:
+            with open(filename) as f:
+                content = f.read()
+            generated_at = os.path.getmtime(filename)
+        except OSError:
+            return None
+        header = f"# {frequency.capitalize()} AI News Summary\n\n"
+        return {
+            "summary": content[len(header):] if content.startswith(header) else content,
+            "filename": filename,
+            "from_cache": False,
+            "generated_at": generated_at,
+            "from_disk": True,
+        }
+
+    def get(self, frequency: str) -> Optional[Dict[str, Any]]:
+        digest = self._digests.get(frequency)
+        if digest is None:
+            digest = self._load_from_disk(frequency)
+            if digest is not None:
+                self._digests[frequency] = digest
+        return digest
+
+    def is_stale(self, digest: Dict[str, Any], frequency: str) -> bool:
+        return time.time() - digest["generated_at"] >= refresh_interval(frequency)
+
+    def backing_off(self, frequency: str) -> bool:
+        return time.monotonic() < self._retry_at.get(frequency, float("-inf"))
+
+    def _record_failure(self, frequency: str) -> None:
+        self.refresh_failures += 1
+        failures = self._failures.get(frequency, 0) + 1
+        self._failures[frequency] = failures
+        delay = min(float(os.getenv("NEWS_DIGEST_RETRY_SECONDS", "60")) * 2 ** (failures - 1), float(os.getenv("NEWS_DIGEST_MAX_RETRY_SECONDS", "3600")))
+        self._retry_at[frequency] = time.monotonic() + delay
+        logger.warning(f"{frequency} news digest refresh failed {failures} time(s) in a row, next attempt in {delay:g}s")
+
+    def describe(self, digest: Dict[str, Any], frequency: str) -> Dict[str, Any]:
+        return {
+            **digest,
+            "frequency": frequency,
+            "age_seconds": round(time.time() - digest["generated_at"], 1),
+            "stale": self.is_stale(digest, frequency),
+        }
+
+    async def refresh(self, frequency: str) -> Dict[str, Any]:
+        """Regenerate a digest; concurrent refreshes of one frequency share a single run."""
+        return await self._flight.ado(frequency, lambda: self._refresh(frequency))
+
+    async def _refresh(self, frequency: str) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        try:
+            result = await self.generator(frequency)
+        except Exception:
+            self._record_failure(frequency)
+            raise
+        self._failures.pop(frequency, None)
+        self._retry_at.pop(frequency, None)
+        digest = {
+            "summary": result.get("summary", ""),
+            "filename": result.get("filename") or result.get("saved_file"),
+            "from_cache": result.get("from_cache", False),
+            "generated_at": time.time(),
+            "from_disk": False,
+        }
+        self._digests[frequency] = digest
+        self.refreshes += 1
+        logger.info(f"Refreshed {frequency} news digest in {time.perf_counter() - t0:.2f}s")
+        return digest
+
+    def refresh_in_background(self, frequency: str) -> None:
+        # Don't hammer upstream with a refresh per request while it is failing
+        if self.backing_off(frequency):
+            return
+        task = asyncio.ensure_future(self.refresh(frequency))
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: "asyncio.Task[Any]") -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background news digest refresh failed: {task.exception()}")
+
+    async def get_or_refresh(self, frequency: str) -> Dict[str, Any]:
+        digest = self.get(frequency)
+        if digest is None:
+            digest = await self.refresh(frequency)
+        elif self.is_stale(digest, frequency):
+            self.refresh_in_background(frequency)
+        return self.describe(digest, frequency)
+
+    async def run_scheduler(self, tick_seconds: Optional[float] = None) -> None:
+        tick = tick_seconds or float(os.getenv("NEWS_DIGEST_SCHEDULER_TICK_SECONDS", "60"))
+        while True:
+            for frequency in FREQUENCIES:
+                digest = self.get(frequency)
+                if (digest is None or self.is_stale(digest, frequency)) and not self.backing_off(frequency):
+                    try:
+                        await self.refresh(frequency)
+                    except Exception as e:
+                        logger.error(f"Scheduled {frequency} news digest refresh failed: {e}")
+            await asyncio.sleep(tick)
+
+    def start(self) -> None:
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.ensure_future(self.run_scheduler())
+            logger.info("News digest scheduler started")
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._scheduler, *self._background] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._scheduler = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "scheduler_running": self._scheduler is not None and not self._scheduler.done(),
+            "digests": {
+                frequency: {"age_seconds": round(time.time() - d["generated_at"], 1), "stale": self.is_stale(d, frequency), "failures": self._failures.get(frequency, 0)}
+                for frequency, d in self._digests.items()
+            },
+        }
+
+
+news_digests = NewsDigestStore()
@@ -1,15 +1,16 @@
 from typing import Dict, Any
 import os
-from ..factories.llm_factory import LLMFactory
-from ..graph.enhanced_graph_builder import EnhancedGraphBuilder
+from .registry import registry
+from ..graph.checkpointer import checkpointed_run
+from ..common.metrics import GRAPH_RUN_SECONDS, GRAPH_RUNS_IN_FLIGHT
 from ..common.logger import logger
 
 class NewsService:
     def __init__(self, embedding_model: str = "nomic-embed-text"):
-        provider = os.getenv("DEFAULT_PROVIDER", "Groq")
-        model = os.getenv("DEFAULT_MODEL", "llama3-8b-8192")
-        self.llm = LLMFactory.create(provider, model)
-        self.graph_builder = EnhancedGraphBuilder(model=self.llm, embedding_model=embedding_model)
+        self.provider = os.getenv("DEFAULT_PROVIDER", "Groq")
+        self.model = os.getenv("DEFAULT_MODEL", "llama3-8b-8192")
+        self.embedding_model = embedding_model
+        self.llm = registry.get_llm(self.provider, self.model)
 
     @staticmethod
     def map_timeframe(text: str) -> str:
@@ -24,10 +25,13 @@ class NewsService:
             return "year"
         return "daily"
 
-    def run(self, timeframe: str) -> Dict[str, Any]:
-        graph = self.graph_builder.setup_graph("AI News")
+    async def run(self, timeframe: str) -> Dict[str, Any]:
+        graph = await registry.aget_graph(self.provider, self.model, "AI News", self.embedding_model)
         frequency = self.map_timeframe(timeframe)
         initial_state = {"messages": [frequency], "user_message": timeframe, "usecase": "AI News"}
         logger.info("news_service")
-        return graph.invoke(initial_state)
+        # One thread per frequency: a run cut short resumes from its last finished step (e.g. skips the Tavily fetch)
+        with GRAPH_RUNS_IN_FLIGHT.track_inprogress(usecase="AI News"), GRAPH_RUN_SECONDS.time(usecase="AI News", mode="invoke"):
+            async with checkpointed_run(graph, initial_state, f"news:{frequency}") as (graph_input, config):
+                return await graph.ainvoke(graph_input, config)
 
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..common.lazy import load_lazy_modules
+from ..common.logger import logger
+from ..database.embedding_engine import get_embedding_engine
+from .registry import registry
+
+COLLECTIONS = ("qa_collection", "ai_news_collection")
+
+
+class Prewarmer:
+    """Builds the expensive first-request resources at startup, in parallel.
+
+    Deferred imports are loaded first; then the Chroma collections, the
+    embedding model and the compiled graphs for PREWARM_USECASES are each
+    built in a worker thread. A step that fails is logged and left to be
+    built lazily on first use. At startup it runs as a background task, so
+    /health answers straight away while /ready stays 503 until it is done.
+    """
+
+    def __init__(self):
+        self.state = "idle"
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.duration_seconds: Optional[float] = None
+        self._task: Optional["asyncio.Task[Any]"] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "done"
+
+    @staticmethod
+    def _steps(embedding_model: str) -> List[Tuple[str, Callable[[], Any]]]:
+        provider = os.getenv("DEFAULT_PROVIDER", "Groq")
+        model = os.getenv("DEFAULT_MODEL", "llama3-8b-8192")
+        usecases = [u.strip() for u in os.getenv("PREWARM_USECASES", "Basic Chatbot,Chatbot With Web,AI News").split(",") if u.strip()]
+        steps: List[Tuple[str, Callable[[], Any]]] = [("embedding_model", lambda: get_embedding_engine().warm_up())]
+        steps += [(f"collection:{name}", lambda name=name: registry.get_repository(name, embedding_model)) for name in COLLECTIONS]
+        steps += [(f"graph:{usecase}", lambda usecase=usecase: registry.get_graph(provider, model, usecase, embedding_model)) for usecase in usecases]
+        return steps
+
+    async def _run_step(self, name: str, fn: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(fn)
+            self.steps[name] = {"ok": True, "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            self.steps[name] = {"ok": False, "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+            logger.warning(f"Pre-warm step {name} failed, it will be built on first use: {e}")
+
+    async def run(self, embedding_model: str = "nomic-embed-text", timeout: Optional[float] = None) -> Dict[str, Any]:
+        timeout = timeout if timeout is not None else float(os.getenv("PREWARM_TIMEOUT_SECONDS", "120"))
+        self.state = "running"
+        start = time.perf_counter()
+        steps = self._steps(embedding_model)
+
+        async def run_steps():
+            await self._run_step("imports", load_lazy_modules)
+            await asyncio.gather(*(self._run_step(name, fn) for name, fn in steps))
+
+        try:
+            await asyncio.wait_for(run_steps(), timeout)
+        except asyncio.TimeoutError:
+            # The worker threads keep going; whatever they finish is simply already warm
+            logger.warning(f"Pre-warm did not finish within {timeout:g}s, serving anyway")
+        self.duration_seconds = round(time.perf_counter() - start, 3)
+        self.state = "done"
+        logger.info(f"Pre-warm finished in {self.duration_seconds}s: {sum(s['ok'] for s in self.steps.values())}/{len(steps) + 1} steps ok")
+        return self.stats()
+
+    def start(self, on_done: Optional[Callable[[], Awaitable[Any]]] = None) -> None:
+        """Run the pre-warm in the background, then await on_done (e.g. an immediate readiness re-check)."""
+        if self._task is not None and not self._task.done():
+            return
+        self.state = "running"
+
+        async def run_then_notify():
+            await self.run()
+            if on_done is not None:
+                await on_done()
+
+        self._task = asyncio.ensure_future(run_then_notify())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "duration_seconds": self.duration_seconds, "steps": dict(self.steps)}
+
+
+prewarmer = Prewarmer()
@@ -0,0 +1,72 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+from ..common.logger import logger
+from ..common.lru_cache import LRUCache
+from ..common.metrics import GRAPH_BUILD_SECONDS
+from ..factories.llm_factory import LLMFactory
+from ..graph.checkpointer import get_checkpointer
+from ..graph.enhanced_graph_builder import EnhancedGraphBuilder
+from ..repositories.chroma_repository import ChromaRepository
+from ..instrumentation import instrument_llm
+
+
+class ServiceRegistry:
+    """Process-wide holder of LLM clients, Chroma repositories and compiled graphs.
+
+    Everything is built lazily on first use and kept for the process lifetime,
+    bounded by LRU eviction, so a request only pays for the graph invoke.
+    """
+
+    def __init__(self, max_graphs: Optional[int] = None, max_llms: Optional[int] = None, max_repositories: Optional[int] = None):
+        self.graphs = LRUCache(maxsize=max_graphs or int(os.getenv("REGISTRY_MAX_GRAPHS", "32")), name="graphs")
+        self.llms = LRUCache(maxsize=max_llms or int(os.getenv("REGISTRY_MAX_LLMS", "16")), name="llms")
+        self.repositories = LRUCache(maxsize=max_repositories or int(os.getenv("REGISTRY_MAX_REPOSITORIES", "8")), name="repositories")
+
+    def get_llm(self, provider: str, model: str):
+        return self.llms.get_or_create((provider.lower(), model), lambda: instrument_llm(LLMFactory.create(provider, model), model))
+
+    def get_repository(self, collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text") -> ChromaRepository:
+        return self.repositories.get_or_create(
+            (collection_name, embedding_model),
+            lambda: ChromaRepository(collection_name=collection_name, embedding_model=embedding_model),
+        )
+
+    def get_graph(self, provider: str, model: str, usecase: str, embedding_model: str = "nomic-embed-text"):
+        key = (provider.lower(), model, usecase, embedding_model)
+
+        def build():
+            logger.info(f"Registry miss, building graph for {key}")
+            with GRAPH_BUILD_SECONDS.time(usecase=usecase):
+                builder = EnhancedGraphBuilder(
+                    model=self.get_llm(provider, model),
+                    embedding_model=embedding_model,
+                    chroma_repo=self.get_repository("qa_collection", embedding_model),
+                    news_repo=self.get_repository("ai_news_collection", embedding_model),
+                    checkpointer=get_checkpointer(),
+                )
+                return builder.setup_graph(usecase)
+
+        return self.graphs.get_or_create(key, build)
+
+    async def aget_graph(self, provider: str, model: str, usecase: str, embedding_model: str = "nomic-embed-text"):
+        """Async accessor; only a cold build (Chroma client, graph compile) is pushed to a worker thread."""
+        if (provider.lower(), model, usecase, embedding_model) in self.graphs:
+            return self.get_graph(provider, model, usecase, embedding_model)
+        return await asyncio.to_thread(self.get_graph, provider, model, usecase, embedding_model)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "graphs": self.graphs.stats(),
+            "llms": self.llms.stats(),
+            "repositories": self.repositories.stats(),
+        }
+
+    def clear(self) -> None:
+        self.graphs.clear()
+        self.llms.clear()
+        self.repositories.clear()
+
+
+registry = ServiceRegistry()
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langgraph.graph.message import add_messages
+
+from ..common.logger import logger
+from ..common.lru_cache import LRUCache
+from ..common.tokens import estimate_message_tokens, estimate_tokens
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+
+class Session:
+    """Compact history for one conversation: recent turns verbatim plus a rolling summary of older ones."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.messages: List[BaseMessage] = []
+        self.summary = ""
+        self.pending: List[BaseMessage] = []
+        self.turns = 0
+
+    def prompt_messages(self) -> List[BaseMessage]:
+        context = [SystemMessage(content=f"{SUMMARY_PREFIX}\n{self.summary}")] if self.summary else []
+        return context + list(self.messages)
+
+
+class SessionStore:
+    """Server-side conversation sessions with a bounded prompt and LRU/idle-TTL eviction.
+
+    History is merged with LangGraph's add_messages reducer and only the human
+    turn and final answer are kept (no tool traffic). When the verbatim window
+    exceeds its token budget the oldest turns move out of it into a rolling
+    summary, which is regenerated by the LLM in the background.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None, window_tokens: Optional[int] = None, summary_tokens: Optional[int] = None):
+        self.sessions = LRUCache(
+            maxsize=maxsize or int(os.getenv("SESSION_MAX_ENTRIES", "1000")),
+            ttl=ttl if ttl is not None else float(os.getenv("SESSION_TTL_SECONDS", "1800")),
+            name="sessions",
+        )
+        self.window_tokens = window_tokens or int(os.getenv("SESSION_WINDOW_TOKENS", "2000"))
+        self.summary_tokens = summary_tokens or int(os.getenv("SESSION_SUMMARY_TOKENS", "300"))
+        self._lock = threading.Lock()
+        self._background: Set["asyncio.Task[Any]"] = set()
+        self.summaries = 0
+        self.summary_failures = 0
+        self._threads: Set[str] = set()
+
+    def get(self, session_id: str) -> Session:
+        # Re-setting on every access makes the TTL an idle timeout
+        session = self.sessions.get_or_create(session_id, lambda: Session(session_id))
+        self.sessions.set(session_id, session)
+        return session
+
+    def claim_thread(self, session_id: str, message: str) -> Optional[str]:
+        """Checkpoint thread id for this turn, or None while another request runs the same one.
+
+        Keyed by the completed turn count and the message, so a retried turn
+        resumes its own checkpoint, while a different message or a concurrent
+        request in the session never lands on it.
+        """
+        with self._lock:
+            digest = hashlib.sha1(message.encode("utf-8")).hexdigest()[:16]
+            thread_id = f"chat:{session_id}:{self.get(session_id).turns}:{digest}"
+            if thread_id in self._threads:
+                return None
+            self._threads.add(thread_id)
+            return thread_id
+
+    def release_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._threads.discard(thread_id)
+
+    def prompt_messages(self, session_id: str, message: BaseMessage) -> List[BaseMessage]:
+        with self._lock:
+            return self.get(session_id).prompt_messages() + [message]
+
+    def append(self, session_id: str, question: BaseMessage, answer: Optional[BaseMessage]) -> Session:
+        with self._lock:
+            session = self.get(session_id)
+            turn = [question] + ([AIMessage(content=answer.content, id=answer.id)] if answer is not None else [])
+            session.messages = add_messages(session.messages, turn)
+            session.turns += 1
+            self._slide_window(session)
+            return session
+
+    def _slide_window(self, session: Session) -> None:
+        # Called with self._lock held; drop whole turns (human + answer) from the front
+        while len(session.messages) > 2 and estimate_message_tokens(session.messages) > self.window_tokens:
+            cut = 1
+            while cut < len(session.messages) and not isinstance(session.messages[cut], HumanMessage):
+                cut += 1
+            session.pending.extend(session.messages[:cut])
+            session.messages = session.messages[cut:]
+
+    @staticmethod
+    def _summary_prompt(summary: str, evicted: List[BaseMessage], max_tokens: int) -> str:
+        transcript = "\n".join(f"{m.type}: {m.content}" for m in evicted)
+        return (
+            f"Update the running summary of a conversation with the new lines below. "
+            f"Keep facts, names and decisions the user may refer back to; stay under {max_tokens * 3 // 4} words.\n\n"
+            f"Current summary:\n{summary or '(none)'}\n\nNew lines:\n{transcript}\n\nUpdated summary:"
+        )
+
+    def _fallback_summary(self, summary: str, evicted: List[BaseMessage]) -> str:
+        # Without the LLM, keep the newest part of the transcript within the summary budget
+        text = f"{summary}\n" + "\n".join(f"{m.type}: {m.content}" for m in evicted)
+        return text[-self.summary_tokens * 4:].strip()
+
+    async def summarize(self, session_id: str, llm) -> None:
+        with self._lock:
+            session = self.get(session_id)
+            evicted, session.pending = session.pending, []
+            summary = session.summary
+        if not evicted:
+            return
+        try:
+            response = await llm.ainvoke(self._summary_prompt(summary, evicted, self.summary_tokens))
+            updated = str(response.content).strip()
+            if estimate_tokens(updated) > self.summary_tokens * 2:
+                updated = self._fallback_summary(updated, [])
+            self.summaries += 1
+        except Exception as e:
+            self.summary_failures += 1
+            logger.warning(f"Session summary failed for {session_id}: {e}")
+            updated = self._fallback_summary(summary, evicted)
+        with self._lock:
+            session.summary = updated
+
+    def summarize_in_background(self, session_id: str, llm) -> None:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None or not session.pending:
+                return
+        task = asyncio.ensure_future(self.summarize(session_id, llm))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def drain(self) -> None:
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+    def clear(self) -> None:
+        self.sessions.clear()
+        self.summaries = self.summary_failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.sessions.stats(),
+            "active": len(self.sessions),
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "summaries_in_flight": len(self._background),
+        }
+
+
+session_store = SessionStore()
@@ -1,10 +1,18 @@
 from typing_extensions import TypedDict,List
 from langgraph.graph.message import add_messages
-from typing import Annotated
+from typing import Annotated, Any, Dict
 
 
 class State(TypedDict):
     messages: Annotated[List, add_messages]
     usecase: str
-    
 
+
+class NewsState(State, total=False):
+    user_message: str
+    frequency: str
+    news_data: List[Dict[str, Any]]
+    summary: str
+    filename: str
+    from_cache: bool
+    preprocessing: Dict[str, int]
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import ToolMessage
+
+from ..common.executor import submit, tool_executor
+from ..common.logger import logger
+from ..common.tracing import traced_node
+
+
+class ParallelToolNode:
+    """Executes every tool call of the last AI message concurrently, each bounded by its own timeout.
+
+    A call that fails or times out becomes an error ToolMessage so the LLM can
+    answer from the calls that did succeed instead of failing the whole turn.
+
+    invoke() runs the calls on tool_executor (TOOL_EXECUTOR_WORKERS threads). A
+    running thread can't be cancelled, so a timed-out call keeps its worker
+    until the tool returns. ainvoke() awaits tool.ainvoke on the event loop
+    instead: native async tools (Tavily) need no thread there and are
+    cancelled on timeout. Sync-only tools fall back to the loop's default
+    executor, so TOOL_EXECUTOR_WORKERS does not bound the async path.
+    """
+
+    def __init__(self, tools: List[Any], timeout: Optional[float] = None, timeouts: Optional[Dict[str, float]] = None):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.timeout = timeout or float(os.getenv("TOOL_TIMEOUT_SECONDS", "15"))
+        self.timeouts = timeouts or {}
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name) or float(os.getenv(f"TOOL_TIMEOUT_{name.upper()}_SECONDS", self.timeout))
+
+    @staticmethod
+    def _tool_calls(state: dict) -> List[dict]:
+        messages = state.get("messages") or []
+        return list(getattr(messages[-1], "tool_calls", None) or []) if messages else []
+
+    @staticmethod
+    def _message(call: dict, output: Any) -> ToolMessage:
+        content = output if isinstance(output, str) else json.dumps(output, default=str)
+        return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"])
+
+    @staticmethod
+    def _error(call: dict, error: str) -> ToolMessage:
+        logger.warning(f"Tool call {call['name']} failed: {error}")
+        return ToolMessage(content=f"Error: {error}", name=call["name"], tool_call_id=call["id"], status="error")
+
+    def _unknown(self, call: dict) -> Optional[ToolMessage]:
+        if call["name"] in self.tools_by_name:
+            return None
+        return self._error(call, f"unknown tool {call['name']!r}, available: {', '.join(self.tools_by_name)}")
+
+    def invoke(self, state: dict) -> dict:
+        calls = self._tool_calls(state)
+        started = time.monotonic()
+        unknown = [self._unknown(call) for call in calls]
+        futures = {
+            i: submit(tool_executor, self.tools_by_name[call["name"]].invoke, call["args"])
+            for i, call in enumerate(calls) if unknown[i] is None
+        }
+        messages = []
+        for i, call in enumerate(calls):
+            if unknown[i] is not None:
+                messages.append(unknown[i])
+                continue
+            timeout = self.timeout_for(call["name"])
+            try:
+                # Calls started together, so each waits only for what is left of its own budget
+                output = futures[i].result(timeout=max(0.0, started + timeout - time.monotonic()))
+                messages.append(self._message(call, output))
+            except FutureTimeoutError:
+                if not futures[i].cancel():
+                    logger.warning("Tool call %s still running after timeout; its tool_executor worker stays busy until it returns", call["name"])
+                messages.append(self._error(call, f"timed out after {timeout:g}s"))
+            except Exception as e:
+                messages.append(self._error(call, str(e)))
+        return {"messages": messages}
+
+    async def _acall(self, call: dict) -> ToolMessage:
+        unknown = self._unknown(call)
+        if unknown is not None:
+            return unknown
+        timeout = self.timeout_for(call["name"])
+        try:
+            output = await asyncio.wait_for(self.tools_by_name[call["name"]].ainvoke(call["args"]), timeout)
+            return self._message(call, output)
+        except asyncio.TimeoutError:
+            return self._error(call, f"timed out after {timeout:g}s")
+        except Exception as e:
+            return self._error(call, str(e))
+
+    async def ainvoke(self, state: dict) -> dict:
+        messages = await asyncio.gather(*(self._acall(call) for call in self._tool_calls(state)))
+        return {"messages": list(messages)}
+
+    def as_runnable(self):
+        return traced_node("tools", self.invoke, self.ainvoke)
@@ -1,11 +1,33 @@
-from langchain_tavily import TavilySearch
-from langgraph.prebuilt import ToolNode
+import functools
+from typing import Any, Dict
 from ..common.logger import logger
+from ..repositories.search_cache import search_cache
+from .parallel_tool_node import ParallelToolNode
+
+
+@functools.lru_cache(maxsize=None)
+def cached_api_wrapper_class():
+    """CachedTavilySearchAPIWrapper, defined on first use so langchain_tavily is only imported once a web tool is built."""
+    from langchain_tavily._utilities import TavilySearchAPIWrapper
+
+    class CachedTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+        """Tavily API wrapper that reuses successful search results through the shared search cache."""
+
+        def raw_results(self, query: str, **params: Any) -> Dict[str, Any]:
+            return search_cache.get_or_fetch(query, params, lambda: super(CachedTavilySearchAPIWrapper, self).raw_results(query=query, **params))
+
+        async def raw_results_async(self, query: str, **params: Any) -> Dict[str, Any]:
+            return await search_cache.aget_or_fetch(query, params, lambda: super(CachedTavilySearchAPIWrapper, self).raw_results_async(query=query, **params))
+
+    return CachedTavilySearchAPIWrapper
+
 
 def get_tools():
     try:
+        from langchain_tavily import TavilySearch
+
         logger.info("Initializing Tavily search tool")
-        tavily_tool = TavilySearch(max_results=5, include_answer=True)
+        tavily_tool = TavilySearch(max_results=5, include_answer=True, api_wrapper=cached_api_wrapper_class()())
         logger.info("Tavily search tool initialized successfully")
         return [tavily_tool]
     except Exception as e:
@@ -15,10 +37,9 @@ def get_tools():
 def create_tool_node(tools):
     try:
         logger.info("Creating tool node for graph")
-        tool_node = ToolNode(tools=tools)
+        tool_node = ParallelToolNode(tools=tools).as_runnable()
         logger.info("Tool node created successfully")
         return tool_node
     except Exception as e:
         logger.critical(f"Failed to create tool node: {str(e)}")
         raise
-
@@ -0,0 +1,120 @@
+import hashlib
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.repositories.answer_cache import answer_cache
+from app.repositories.cache_thresholds import threshold_recorder
+from app.repositories.search_cache import search_cache
+from app.services.registry import registry
+
+
+class FakeRepository:
+    """In-memory stand-in for ChromaRepository that matches exact questions only."""
+
+    def __init__(self, collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text"):
+        self.collection_name = collection_name
+        self.embedding_model = embedding_model
+        self.items: Dict[tuple, Dict[str, Any]] = {}
+        self.search_calls = 0
+        self.store_calls = 0
+
+    def search(self, query: str, usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        self.search_calls += 1
+        item = self.items.get((query, usecase))
+        if item and model and item["metadata"].get("model", "*") not in (model, "*"):
+            return []
+        return [item] if item else []
+
+    def store(self, question: str, answer: str, usecase: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        self.store_calls += 1
+        self.items[(question, usecase)] = {"question": question, "answer": answer, "score": 1.0, "metadata": metadata or {}}
+        return True
+
+    def search_many(self, queries: List[str], usecase: str, limit: int = 5, score_threshold: float = 0.8, model: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        return [self.search(q, usecase, limit, score_threshold, model) for q in queries]
+
+    async def asearch_many(self, *args, **kwargs) -> List[List[Dict[str, Any]]]:
+        return self.search_many(*args, **kwargs)
+
+    async def asearch(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return self.search(*args, **kwargs)
+
+    async def astore(self, *args, **kwargs) -> bool:
+        return self.store(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"collection_name": self.collection_name, "total_documents": len(self.items), "embedding_model": self.embedding_model}
+
+    def clear(self) -> bool:
+        self.items.clear()
+        return True
+
+
+class HashingEmbeddingFunction:
+    """Deterministic bag-of-words embedding with optional per-call latency, standing in for the ONNX model."""
+
+    def __init__(self, dim: int = 64, call_latency: float = 0.0, per_text_latency: float = 0.0):
+        self.dim = dim
+        self.call_latency = call_latency
+        self.per_text_latency = per_text_latency
+        self.calls = 0
+        self.texts = 0
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts += len(input)
+        time.sleep(self.call_latency + self.per_text_latency * len(input))
+        vectors = []
+        for text in input:
+            vec = [0.0] * self.dim
+            for word in text.lower().split():
+                vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+            norm = sum(v * v for v in vec) ** 0.5 or 1.0
+            vectors.append([v / norm for v in vec])
+        return vectors
+
+
+@pytest.fixture
+def chroma_dir(tmp_path, monkeypatch):
+    """Point ChromaManager at a throwaway local persist directory."""
+    monkeypatch.delenv("CHROMA_HOST_ADDR", raising=False)
+    monkeypatch.setenv("CHROMA_PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    return tmp_path / "chroma"
+
+
+@pytest.fixture
+def fake_services(monkeypatch):
+    """Route the registry to fake LLMs and in-memory repositories."""
+    created: Dict[str, Any] = {"llms": [], "repositories": {}}
+
+    def create_llm(provider: str, model: str):
+        llm = FakeListChatModel(responses=[f"answer from {model}"])
+        created["llms"].append(llm)
+        return llm
+
+    def create_repository(collection_name: str = "qa_collection", embedding_model: str = "nomic-embed-text"):
+        repo = FakeRepository(collection_name, embedding_model)
+        created["repositories"][collection_name] = repo
+        return repo
+
+    monkeypatch.setattr("app.services.registry.LLMFactory.create", staticmethod(create_llm))
+    monkeypatch.setattr("app.services.registry.ChromaRepository", create_repository)
+    registry.clear()
+    answer_cache.clear()
+    yield created
+    registry.clear()
+    answer_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_search_cache(tmp_path, monkeypatch):
+    """Keep the shared Tavily search cache (memory and SQLite) per test and out of the working tree."""
+    search_cache.close()
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "search_cache.sqlite3"))
+    monkeypatch.setattr(threshold_recorder, "path", str(tmp_path / "threshold_log.jsonl"))
+    search_cache.clear()
+    yield search_cache
+    search_cache.close()
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.main import app
+
+LLM_DELAY = 1.0
+CONCURRENCY = 200
+# Starlette's default threadpool (anyio) has 40 tokens; a sync handler can hold at most that many LLM waits.
+THREADPOOL_SIZE = 40
+
+
+class SlowChatModel(FakeListChatModel):
+    """Fake LLM that waits on the event loop like a real network call would."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(LLM_DELAY)
+        return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_chat_concurrency_exceeds_threadpool(fake_services, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.registry.LLMFactory.create",
+        staticmethod(lambda provider, model: SlowChatModel(responses=["slow answer"])),
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        # Warm the registry so the measurement only covers request handling
+        await ac.post('/chat', json={'provider': 'Groq', 'model': 'slow', 'usecase': 'Basic Chatbot', 'message': 'warmup'})
+
+        t0 = time.perf_counter()
+        responses = await asyncio.gather(*[
+            ac.post('/chat', json={'provider': 'Groq', 'model': 'slow', 'usecase': 'Basic Chatbot', 'message': f'q{i}'})
+            for i in range(CONCURRENCY)
+        ])
+        elapsed = time.perf_counter() - t0
+
+    assert all(r.status_code == 200 for r in responses)
+    threadpool_bound = (CONCURRENCY / THREADPOOL_SIZE) * LLM_DELAY
+    assert elapsed < threadpool_bound / 2
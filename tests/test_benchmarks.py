@@ -24,3 +24,212 @@ def test_bench_news_summary():
     m = bench_call('/news/summary', {'timeframe': 'last 24 hours'})
     assert m >= 0
 
+
+
+def test_bench_embedding_engine_throughput():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.database.embedding_engine import EmbeddingEngine
+    from conftest import HashingEmbeddingFunction
+
+    # A miss embeds each question twice (search, then store); 100 distinct questions from 16 threads
+    questions = [f"question number {i} about transformers" for i in range(100)] * 2
+
+    baseline_ef = HashingEmbeddingFunction(call_latency=0.004, per_text_latency=0.0002)
+    t0 = time.perf_counter()
+    for q in questions:
+        baseline_ef([q])
+    before = len(questions) / (time.perf_counter() - t0)
+
+    engine = EmbeddingEngine(embedding_function=HashingEmbeddingFunction(call_latency=0.004, per_text_latency=0.0002))
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(engine.embed, questions))
+    after = len(questions) / (time.perf_counter() - t0)
+
+    print(f"\nembeddings/sec: per-text calls {before:.0f}, cached+batched engine {after:.0f} ({engine.stats()['avg_batch_size']} texts/call)")
+    assert after > before
+
+
+def test_bench_chroma_setup_per_request(tmp_path, monkeypatch):
+    from app.database.chroma_manager import ChromaManager
+    from app.database.client_pool import client_pool
+    from app.database.embedding_engine import EmbeddingEngine
+    from conftest import HashingEmbeddingFunction
+
+    monkeypatch.delenv("CHROMA_HOST_ADDR", raising=False)
+    monkeypatch.setenv("CHROMA_PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    engine = EmbeddingEngine(embedding_function=HashingEmbeddingFunction())
+
+    def per_request(reset_pool: bool, n: int = 20):
+        times = []
+        for _ in range(n):
+            if reset_pool:
+                # Old behaviour: every request built its own client and re-listed collections
+                client_pool.clear()
+            t0 = time.perf_counter()
+            ChromaManager(embedding_engine=engine)
+            ChromaManager(collection_name="ai_news_collection", embedding_engine=engine)
+            times.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(times)
+
+    before = per_request(reset_pool=True)
+    after = per_request(reset_pool=False)
+    client_pool.clear()
+    print(f"\nChroma setup per request: {before:.2f} ms unpooled, {after:.3f} ms pooled")
+    assert after < before
+
+
+def test_bench_map_reduce_news_summary():
+    import asyncio
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from app.nodes.news_summarizer import MapReduceSummarizer
+
+    class SlowSummaryModel(FakeListChatModel):
+        # Latency grows with prompt length, like a real LLM
+        def _call(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(0.02 + sum(len(m.content) for m in messages) / 400_000)
+            return "### 2024-01-01\n- [summary](https://example.com)"
+
+    articles = [{"url": f"https://example.com/{i}", "content": "news " * 800, "published_date": "2024-01-01"} for i in range(20)]
+    llm = SlowSummaryModel(responses=[""])
+
+    t0 = time.perf_counter()
+    asyncio.run(MapReduceSummarizer(llm, str, chunk_tokens=10**9).asummarize(articles))
+    single = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    asyncio.run(MapReduceSummarizer(llm, str, chunk_tokens=4000, max_concurrency=5).asummarize(articles))
+    parallel = time.perf_counter() - t0
+
+    print(f"\nnews summary wall time: single prompt {single * 1000:.0f}ms, map-reduce {parallel * 1000:.0f}ms")
+    assert parallel < single
+
+
+def test_bench_checkpoint_write_overhead():
+    import asyncio
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from langchain_core.messages import HumanMessage
+    from langgraph.checkpoint.memory import InMemorySaver
+    from app.graph.checkpointer import SnapshotMemorySaver, checkpointed_run
+    from app.graph.enhanced_graph_builder import EnhancedGraphBuilder
+    from app.repositories.answer_cache import answer_cache
+    from conftest import FakeRepository
+
+    runs = 300
+
+    def per_run_ms(checkpointer):
+        graph = EnhancedGraphBuilder(FakeListChatModel(responses=["ok"]), chroma_repo=FakeRepository(), checkpointer=checkpointer).setup_graph("Basic Chatbot")
+
+        async def go():
+            t0 = time.perf_counter()
+            for i in range(runs):
+                # Distinct questions so every run reaches the LLM step instead of the answer cache
+                state = {"messages": [HumanMessage(content=f"question {i}")], "usecase": "Basic Chatbot"}
+                async with checkpointed_run(graph, state, f"chat:{i}") as (graph_input, config):
+                    await graph.ainvoke(graph_input, config)
+            return (time.perf_counter() - t0) * 1000 / runs
+
+        answer_cache.clear()
+        return asyncio.run(go())
+
+    baseline = per_run_ms(None)
+    memory = per_run_ms(InMemorySaver())
+    snapshot = SnapshotMemorySaver("unused-bench.pkl", interval=3600)
+    snapshotting = per_run_ms(snapshot)
+    # Two checkpointed steps per turn: the input and the chatbot node
+    print(f"\nper-turn ms: no checkpointer {baseline:.2f}, in-memory {memory:.2f}, snapshot saver {snapshotting:.2f} "
+          f"(~{(memory - baseline) / 2:.2f}ms per checkpoint step, incl. state lookup and thread cleanup)")
+    assert memory >= 0 and snapshotting >= 0
+
+
+def test_bench_tracing_overhead(monkeypatch):
+    from app.common.tracing import Trace, root_span, span
+
+    monkeypatch.setenv("TRACE_EXPORT", "none")
+    runs = 20000
+
+    def per_span_us(trace):
+        with root_span(trace, "bench"):
+            t0 = time.perf_counter()
+            for _ in range(runs):
+                with span("node.chatbot", usecase="Basic Chatbot"):
+                    pass
+            return (time.perf_counter() - t0) * 1e6 / runs
+
+    unsampled = per_span_us(None)
+    sampled = per_span_us(Trace())
+    print(f"\nper-span overhead: unsampled {unsampled:.2f}us, sampled {sampled:.2f}us")
+    assert unsampled < sampled
+
+
+def test_bench_chat_throughput_logging_on_vs_off(fake_services):
+    import logging
+    from app.common.logger import logger
+    from app.repositories.answer_cache import answer_cache
+
+    client = TestClient(app)
+    runs = 200
+
+    def requests_per_second(level):
+        previous = logger.level
+        logger.setLevel(level)
+        answer_cache.clear()
+        try:
+            t0 = time.perf_counter()
+            for i in range(runs):
+                payload = {"provider": "Groq", "model": "bench-model", "usecase": "Basic Chatbot", "message": f"question {i}"}
+                assert client.post("/chat", json=payload).status_code == 200
+            return runs / (time.perf_counter() - t0)
+        finally:
+            logger.setLevel(previous)
+
+    requests_per_second(logging.INFO)  # warm up graph registry and clients
+    off = requests_per_second(logging.CRITICAL + 1)
+    on = requests_per_second(logging.INFO)
+    print(f"\n/chat throughput: logging off {off:.0f} req/s, logging on (INFO, queued JSON) {on:.0f} req/s")
+    assert on > off * 0.5
+
+
+def test_bench_cache_compaction_over_time(tmp_path, monkeypatch):
+    import asyncio
+    from app.database import cache_policy
+    from app.database.chroma_manager import ChromaManager
+    from app.database.client_pool import client_pool
+    from app.database.embedding_engine import EmbeddingEngine
+    from app.services.cache_compactor import CacheCompactor
+    from conftest import HashingEmbeddingFunction
+
+    monkeypatch.delenv("CHROMA_HOST_ADDR", raising=False)
+    monkeypatch.setenv("CHROMA_PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    monkeypatch.setenv("CACHE_TTL_BASIC_CHATBOT_SECONDS", str(3 * 86400))
+    engine = EmbeddingEngine(embedding_function=HashingEmbeddingFunction())
+    day, per_day, days = 86400, 300, 10
+    clock = {"now": 1_700_000_000}
+    monkeypatch.setattr(cache_policy, "now", lambda: clock["now"])
+
+    def simulate(name: str, compact: bool):
+        manager = ChromaManager(collection_name=name, embedding_engine=engine)
+        compactor = CacheCompactor(batch_size=200)
+        rows = []
+        for d in range(days):
+            clock["now"] = 1_700_000_000 + d * day
+            manager.store_qa_pairs([{"question": f"day {d} question {i} about topic {i % 37}", "answer": "a", "usecase": "Basic Chatbot"} for i in range(per_day)])
+            if compact:
+                asyncio.run(compactor.compact(name, manager))
+            times = []
+            for i in range(20):
+                t0 = time.perf_counter()
+                manager.search_similar_questions(f"question {i} about topic {i}", usecase="Basic Chatbot", limit=3, score_threshold=0.0)
+                times.append((time.perf_counter() - t0) * 1000)
+            rows.append((manager.collection.count(), statistics.median(times)))
+        return rows
+
+    grown = simulate("aging_uncompacted", compact=False)
+    compacted = simulate("aging_compacted", compact=True)
+    client_pool.clear()
+    print("\nday  entries(no compaction)  query ms | entries(compacted)  query ms")
+    for d, ((n1, t1), (n2, t2)) in enumerate(zip(grown, compacted)):
+        print(f"{d:>3}  {n1:>21}  {t1:>8.2f} | {n2:>18}  {t2:>8.2f}")
+    assert grown[-1][0] == days * per_day
+    # Entries live three days, so the compacted collection levels off at the last three days' inserts
+    assert compacted[-1][0] == 3 * per_day
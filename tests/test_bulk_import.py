@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from app.cli import bulk_import as cli
+from app.database import embedding_engine
+from app.database.embedding_engine import EmbeddingEngine
+from conftest import HashingEmbeddingFunction
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(embedding_engine, "_engine", EmbeddingEngine(embedding_function=HashingEmbeddingFunction()))
+
+
+def _write(path, rows, mode="w"):
+    with open(path, mode) as f:
+        for row in rows:
+            f.write((row if isinstance(row, str) else json.dumps(row)) + "\n")
+
+
+def test_bulk_import_is_resumable_and_idempotent(tmp_path, chroma_dir, fake_embeddings):
+    seed = tmp_path / "seed.jsonl"
+    _write(seed, [{"question": f"q{i}", "answer": f"a{i}"} for i in range(25)] + ["not json"])
+
+    first = cli.bulk_import(str(seed), cli.ChromaRepository(), batch_size=10)
+    assert first["imported_this_run"] == 25
+    assert first["skipped"] == 1
+
+    _write(seed, [{"question": "q0", "answer": "refreshed"}, {"question": "q99", "answer": "a99", "usecase": "AI News"}], mode="a")
+    second = cli.bulk_import(str(seed), cli.ChromaRepository(), batch_size=10)
+    assert second["imported_this_run"] == 2
+    assert second["imported"] == 27
+
+    repo = cli.ChromaRepository()
+    assert repo.stats()["total_documents"] == 26
+    assert repo.search("q0", usecase="Basic Chatbot", score_threshold=0.9)[0]["answer"] == "refreshed"
+    assert repo.search("q99", usecase="AI News", score_threshold=0.9)[0]["answer"] == "a99"
+
+
+def test_cli_restart_flag(tmp_path, chroma_dir, fake_embeddings, capsys):
+    seed = tmp_path / "seed.jsonl"
+    _write(seed, [{"question": "q", "answer": "a"}])
+    assert cli.main([str(seed)]) == 0
+    assert cli.main([str(seed), "--restart"]) == 0
+    assert json.loads(capsys.readouterr().out.strip().splitlines()[-1])["imported_this_run"] == 1
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+
+from app.cli import bulk_import as cli
+from app.database import cache_policy, embedding_engine
+from app.database.chroma_manager import ChromaManager
+from app.database.embedding_engine import EmbeddingEngine
+from app.nodes.enhanced_chatbot_node import EnhancedChatbotNode
+from app.repositories.answer_cache import AnswerCache
+from app.services.cache_compactor import CacheCompactor
+from conftest import FakeRepository, HashingEmbeddingFunction
+
+
+def make_manager():
+    return ChromaManager(embedding_engine=EmbeddingEngine(embedding_function=HashingEmbeddingFunction()))
+
+
+def test_ttl_comes_from_usecase_env_then_default(monkeypatch):
+    monkeypatch.setenv("CACHE_TTL_CHATBOT_WITH_WEB_SECONDS", "60")
+    monkeypatch.setenv("CACHE_TTL_SECONDS", "120")
+    assert cache_policy.ttl_seconds("Chatbot With Web") == 60
+    assert cache_policy.ttl_seconds("Basic Chatbot") == cache_policy.DEFAULT_TTLS["Basic Chatbot"]
+    assert cache_policy.ttl_seconds("Custom") == 120
+    monkeypatch.setenv("CACHE_TTL_SECONDS", "0")
+    assert cache_policy.expiry_metadata("Custom", created_at=10)["expires_at"] == cache_policy.NEVER
+
+
+def test_search_skips_expired_other_version_and_other_model_entries(chroma_dir, monkeypatch):
+    monkeypatch.setenv("CACHE_TTL_BASIC_CHATBOT_SECONDS", "100")
+    monkeypatch.setattr(cache_policy, "now", lambda: 1_000)
+    manager = make_manager()
+    manager.store_qa_pair("what is a vector database", "embeddings", usecase="Basic Chatbot", metadata={"model": "m1"})
+    assert manager.search_similar_questions("what is a vector database", usecase="Basic Chatbot", model="m1")[0]["answer"] == "embeddings"
+    assert manager.search_similar_questions("what is a vector database", usecase="Basic Chatbot", model="m2") == []
+    monkeypatch.setenv("CACHE_MATCH_MODEL", "false")
+    assert len(manager.search_similar_questions("what is a vector database", usecase="Basic Chatbot", model="m2")) == 1
+
+    monkeypatch.setenv("CACHE_VERSION", "2")
+    assert manager.search_similar_questions("what is a vector database", usecase="Basic Chatbot") == []
+    monkeypatch.setenv("CACHE_VERSION", "1")
+
+    monkeypatch.setattr(cache_policy, "now", lambda: 1_100)
+    assert manager.search_similar_questions("what is a vector database", usecase="Basic Chatbot") == []
+
+
+def test_compactor_deletes_expired_entries_in_batches(chroma_dir, monkeypatch):
+    monkeypatch.setenv("CACHE_TTL_BASIC_CHATBOT_SECONDS", "100")
+    monkeypatch.setenv("CACHE_TTL_AI_NEWS_SECONDS", "0")
+    monkeypatch.setattr(cache_policy, "now", lambda: 1_000)
+    manager = make_manager()
+    manager.store_qa_pairs([{"question": f"old {i}", "answer": "a", "usecase": "Basic Chatbot"} for i in range(7)])
+    manager.store_qa_pairs([{"question": f"news {i}", "answer": "a", "usecase": "AI News"} for i in range(2)])
+    monkeypatch.setattr(cache_policy, "now", lambda: 1_050)
+    manager.store_qa_pair("fresh", "a", usecase="Basic Chatbot")
+
+    monkeypatch.setattr(cache_policy, "now", lambda: 1_120)
+    compactor = CacheCompactor(batch_size=3)
+    result = asyncio.run(compactor.compact("qa_collection", manager))
+    assert result["deleted"] == 7
+    assert result["remaining"] == 3
+    assert sorted(manager.collection.get()["documents"]) == ["fresh", "news 0", "news 1"]
+    assert asyncio.run(compactor.compact("qa_collection", manager))["deleted"] == 0
+
+
+def test_compactor_backfills_entries_stored_without_expiry(chroma_dir, monkeypatch):
+    monkeypatch.setenv("CACHE_TTL_BASIC_CHATBOT_SECONDS", "3600")
+    manager = make_manager()
+    engine = manager.embedder
+    legacy = [("legacy old", "2000-01-01T00:00:00"), ("legacy new", None)]
+    manager.collection.upsert(
+        ids=["l1", "l2"],
+        documents=[q for q, _ in legacy],
+        embeddings=engine.embed_many([q for q, _ in legacy]),
+        metadatas=[{"question": q, "answer": "a", "usecase": "Basic Chatbot", **({"timestamp": ts} if ts else {})} for q, ts in legacy],
+    )
+    assert manager.search_similar_questions("legacy new", usecase="Basic Chatbot") == []
+
+    compactor = CacheCompactor(batch_size=1)
+    result = asyncio.run(compactor.compact("qa_collection", manager))
+    assert compactor.backfilled == 2
+    # The old entry's TTL ran out long ago, so it is deleted in the same pass
+    assert result["deleted"] == 1
+    assert manager.search_similar_questions("legacy new", usecase="Basic Chatbot")[0]["metadata"]["cache_version"] == "1"
+
+
+class NamedLLM:
+    model_name = "llama-test"
+
+    def invoke(self, messages):
+        return "fresh answer"
+
+
+def test_chatbot_node_tags_and_filters_answers_by_model():
+    repo = FakeRepository()
+    node = EnhancedChatbotNode(NamedLLM(), chroma_repo=repo)
+    node.process({"messages": [{"content": "What is TTL?"}], "usecase": "Basic Chatbot"})
+    assert repo.items[("What is TTL?", "Basic Chatbot")]["metadata"]["model"] == "llama-test"
+    assert repo.search("What is TTL?", "Basic Chatbot", model="other-model") == []
+
+
+class CountingLLM(NamedLLM):
+    def __init__(self, model_name="llama-test"):
+        self.model_name = model_name
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return f"answer from {self.model_name}"
+
+
+def test_bulk_imported_pair_is_served_through_the_node_to_any_model(tmp_path, chroma_dir, monkeypatch):
+    monkeypatch.setattr(embedding_engine, "_engine", EmbeddingEngine(embedding_function=HashingEmbeddingFunction()))
+    seed = tmp_path / "seed.jsonl"
+    seed.write_text(json.dumps({"question": "what is rag", "answer": "SEEDED"}) + "\n")
+    cli.bulk_import(str(seed), cli.ChromaRepository(), ttl_seconds=0)
+
+    llm = CountingLLM()
+    node = EnhancedChatbotNode(llm, chroma_repo=cli.ChromaRepository(), cache=AnswerCache())
+    result = node.process({"messages": [{"content": "what is rag"}], "usecase": "Basic Chatbot"})
+    assert result["messages"][0].content.startswith("SEEDED")
+    assert llm.calls == 0
+
+    # ttl_seconds=0 never expires, so the compactor keeps the seed
+    monkeypatch.setattr(cache_policy, "now", lambda: cache_policy.NEVER - 1)
+    assert asyncio.run(CacheCompactor().compact("qa_collection", node.chroma_repo.manager))["deleted"] == 0
+
+
+def test_answer_cache_is_isolated_by_model_and_version(monkeypatch):
+    cache = AnswerCache()
+    first, second = CountingLLM("model-a"), CountingLLM("model-b")
+    state = {"messages": [{"content": "What is L1?"}], "usecase": "Basic Chatbot"}
+    EnhancedChatbotNode(first, chroma_repo=FakeRepository(), cache=cache).process(state)
+    assert EnhancedChatbotNode(second, chroma_repo=FakeRepository(), cache=cache).process(state)["messages"] == "answer from model-b"
+    assert cache.get("Basic Chatbot", "What is L1?", "model-a") == "answer from model-a"
+    monkeypatch.setenv("CACHE_VERSION", "2")
+    assert cache.get("Basic Chatbot", "What is L1?", "model-a") is None
+
+
+def test_answer_cache_ttl_is_capped_at_entry_expiry(monkeypatch):
+    monkeypatch.setattr(cache_policy, "now", lambda: 1_000)
+    cache = AnswerCache(ttl=3600)
+    cache.put("Basic Chatbot", "q", "a", expires_at=1_010)
+    _, l1_expires = cache.cache._data[cache.key("Basic Chatbot", "q")]
+    assert l1_expires <= time.monotonic() + 10
+    cache.put("Basic Chatbot", "gone", "a", expires_at=999)
+    assert cache.get("Basic Chatbot", "gone") is None
@@ -0,0 +1,109 @@
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+from app.cli import tune_thresholds
+from app.main import app
+from app.repositories.cache_thresholds import CacheThresholds, ThresholdRecorder, threshold_recorder
+
+client = TestClient(app)
+
+
+def _lookup(i, score, label=None, usecase="Basic Chatbot"):
+    return {"t": "l", "id": f"q{i}", "u": usecase, "q": f"question {i}", "s": [score], "c": f"cached {i}", "hit": label is not None, "label": label}
+
+
+def test_chat_lookups_and_feedback_are_recorded(fake_services, monkeypatch):
+    payload = {"provider": "Groq", "model": "tune-model", "usecase": "Basic Chatbot", "message": "How do thresholds work?"}
+    assert client.post("/chat", json={**payload, "message": "Not recorded"}).json()["query_id"] is None
+    monkeypatch.setattr(threshold_recorder, "enabled", True)
+    r = client.post("/chat", json=payload)
+    assert r.status_code == 200
+    query_id = r.json()["query_id"]
+    # Ids are per request, so feedback on one user's answer doesn't label everyone's
+    assert client.post("/chat/feedback", json={"query_id": "other", "helpful": True}).status_code == 200
+    assert query_id != client.post("/chat", json=payload).json()["query_id"]
+    assert client.post("/chat/feedback", json={"query_id": query_id, "helpful": False}).json() == {"recorded": True}
+
+    threshold_recorder.flush()
+    lookups, feedback = tune_thresholds.load_log(threshold_recorder.path)
+    assert [l["id"] for l in lookups][0] == query_id and lookups[0]["hit"] is False
+    assert feedback == {"other": True, query_id: False}
+
+
+def test_recorder_is_opt_in_and_rotates_its_log(tmp_path, monkeypatch):
+    monkeypatch.delenv("THRESHOLD_RECORDER_ENABLED", raising=False)
+    assert ThresholdRecorder().enabled is False
+    assert ThresholdRecorder().search_floor(0.8) == 0.8
+
+    monkeypatch.setenv("THRESHOLD_LOG_MAX_BYTES", "200")
+    recorder = ThresholdRecorder(path=str(tmp_path / "log.jsonl"), enabled=True)
+    for i in range(20):
+        recorder.record_feedback(f"q{i}", True)
+        recorder.flush()
+    assert recorder.rotations > 0
+    assert (tmp_path / "log.jsonl").stat().st_size < 400
+    _, feedback = tune_thresholds.load_log(recorder.path)
+    assert "q19" in feedback
+
+
+def test_recommendation_lowers_threshold_only_as_far_as_labels_allow():
+    rng = random.Random(7)
+    lookups = []
+    for i in range(400):
+        score = rng.uniform(0.55, 1.0)
+        # Candidates scoring under 0.7 are usually wrong answers; explored/served ones carry labels
+        label = (score >= 0.7 or rng.random() < 0.2) if rng.random() < 0.5 else None
+        lookups.append(_lookup(i, score, label))
+
+    report = tune_thresholds.tune(lookups, max_false_hit_rate=0.05, min_labels=20)
+    result = report["usecases"]["Basic Chatbot"]
+    assert 0.69 <= result["threshold"] < 0.8
+    assert result["llm_calls_saved_vs_default"] > 0
+    assert result["false_hit_rate"] <= 0.05
+
+
+def test_unlabelled_traffic_keeps_the_default():
+    lookups = [_lookup(i, 0.6 + i / 1000) for i in range(300)]
+    result = tune_thresholds.tune(lookups, fallback=0.8)["usecases"]["Basic Chatbot"]
+    assert result["threshold"] == 0.8
+    assert "not enough labelled hits" in result["reason"]
+
+
+def test_replay_skips_the_querys_own_stored_entry_and_drops_stale_labels():
+    lookups = [
+        {**_lookup(0, 0.9, True), "q": "what is rag", "c": "explain rag"},
+        {**_lookup(1, 0.9, True), "q": "what is hnsw", "c": "explain hnsw"},
+    ]
+
+    def search_many(queries, usecase, limit):
+        return [
+            [{"question": "what is rag", "score": 1.0}, {"question": "explain rag", "score": 0.88}],
+            [{"question": "hnsw index internals", "score": 0.93}],
+        ]
+
+    replayed = tune_thresholds.replay(lookups, search_many)
+    assert replayed[0]["s"] == [0.88] and replayed[0]["label"] is True
+    assert replayed[1]["c"] == "hnsw index internals" and replayed[1]["label"] is None
+
+
+def test_cli_writes_thresholds_the_node_loads(tmp_path, monkeypatch):
+    from app.nodes.enhanced_chatbot_node import EnhancedChatbotNode
+    from conftest import FakeRepository
+
+    log = tmp_path / "log.jsonl"
+    rng = random.Random(3)
+    with open(log, "w") as f:
+        for i in range(300):
+            score = rng.uniform(0.6, 1.0)
+            f.write(json.dumps({"t": "l", "id": f"q{i}", "u": "Basic Chatbot", "q": f"q{i}", "s": [score], "c": f"c{i}", "hit": True}) + "\n")
+            f.write(json.dumps({"t": "f", "id": f"q{i}", "ok": score >= 0.72}) + "\n")
+    output = tmp_path / "thresholds.json"
+    assert tune_thresholds.main(["--log", str(log), "--output", str(output), "--no-replay"]) == 0
+
+    thresholds = CacheThresholds(str(output))
+    thresholds.load()
+    node = EnhancedChatbotNode(model=None, chroma_repo=FakeRepository(), thresholds=thresholds)
+    assert 0.71 <= node.similarity_threshold("Basic Chatbot") < 0.8
+    assert node.similarity_threshold("Chatbot With Web") == thresholds.default
@@ -11,3 +11,38 @@ def test_chat_invalid_provider():
     })
     assert r.status_code == 400
 
+
+def _sse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], lines["data"]))
+    return events
+
+
+def test_chat_stream_tokens_then_cache_hit(fake_services):
+    payload = {'provider': 'Groq', 'model': 'fake', 'usecase': 'Basic Chatbot', 'message': 'Stream me'}
+    first = client.post('/chat/stream', json=payload)
+    assert first.status_code == 200
+    assert first.headers['content-type'].startswith('text/event-stream')
+    events = _sse_events(first.text)
+    assert events[0][0] == 'start'
+    tokens = [data for event, data in events if event == 'token']
+    assert len(tokens) > 1
+    assert events[-1] == ('done', '{"from_cache": false}')
+    assert fake_services['repositories']['qa_collection'].store_calls == 1
+
+    second = _sse_events(client.post('/chat/stream', json=payload).text)
+    assert [event for event, _ in second] == ['start', 'cache', 'done']
+    assert second[-1] == ('done', '{"from_cache": true}')
+
+
+def test_exact_repeat_served_from_l1_cache(fake_services):
+    payload = {'provider': 'Groq', 'model': 'fake', 'usecase': 'Basic Chatbot', 'message': 'What is RAG?'}
+    assert client.post('/chat', json=payload).json()['from_cache'] is False
+    repeat = client.post('/chat', json={**payload, 'message': '  what is   RAG '})
+    assert repeat.json()['from_cache'] is True
+    repo = fake_services['repositories']['qa_collection']
+    assert repo.search_calls == 1
+    stats = client.get('/stats/cache').json()['usecases']['Basic Chatbot']
+    assert stats['l1_hits'] == 1 and stats['misses'] == 1 and stats['l2_hits'] == 0
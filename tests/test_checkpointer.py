@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from app.graph.checkpointer import SnapshotMemorySaver, checkpointed_run, thread_config
+from app.graph.enhanced_graph_builder import EnhancedGraphBuilder
+from app.repositories.news_cache import news_cache
+from conftest import FakeRepository
+
+
+class CountingTavily:
+    def __init__(self):
+        self.calls = 0
+
+    def search(self, **kwargs):
+        self.calls += 1
+        return {"results": [{"url": "https://example.com/a", "content": "A", "published_date": "2024-01-01"}]}
+
+
+class FlakySummaryModel(FakeListChatModel):
+    fail: bool = True
+
+    def _call(self, *args, **kwargs):
+        if self.fail:
+            raise RuntimeError("groq 503")
+        return super()._call(*args, **kwargs)
+
+
+def _run(graph, state, thread_id):
+    async def go():
+        async with checkpointed_run(graph, state, thread_id) as (graph_input, config):
+            return await graph.ainvoke(graph_input, config)
+    return asyncio.run(go())
+
+
+def test_interrupted_news_run_resumes_after_restart(monkeypatch, tmp_path, isolated_search_cache):
+    tavily = CountingTavily()
+    monkeypatch.setattr("app.nodes.ai_news_node.tavily.TavilyClient", lambda api_key=None: tavily)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "AINews").mkdir()
+    news_cache.clear()
+    path = str(tmp_path / "checkpoints.pkl")
+    state = {"messages": ["daily"], "user_message": "daily", "usecase": "AI News"}
+
+    saver = SnapshotMemorySaver(path)
+    graph = EnhancedGraphBuilder(FlakySummaryModel(responses=["### 2024-01-01"]), news_repo=FakeRepository(), chroma_repo=FakeRepository(), checkpointer=saver).setup_graph("AI News")
+    with pytest.raises(RuntimeError):
+        _run(graph, state, "news:daily")
+    assert saver.snapshot()
+
+    # New process: in-memory caches are gone, only the checkpoint snapshot survives
+    news_cache.clear()
+    isolated_search_cache.clear()
+    restarted = SnapshotMemorySaver(path)
+    llm = FlakySummaryModel(responses=["### 2024-01-01\n- [A](https://example.com/a)"], fail=False)
+    graph = EnhancedGraphBuilder(llm, news_repo=FakeRepository(), chroma_repo=FakeRepository(), checkpointer=restarted).setup_graph("AI News")
+    assert asyncio.run(graph.aget_state(thread_config("news:daily"))).next == ("summarize_news",)
+
+    result = _run(graph, state, "news:daily")
+    assert result["summary"].startswith("### 2024-01-01")
+    assert tavily.calls == 1
+    # Completed threads are dropped so the store only holds in-flight runs
+    assert "news:daily" not in restarted.storage
+
+
+def test_stateless_threads_are_not_kept_on_failure():
+    saver = SnapshotMemorySaver("unused.pkl", interval=3600)
+    graph = EnhancedGraphBuilder(FlakySummaryModel(responses=["x"]), chroma_repo=FakeRepository(), checkpointer=saver).setup_graph("Basic Chatbot")
+
+    async def go():
+        async with checkpointed_run(graph, {"messages": [HumanMessage(content="hi")], "usecase": "Basic Chatbot"}, "chat:tmp", resumable=False) as (graph_input, config):
+            await graph.ainvoke(graph_input, config)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(go())
+    assert "chat:tmp" not in saver.storage
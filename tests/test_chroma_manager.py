@@ -0,0 +1,70 @@
+from app.database.chroma_manager import ChromaManager
+from app.database.embedding_engine import EmbeddingEngine
+from conftest import HashingEmbeddingFunction
+
+
+def test_store_reuses_search_embedding(chroma_dir):
+    ef = HashingEmbeddingFunction()
+    manager = ChromaManager(embedding_engine=EmbeddingEngine(embedding_function=ef))
+    assert manager.search_similar_questions("what is a vector database", usecase="Basic Chatbot") == []
+    assert manager.store_qa_pair("what is a vector database", "A store for embeddings", usecase="Basic Chatbot")
+    assert ef.texts == 1
+
+    hits = manager.search_similar_questions("what is a vector database", usecase="Basic Chatbot")
+    assert hits[0]["answer"] == "A store for embeddings"
+    assert hits[0]["score"] > 0.99
+    assert manager.search_similar_questions("what is a vector database", usecase="AI News") == []
+
+
+def test_store_qa_pairs_upserts_and_refreshes_duplicates(chroma_dir):
+    manager = ChromaManager(embedding_engine=EmbeddingEngine(embedding_function=HashingEmbeddingFunction()))
+    assert manager.store_qa_pairs([
+        {"question": "q1", "answer": "old", "usecase": "Basic Chatbot"},
+        {"question": "q2", "answer": "a2", "usecase": "Basic Chatbot"},
+        {"question": "q1", "answer": "new", "usecase": "Basic Chatbot"},
+    ])
+    assert manager.collection.count() == 2
+    assert manager.search_similar_questions("q1", usecase="Basic Chatbot")[0]["answer"] == "new"
+
+
+def test_search_many_matches_single_searches(chroma_dir):
+    ef = HashingEmbeddingFunction()
+    manager = ChromaManager(embedding_engine=EmbeddingEngine(embedding_function=ef))
+    manager.store_qa_pairs([
+        {"question": "how do transformers work", "answer": "attention", "usecase": "Basic Chatbot"},
+        {"question": "what is retrieval augmented generation", "answer": "rag", "usecase": "Basic Chatbot"},
+    ])
+    queries = ["how do transformers work", "completely unrelated words here", "what is retrieval augmented generation"]
+    calls_before = ef.calls
+    batched = manager.search_many(queries, usecase="Basic Chatbot", limit=2, score_threshold=0.8)
+    assert ef.calls == calls_before + 1
+    assert [[h["answer"] for h in hits] for hits in batched] == [["attention"], [], ["rag"]]
+    for query, hits in zip(queries, batched):
+        assert hits == manager.search_similar_questions(query, usecase="Basic Chatbot", limit=2, score_threshold=0.8)
+
+
+def test_ragged_results_at_zero_threshold_skip_padding():
+    results = {
+        "distances": [[0.1, 0.4], [0.2], []],
+        "metadatas": [[{"question": "a", "answer": "1"}, {"question": "b", "answer": "2"}], [{"question": "c", "answer": "3"}], []],
+    }
+    hits = ChromaManager._hits_from_results(results, 3, score_threshold=0.0)
+    assert [[h["answer"] for h in row] for row in hits] == [["1", "2"], ["3"], []]
+
+
+def test_lightweight_manager_hits_match_chroma_manager_shape():
+    from app.database.lightweight_chroma_manager import LightweightChromaManager
+
+    class StubCollection:
+        def query(self, **kwargs):
+            return {
+                "documents": [["what is rag"], []],
+                "distances": [[0.1], []],
+                "metadatas": [[{"question": "what is rag", "answer": "retrieval", "usecase": "Basic Chatbot"}], []],
+            }
+
+    manager = LightweightChromaManager.__new__(LightweightChromaManager)
+    manager.collection = StubCollection()
+    hits = manager.search_many(["what is rag", "nothing"], usecase="Basic Chatbot", score_threshold=0.5)
+    assert hits == [[{"question": "what is rag", "answer": "retrieval", "score": 0.9, "metadata": {"usecase": "Basic Chatbot"}}], []]
+    assert manager.search_similar_questions("what is rag", usecase="Basic Chatbot", score_threshold=0.5) == hits[0]
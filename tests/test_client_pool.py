@@ -0,0 +1,93 @@
+import pytest
+
+from app.database import client_pool as pool_module
+from app.database.chroma_manager import ChromaManager
+from app.database.client_pool import ChromaClientPool
+from app.database.embedding_engine import EmbeddingEngine
+from conftest import HashingEmbeddingFunction
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ChromaClientPool(health_check_interval=0)
+    monkeypatch.setattr("app.database.chroma_manager.client_pool", pool)
+    return pool
+
+
+def _manager(name="qa_collection"):
+    return ChromaManager(collection_name=name, embedding_engine=EmbeddingEngine(embedding_function=HashingEmbeddingFunction()))
+
+
+def test_managers_share_client_and_collection_handle(chroma_dir, pool):
+    first, second = _manager(), _manager()
+    news = _manager("ai_news_collection")
+    assert first.client is second.client is news.client
+    assert first.collection is second.collection
+    stats = pool.stats()
+    assert stats["clients_created"] == 1
+    assert stats["collections"] == 2
+
+
+class BrokenRemoteClient:
+    def __init__(self, **kwargs):
+        pass
+
+    def list_collections(self):
+        raise ValueError("missing _type in configuration")
+
+    def get_collection(self, **kwargs):
+        raise ValueError("missing _type in configuration")
+
+    def create_collection(self, **kwargs):
+        raise ValueError("missing _type in configuration")
+
+    def heartbeat(self):
+        raise ConnectionError("down")
+
+
+def test_remote_config_error_falls_back_pool_wide(chroma_dir, pool, monkeypatch):
+    monkeypatch.setenv("CHROMA_HOST_ADDR", "chroma.invalid")
+    monkeypatch.setattr(pool_module.chromadb, "HttpClient", BrokenRemoteClient)
+    first = _manager()
+    assert first._is_remote is False
+    second = _manager("ai_news_collection")
+    assert second._is_remote is False
+    assert not isinstance(second.client, BrokenRemoteClient)
+    assert pool.stats()["fallbacks"] == {"chroma.invalid:8000": str(chroma_dir)}
+
+
+def test_failed_health_check_evicts_client(chroma_dir, pool, monkeypatch):
+    monkeypatch.setenv("CHROMA_HOST_ADDR", "chroma.invalid")
+    monkeypatch.setattr(pool_module.chromadb, "HttpClient", BrokenRemoteClient)
+    client = pool.get_client()
+    assert pool.health_check() is False
+    assert pool.get_client() is not client
+
+
+def test_slow_collection_open_does_not_block_cached_lookups():
+    import threading
+
+    pool = ChromaClientPool()
+    key = (None, None, "unused")
+    pool._clients[key] = object()
+    release = threading.Event()
+    opens = []
+
+    def slow_opener(client):
+        opens.append(1)
+        release.wait(5)
+        return "slow-handle"
+
+    pool.get_collection("warm", lambda client: "warm-handle", key)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.get_collection("cold", slow_opener, key))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    # Cached handles and stats stay available while the cold open is in progress
+    assert pool.get_collection("warm", lambda client: "reopened", key) == "warm-handle"
+    assert pool.stats()["collections"] == 1
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == ["slow-handle", "slow-handle"]
+    assert len(opens) == 1
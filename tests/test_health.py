@@ -0,0 +1,65 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.health import HealthMonitor
+
+client = TestClient(app)
+
+
+class LoadedEngine:
+    loaded = True
+
+    def stats(self):
+        return {"model_calls": 0}
+
+
+def test_readiness_snapshot_reports_collection_stats(fake_services, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setattr("app.services.health.get_embedding_engine", lambda: LoadedEngine())
+    monitor = HealthMonitor(interval=60)
+    monkeypatch.setattr("app.main.health_monitor", monitor)
+
+    assert client.get("/ready").status_code == 503
+    asyncio.run(monitor.check())
+
+    r = client.get("/ready")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["ready"] is True
+    assert data["checks"]["chroma_db"]["collections"]["qa_collection"]["collection_name"] == "qa_collection"
+    assert data["checks"]["llm_provider"]["ok"] is True
+    assert client.get("/health").json()["services"]["chroma_db"] == "up"
+
+
+def test_failing_probe_marks_not_ready_without_failing_liveness(fake_services, monkeypatch):
+    monitor = HealthMonitor(interval=60, timeout=0.2)
+
+    class SlowEngine(LoadedEngine):
+        loaded = False
+
+        def warm_up(self):
+            import time
+            time.sleep(1)
+
+    monkeypatch.setattr("app.services.health.get_embedding_engine", lambda: SlowEngine())
+    monkeypatch.setattr("app.main.health_monitor", monitor)
+    asyncio.run(monitor.check())
+
+    r = client.get("/ready")
+    assert r.status_code == 503
+    assert "timed out" in r.json()["checks"]["embedding_model"]["error"]
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["services"]["embedding_model"] == "down"
+
+
+def test_stale_snapshot_is_not_ready(fake_services, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setattr("app.services.health.get_embedding_engine", lambda: LoadedEngine())
+    monitor = HealthMonitor(interval=1)
+    asyncio.run(monitor.check())
+    assert monitor.readiness()["ready"] is True
+    monitor._checked_at -= 10
+    assert monitor.readiness()["ready"] is False
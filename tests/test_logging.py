@@ -0,0 +1,70 @@
+import io
+import json
+import logging
+
+from app.common.logger import DeferredQueueHandler, JsonFormatter, SamplingFilter, parse_sample_rates
+from app.common.tracing import Trace, root_span
+
+
+def _record(msg, *args, level=logging.INFO, module="chat_service", **extra):
+    record = logging.LogRecord("app.common.logger", level, f"/app/services/{module}.py", 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_truncates_message_and_extras(monkeypatch):
+    monkeypatch.setenv("LOG_MAX_FIELD_CHARS", "20")
+    line = JsonFormatter().format(_record("state: %s", "x" * 100, usecase="Basic Chatbot", payload="y" * 50))
+    data = json.loads(line)
+    assert data["level"] == "INFO" and data["module"] == "chat_service"
+    assert data["message"].startswith("state: xxxxxxxxxxxxx...[")
+    assert data["message"].endswith("more chars]")
+    assert data["usecase"] == "Basic Chatbot"
+    assert data["payload"] == "y" * 20 + "...[30 more chars]"
+
+
+def test_sampling_filter_drops_only_below_warning(monkeypatch):
+    monkeypatch.setattr("app.common.logger.random.random", lambda: 0.5)
+    sampler = SamplingFilter(parse_sample_rates("chat_service=0.1, chroma_manager=0.9"))
+    assert sampler.filter(_record("kept", module="chroma_manager"))
+    assert not sampler.filter(_record("dropped"))
+    assert sampler.filter(_record("warn", level=logging.WARNING))
+    assert sampler.filter(_record("unsampled module", module="registry"))
+    assert sampler.dropped == 1
+
+
+def test_queue_handler_resolves_args_on_caller_and_tags_trace():
+    import queue
+
+    q = queue.SimpleQueue()
+    handler = DeferredQueueHandler(q)
+    state = {"messages": ["hi"]}
+    trace = Trace()
+    with root_span(trace, "request"):
+        handler.handle(_record("state: %s", state))
+    state["messages"].append("mutated later")
+
+    record = q.get_nowait()
+    assert record.getMessage() == "state: {'messages': ['hi']}"
+    assert record.trace_id == trace.trace_id
+
+
+def test_hot_path_logs_do_not_format_state_at_info(fake_services, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.common.logger import logger
+    from app.main import app
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    try:
+        payload = {"provider": "Groq", "model": "log-model", "usecase": "Basic Chatbot", "message": "secret question text"}
+        assert TestClient(app).post("/chat", json=payload).status_code == 200
+    finally:
+        logger.removeHandler(handler)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines
+    assert not any("secret question text" in line["message"] for line in lines)
+    assert any(line.get("usecase") == "Basic Chatbot" for line in lines)
@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from app.common.metrics import MetricsRegistry
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    h = registry.histogram("op_seconds", "Op latency", ["op"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        h.observe(value, op="search")
+    registry.counter("hits_total", "Hits", ["cache"]).inc(cache='a"b')
+
+    text = registry.render()
+    assert 'op_seconds_bucket{op="search",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{op="search",le="1"} 2' in text
+    assert 'op_seconds_bucket{op="search",le="+Inf"} 3' in text
+    assert 'op_seconds_count{op="search"} 3' in text
+    assert 'hits_total{cache="a\\"b"} 1' in text
+    assert "# TYPE op_seconds histogram" in text
+
+
+def test_metrics_endpoint_covers_chat_path(fake_services):
+    payload = {"provider": "Groq", "model": "metrics-model", "usecase": "Basic Chatbot", "message": "What is a histogram?"}
+    assert client.post("/chat", json=payload).status_code == 200
+    assert client.post("/chat", json=payload).json()["from_cache"] is True
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    assert 'http_request_duration_seconds_count{method="POST",path="/chat",status="200"}' in text
+    assert 'graph_run_duration_seconds_count{usecase="Basic Chatbot",mode="invoke"}' in text
+    assert 'llm_call_duration_seconds_count{model="metrics-model",status="ok"} 1' in text
+    assert 'graph_build_duration_seconds_count{usecase="Basic Chatbot"}' in text
+    assert 'answer_cache_requests_total{usecase="Basic Chatbot",tier="l1_hits"}' in text
+    assert "http_requests_in_flight" in text
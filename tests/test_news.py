@@ -9,3 +9,214 @@ def test_news_requires_backend_defaults(monkeypatch):
     monkeypatch.setenv('DEFAULT_MODEL','llama-3.1-70b-versatile')
     r = client.post('/news/summary', json={'timeframe': 'last 24 hours'})
     assert r.status_code in (200, 500)
+
+
+@pytest.mark.asyncio
+async def test_digest_is_generated_once_then_served_from_memory(tmp_path):
+    import asyncio
+    from app.services.news_digest import NewsDigestStore
+
+    calls = []
+
+    async def generate(frequency):
+        calls.append(frequency)
+        await asyncio.sleep(0.05)
+        return {"summary": f"{frequency} digest {len(calls)}", "filename": f"{frequency}.md"}
+
+    store = NewsDigestStore(generator=generate, directory=str(tmp_path))
+    first, second = await asyncio.gather(store.get_or_refresh("weekly"), store.get_or_refresh("weekly"))
+    assert first["summary"] == second["summary"] == "weekly digest 1"
+    third = await store.get_or_refresh("weekly")
+    assert third["stale"] is False and third["age_seconds"] < 5
+    assert calls == ["weekly"]
+
+
+@pytest.mark.asyncio
+async def test_stale_digest_served_immediately_and_refreshed_in_background(tmp_path, monkeypatch):
+    import asyncio
+    from app.services.news_digest import NewsDigestStore
+
+    import os
+    import time
+
+    (tmp_path / "daily_summary.md").write_text("# Daily AI News Summary\n\nold news")
+    two_hours_ago = time.time() - 7200
+    os.utime(tmp_path / "daily_summary.md", (two_hours_ago, two_hours_ago))
+    refreshed = asyncio.Event()
+
+    async def generate(frequency):
+        refreshed.set()
+        return {"summary": "fresh news"}
+
+    store = NewsDigestStore(generator=generate, directory=str(tmp_path))
+    served = await store.get_or_refresh("daily")
+    assert served["summary"] == "old news"
+    assert served["stale"] is True
+    await asyncio.wait_for(refreshed.wait(), 1)
+    await asyncio.sleep(0)
+    assert (await store.get_or_refresh("daily"))["summary"] == "fresh news"
+
+
+@pytest.mark.asyncio
+async def test_fresh_digest_on_disk_is_not_regenerated_after_restart(tmp_path):
+    from app.services.news_digest import NewsDigestStore
+
+    (tmp_path / "weekly_summary.md").write_text("# Weekly AI News Summary\n\nrecent news")
+    calls = []
+
+    async def generate(frequency):
+        calls.append(frequency)
+        return {"summary": "regenerated"}
+
+    store = NewsDigestStore(generator=generate, directory=str(tmp_path))
+    served = await store.get_or_refresh("weekly")
+    assert served["summary"] == "recent news" and served["stale"] is False
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_backs_off_exponentially(tmp_path, monkeypatch):
+    import asyncio
+    import time
+    from app.services.news_digest import NewsDigestStore
+
+    monkeypatch.setenv("NEWS_DIGEST_RETRY_SECONDS", "30")
+    calls = []
+
+    async def generate(frequency):
+        calls.append(frequency)
+        raise RuntimeError("tavily down")
+
+    store = NewsDigestStore(generator=generate, directory=str(tmp_path))
+    scheduler = asyncio.ensure_future(store.run_scheduler(tick_seconds=0.01))
+    await asyncio.sleep(0.1)
+    scheduler.cancel()
+    await asyncio.gather(scheduler, return_exceptions=True)
+    # One attempt per frequency; every later tick falls inside the backoff window
+    assert sorted(calls) == sorted(["daily", "weekly", "monthly", "year"])
+    assert store.backing_off("daily")
+
+    store._retry_at["daily"] = 0
+    with pytest.raises(RuntimeError):
+        await store.refresh("daily")
+    assert store.stats()["refresh_failures"] == 5
+    # Second consecutive failure: 30s doubled
+    assert store._failures["daily"] == 2
+    assert 30 < store._retry_at["daily"] - time.monotonic() <= 60
+
+
+def test_news_summary_endpoint_reports_digest_age(monkeypatch):
+    from app.services import news_digest
+
+    async def generate(frequency):
+        return {"summary": "monthly digest", "filename": "./AINews/monthly_summary.md", "from_cache": True}
+
+    store = news_digest.NewsDigestStore(generator=generate, directory="/nonexistent")
+    monkeypatch.setattr("app.main.news_digests", store)
+    r = client.post('/news/summary', json={'timeframe': 'last month'})
+    assert r.status_code == 200
+    body = r.json()
+    assert body['summary'] == 'monthly digest'
+    assert body['frequency'] == 'monthly'
+    assert body['from_cache'] is True
+    assert body['stale'] is False
+    assert body['age_seconds'] >= 0
+
+
+class FakeTavily:
+    def __init__(self, api_key=None):
+        self.calls = 0
+
+    def search(self, **kwargs):
+        self.calls += 1
+        return {"results": [
+            {"url": "https://example.com/a", "content": "A", "published_date": "2024-01-02"},
+            {"url": "https://EXAMPLE.com/a/", "content": "A again", "published_date": "2024-01-02"},
+            {"url": "https://example.com/b", "content": "B", "published_date": "2024-01-01"},
+        ]}
+
+
+@pytest.fixture
+def news_graph(monkeypatch, tmp_path):
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from app.graph.enhanced_graph_builder import EnhancedGraphBuilder
+    from app.repositories.news_cache import news_cache
+    from conftest import FakeRepository
+
+    tavily = FakeTavily()
+    monkeypatch.setattr("app.nodes.ai_news_node.tavily.TavilyClient", lambda api_key=None: tavily)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "AINews").mkdir()
+    news_cache.clear()
+    builder = EnhancedGraphBuilder(FakeListChatModel(responses=["### digest"]), chroma_repo=FakeRepository(), news_repo=FakeRepository())
+    yield builder.setup_graph("AI News"), tavily
+    news_cache.clear()
+
+
+def test_news_cache_hits_within_ttl(news_graph):
+    graph, tavily = news_graph
+    state = {"messages": ["daily"], "user_message": "last 24 hours", "usecase": "AI News"}
+    first = graph.invoke(state)
+    assert first["from_cache"] is False
+    assert [a["url"] for a in first["news_data"]] == ["https://example.com/a", "https://example.com/b"]
+    assert first["summary"] == "### digest"
+
+    second = graph.invoke(state)
+    assert second["from_cache"] is True
+    assert second["news_data"] == first["news_data"]
+    assert tavily.calls == 1
+
+    graph.invoke({**state, "messages": ["weekly"]})
+    assert tavily.calls == 2
+
+
+def test_news_cache_expires_after_ttl(news_graph, monkeypatch):
+    graph, tavily = news_graph
+    monkeypatch.setenv("NEWS_CACHE_TTL_DAILY_SECONDS", "0.01")
+    monkeypatch.setenv("SEARCH_CACHE_TTL_NEWS_SECONDS", "0.01")
+    state = {"messages": ["daily"], "usecase": "AI News"}
+    graph.invoke(state)
+    import time
+    time.sleep(0.05)
+    assert graph.invoke(state)["from_cache"] is False
+    assert tavily.calls == 2
+
+
+def test_map_reduce_summarizer_chunks_and_merges():
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from app.nodes.news_summarizer import MapReduceSummarizer, chunk_articles
+
+    articles = [{"url": f"https://example.com/{i}", "content": "x" * 400, "published_date": f"2024-01-0{i}"} for i in range(1, 5)]
+    assert [len(c) for c in chunk_articles(articles, 250)] == [2, 2]
+
+    llm = FakeListChatModel(responses=[
+        "### 2024-01-02\n- [older](https://example.com/2)\n### 2024-01-01\n- [oldest](https://example.com/1)",
+        "Here is the digest:\n### 2024-01-04\n- [newest](https://example.com/4)\n### 2024-01-02\n- [older](https://example.com/2)",
+    ])
+    summary = MapReduceSummarizer(llm, lambda chunk: str(chunk), chunk_tokens=250, max_concurrency=1).summarize(articles)
+    assert summary == (
+        "### 2024-01-04\n- [newest](https://example.com/4)\n\n"
+        "### 2024-01-02\n- [older](https://example.com/2)\n\n"
+        "### 2024-01-01\n- [oldest](https://example.com/1)"
+    )
+
+
+def test_preprocessor_dedupes_trims_sorts_and_caps():
+    from app.nodes.news_preprocessor import NewsPreprocessor
+
+    story = "OpenAI released a new reasoning model today that beats previous benchmarks on math and coding tasks by a wide margin"
+    articles = [
+        {"url": "https://a.com/1", "content": story + "\nSubscribe to our newsletter", "published_date": "Mon, 01 Jan 2024 10:00:00 GMT"},
+        {"url": "https://b.com/1", "content": story + " according to reports", "published_date": "2024-01-03T08:00:00Z"},
+        {"url": "https://c.com/1", "content": "Google DeepMind published a paper on protein folding " * 40, "published_date": "2024-01-02"},
+        {"url": "https://d.com/1", "content": "A startup in Bengaluru raised funding for speech recognition " * 40, "published_date": "2023-12-30"},
+    ]
+    processed, stats = NewsPreprocessor(article_max_tokens=60, total_max_tokens=170, duplicate_threshold=0.7).process(articles)
+
+    # First of the near-duplicates wins; the rest are latest first until the budget runs out
+    assert [a["url"] for a in processed] == ["https://c.com/1", "https://a.com/1"]
+    assert stats["duplicates_removed"] == 1
+    assert all("Subscribe" not in a["content"] for a in processed)
+    assert processed[0]["content"].endswith("…")
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"] > 0
+    assert stats["tokens_after"] <= 170
@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.common.lru_cache import LRUCache
+from app.services.registry import ServiceRegistry, registry
+
+client = TestClient(app)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_chat_reuses_compiled_graph(fake_services):
+    payload = {'provider': 'Groq', 'model': 'fake', 'usecase': 'Basic Chatbot', 'message': 'Hello'}
+    first = client.post('/chat', json=payload)
+    second = client.post('/chat', json={**payload, 'message': 'Another question'})
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json()['content'] == 'answer from fake'
+    stats = client.get('/stats/registry').json()
+    assert stats['graphs']['misses'] == 1
+    assert stats['graphs']['hits'] == 1
+    assert len(fake_services['llms']) == 1
+
+
+def test_registry_bounded_graph_cache(fake_services):
+    small = ServiceRegistry(max_graphs=1)
+    small.get_graph('Groq', 'a', 'Basic Chatbot')
+    small.get_graph('Groq', 'b', 'Basic Chatbot')
+    assert small.graphs.stats()['evictions'] == 1
+    assert len(small.graphs) == 1
+
+
+def test_cache_search_endpoint_batches_queries(fake_services):
+    calls = []
+
+    def search_many(queries, usecase, limit=5, score_threshold=0.8):
+        calls.append(list(queries))
+        return [[{"question": q, "answer": "cached", "score": 0.9, "metadata": {}}] if q == "hit" else [] for q in queries]
+
+    repo = registry.get_repository("qa_collection", "nomic-embed-text")
+    repo.search_many = search_many
+    r = client.post('/cache/search', json={'queries': ['hit', 'miss', 'hit'], 'usecase': 'Basic Chatbot'})
+    assert r.status_code == 200
+    body = r.json()
+    assert calls == [['hit', 'miss', 'hit']]
+    assert body['hit_count'] == 2
+    assert [len(item['hits']) for item in body['results']] == [1, 0, 1]
+    assert client.post('/cache/search', json={'queries': []}).status_code == 422
+    assert client.post('/cache/search', json={'queries': ['x'], 'collection_name': 'attacker_made'}).status_code == 422
+    assert ('attacker_made', 'nomic-embed-text') not in registry.repositories
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.common.tokens import estimate_message_tokens
+from app.main import app
+from app.services.session_store import SessionStore, session_store
+
+client = TestClient(app)
+
+
+def test_window_slides_and_evicted_turns_are_summarized():
+    store = SessionStore(window_tokens=60)
+    for i in range(6):
+        store.append("s1", HumanMessage(content=f"question {i} " + "word " * 10), AIMessage(content=f"answer {i} " + "word " * 10))
+
+    session = store.get("s1")
+    assert session.turns == 6
+    assert isinstance(session.messages[0], HumanMessage)
+    assert estimate_message_tokens(session.messages) <= 60
+    assert len(session.pending) == 12 - len(session.messages)
+
+    asyncio.run(store.summarize("s1", FakeListChatModel(responses=["user asked questions 0-3"])))
+    prompt = store.prompt_messages("s1", HumanMessage(content="and the first one?"))
+    assert isinstance(prompt[0], SystemMessage) and "user asked questions 0-3" in prompt[0].content
+    assert prompt[1:-1] == session.messages
+    assert prompt[-1].content == "and the first one?"
+    assert session.pending == []
+
+
+def test_summary_falls_back_to_transcript_when_llm_fails():
+    class BrokenModel(FakeListChatModel):
+        def _call(self, *args, **kwargs):
+            raise RuntimeError("rate limited")
+
+    store = SessionStore(window_tokens=20, summary_tokens=50)
+    store.append("s1", HumanMessage(content="my name is Ada " * 5), AIMessage(content="hello"))
+    store.append("s1", HumanMessage(content="what's new?"), AIMessage(content="lots"))
+    asyncio.run(store.summarize("s1", BrokenModel(responses=[""])))
+    assert "Ada" in store.get("s1").summary
+    assert store.stats()["summary_failures"] == 1
+
+
+def test_idle_sessions_expire_and_lru_bounds_the_store():
+    store = SessionStore(maxsize=2, ttl=0.05)
+    store.append("a", HumanMessage(content="hi"), AIMessage(content="hello"))
+    store.append("b", HumanMessage(content="hi"), AIMessage(content="hello"))
+    store.append("c", HumanMessage(content="hi"), AIMessage(content="hello"))
+    assert store.stats()["active"] == 2
+    assert store.get("a").turns == 0
+
+    time.sleep(0.1)
+    assert store.get("c").turns == 0
+
+
+def test_chat_session_carries_history_and_bypasses_answer_cache(fake_services):
+    session_store.clear()
+    payload = {"provider": "Groq", "model": "m", "usecase": "Basic Chatbot", "message": "What is RAG?", "session_id": "abc"}
+    first = client.post("/chat", json=payload)
+    assert first.status_code == 200
+    assert first.json()["session_id"] == "abc"
+
+    # Same words, but now a follow-up in a conversation: answered by the LLM with history, not from the caches
+    second = client.post("/chat", json=payload)
+    assert second.json()["from_cache"] is False
+    assert [m.type for m in session_store.get("abc").messages] == ["human", "ai", "human", "ai"]
+
+    stateless = client.post("/chat", json={**payload, "session_id": None})
+    assert stateless.json()["from_cache"] is True
+    assert client.get("/stats/sessions").json()["active"] == 1
+    session_store.clear()
+
+
+def test_chat_stream_appends_turn_to_session(fake_services):
+    session_store.clear()
+    payload = {"provider": "Groq", "model": "m", "usecase": "Basic Chatbot", "message": "Hi there", "session_id": "stream-1"}
+    with client.stream("POST", "/chat/stream", json=payload) as r:
+        body = "".join(r.iter_text())
+    assert "event: done" in body
+    assert [m.content for m in session_store.get("stream-1").messages] == ["Hi there", "answer from m"]
+    session_store.clear()
+
+
+def test_session_thread_ids_are_not_shared_between_concurrent_or_different_turns():
+    from app.services.chat_service import ChatService
+    from app.services.session_store import session_store
+
+    with ChatService._thread("s-threads", "What is RAG?") as (first, resumable):
+        assert resumable
+        # Same turn in flight elsewhere: a throwaway thread, never the one being run
+        with ChatService._thread("s-threads", "What is RAG?") as (concurrent, concurrent_resumable):
+            assert concurrent != first and not concurrent_resumable
+        with ChatService._thread("s-threads", "Something else") as (other, _):
+            assert other != first
+    # A retry of the same turn after a failure resumes its thread
+    with ChatService._thread("s-threads", "What is RAG?") as (retry, _):
+        assert retry == first
+    session_store.sessions.clear()
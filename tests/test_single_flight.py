@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.common.single_flight import SingleFlight
+from app.main import app
+
+
+class CountingChatModel(FakeListChatModel):
+    """Slow fake LLM that counts how many upstream calls it actually served."""
+
+    calls: int = 0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_questions_share_one_llm_call(fake_services, monkeypatch):
+    llm = CountingChatModel(responses=["shared answer"])
+    monkeypatch.setattr("app.services.registry.LLMFactory.create", staticmethod(lambda provider, model: llm))
+    payload = {'provider': 'Groq', 'model': 'counting', 'usecase': 'Basic Chatbot'}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        responses = await asyncio.gather(*[
+            ac.post('/chat', json={**payload, 'message': 'What happened at the AI summit?' if i % 2 else 'what happened at the AI summit'})
+            for i in range(50)
+        ])
+        other = await ac.post('/chat', json={**payload, 'message': 'A different question'})
+
+    assert all(r.status_code == 200 for r in responses)
+    assert {r.json()['content'] for r in responses} == {'shared answer'}
+    assert other.status_code == 200
+    assert llm.calls == 2
+
+
+def test_sync_single_flight_shares_result_across_threads():
+    flight = SingleFlight("test")
+    calls = []
+    gate = threading.Event()
+
+    def search():
+        calls.append(1)
+        gate.wait(1)
+        return ["article"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, ("news", "daily"), search) for _ in range(8)]
+        time.sleep(0.1)
+        gate.set()
+        results = [f.result() for f in futures]
+
+    assert results == [["article"]] * 8
+    assert len(calls) == 1
+    assert flight.stats()["shared_results"] == 7
+    assert flight.do(("news", "daily"), lambda: ["fresh"]) == ["fresh"]
+
+
+def test_sync_single_flight_propagates_errors():
+    flight = SingleFlight("test")
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.stats()["in_flight"] == 0
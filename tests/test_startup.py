@@ -0,0 +1,78 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from app.common.lazy import LazyModule, lazy_import
+from app.services.prewarm import Prewarmer
+
+
+def test_lazy_module_imports_on_first_attribute_access(monkeypatch):
+    monkeypatch.setenv("LAZY_IMPORTS", "true")
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = lazy_import("colorsys")
+    assert isinstance(module, LazyModule) and not module.loaded
+    assert "colorsys" not in sys.modules
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert module.loaded
+
+    monkeypatch.setenv("LAZY_IMPORTS", "false")
+    assert not isinstance(lazy_import("colorsys"), LazyModule)
+
+
+def test_importing_app_defers_heavy_dependencies():
+    code = "import sys, app.main; print(sorted(m for m in ('chromadb', 'langchain_tavily', 'numpy', 'tavily') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         env={"LAZY_IMPORTS": "true", "LOG_LEVEL": "WARNING", "PATH": ""})
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_prewarm_builds_graphs_in_parallel_and_tolerates_failures(fake_services, monkeypatch):
+    from app.services.registry import registry
+
+    monkeypatch.setenv("PREWARM_USECASES", "Basic Chatbot,AI News")
+    monkeypatch.setattr("app.services.prewarm.load_lazy_modules", lambda: None)
+
+    class BrokenEngine:
+        def warm_up(self):
+            raise RuntimeError("model download failed")
+
+    monkeypatch.setattr("app.services.prewarm.get_embedding_engine", lambda: BrokenEngine())
+    prewarmer = Prewarmer()
+    stats = asyncio.run(prewarmer.run())
+
+    assert prewarmer.ready
+    assert stats["steps"]["embedding_model"]["ok"] is False
+    assert stats["steps"]["graph:Basic Chatbot"]["ok"] and stats["steps"]["collection:qa_collection"]["ok"]
+    assert registry.graphs.stats()["size"] >= 2
+
+
+def test_background_prewarm_keeps_graphs_check_failing_until_done(monkeypatch):
+    from app.services.health import HealthMonitor
+    from app.services import prewarm
+
+    release = asyncio.Event()
+    notified = []
+    warmer = Prewarmer()
+    monkeypatch.setattr(prewarm, "prewarmer", warmer)
+    monkeypatch.setattr("app.services.health.prewarmer", warmer)
+
+    async def slow_run(*args, **kwargs):
+        await release.wait()
+        warmer.state = "done"
+
+    async def scenario():
+        monkeypatch.setattr(warmer, "run", slow_run)
+
+        async def on_done():
+            notified.append(HealthMonitor.check_graphs()["ok"])
+
+        warmer.start(on_done=on_done)
+        await asyncio.sleep(0)
+        assert HealthMonitor.check_graphs()["ok"] is False
+        release.set()
+        await warmer._task
+
+    asyncio.run(scenario())
+    assert notified == [True]
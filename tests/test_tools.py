@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from app.tools.parallel_tool_node import ParallelToolNode
+
+
+@tool
+def slow_search(query: str) -> str:
+    """Search the web."""
+    time.sleep(0.3)
+    return f"results for {query}"
+
+
+@tool
+def hanging_search(query: str) -> str:
+    """Search that never comes back in time."""
+    time.sleep(1.0)
+    return "too late"
+
+
+@tool
+def broken_search(query: str) -> str:
+    """Search that fails."""
+    raise ValueError("upstream 502")
+
+
+class ToolCallingFakeModel(FakeMessagesListChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def _tool_calls(*names):
+    return AIMessage(content="", tool_calls=[{"name": n, "args": {"query": f"q{i}"}, "id": f"call_{i}"} for i, n in enumerate(names)])
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_parallel_tool_node_runs_calls_concurrently_with_timeouts(mode):
+    node = ParallelToolNode([slow_search, hanging_search, broken_search], timeouts={"hanging_search": 0.5})
+    state = {"messages": [HumanMessage(content="hi"), _tool_calls("slow_search", "slow_search", "slow_search", "hanging_search", "broken_search", "missing")]}
+
+    async def timed_ainvoke():
+        t0 = time.perf_counter()
+        return await node.ainvoke(state), time.perf_counter() - t0
+
+    if mode == "sync":
+        t0 = time.perf_counter()
+        result = node.invoke(state)
+        elapsed = time.perf_counter() - t0
+    else:
+        # Timed inside the loop: asyncio.run's teardown waits for the abandoned hanging thread
+        result, elapsed = asyncio.run(timed_ainvoke())
+
+    messages = result["messages"]
+    assert [m.tool_call_id for m in messages] == [f"call_{i}" for i in range(6)]
+    assert [m.content for m in messages[:3]] == ["results for q0", "results for q1", "results for q2"]
+    assert [m.status for m in messages[3:]] == ["error"] * 3
+    assert "timed out" in messages[3].content
+    assert "upstream 502" in messages[4].content
+    assert "unknown tool" in messages[5].content
+    # Three 0.3s calls plus a 0.5s timeout in parallel, not 0.9s+ in series
+    assert elapsed < 0.8
+
+
+def test_sync_tool_calls_keep_caller_context_and_warn_once_per_unknown_tool(monkeypatch):
+    from contextvars import ContextVar
+
+    from app.tools import parallel_tool_node
+
+    request_id = ContextVar("request_id", default=None)
+
+    @tool
+    def context_search(query: str) -> str:
+        """Search that reports the caller's request id."""
+        return str(request_id.get())
+
+    warnings = []
+    monkeypatch.setattr(parallel_tool_node.logger, "warning", lambda msg, *args: warnings.append(msg % args if args else msg))
+    request_id.set("req-1")
+    result = ParallelToolNode([context_search]).invoke({"messages": [_tool_calls("context_search", "missing")]})
+    assert result["messages"][0].content == "req-1"
+    assert len(warnings) == 1
+
+
+def test_web_graph_calls_llm_then_tools_then_answers(monkeypatch):
+    from app.graph.enhanced_graph_builder import EnhancedGraphBuilder
+    from conftest import FakeRepository
+
+    monkeypatch.setattr("app.graph.enhanced_graph_builder.get_tools", lambda: [slow_search])
+    llm = ToolCallingFakeModel(responses=[_tool_calls("slow_search", "slow_search"), AIMessage(content="Here is what I found")])
+    graph = EnhancedGraphBuilder(llm, chroma_repo=FakeRepository()).setup_graph("Chatbot With Web")
+
+    result = graph.invoke({"messages": [HumanMessage(content="latest AI news?")], "usecase": "Chatbot With Web"})
+    assert [m.type for m in result["messages"]] == ["human", "ai", "tool", "tool", "ai"]
+    assert result["messages"][-1].content == "Here is what I found"
+
+
+def test_tavily_search_results_cached_by_normalized_query(monkeypatch):
+    from langchain_tavily._utilities import TavilySearchAPIWrapper
+    from app.repositories.search_cache import search_cache
+    from app.tools.search_tool import get_tools
+
+    calls = []
+
+    def fake_raw_results(self, query, **params):
+        calls.append(query)
+        return {"query": query, "results": [{"url": "https://example.com", "content": "x"}]}
+
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    monkeypatch.setattr(TavilySearchAPIWrapper, "raw_results", fake_raw_results)
+    search = get_tools()[0]
+
+    search.invoke({"query": "Latest  LLM releases"})
+    search.invoke({"query": "latest llm releases"})
+    search.invoke({"query": "latest llm releases", "topic": "news"})
+    assert len(calls) == 2
+    assert search_cache.stats()["hits"] == 1
+
+
+def test_search_cache_survives_restart_and_expires_per_topic(tmp_path, monkeypatch):
+    from app.repositories.search_cache import SearchCache
+
+    path = str(tmp_path / "tavily.sqlite3")
+    monkeypatch.setenv("SEARCH_CACHE_TTL_NEWS_SECONDS", "0.05")
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return {"results": [{"url": "https://example.com"}]}
+
+    first = SearchCache(path=path)
+    first.get_or_fetch("AI news", {"topic": "news"}, fetch)
+    first.get_or_fetch("AI chips", {"topic": "general"}, fetch)
+    first.close()
+
+    restarted = SearchCache(path=path)
+    assert restarted.get_or_fetch("ai  CHIPS", {"topic": "general"}, fetch) == {"results": [{"url": "https://example.com"}]}
+    assert restarted.stats()["disk_hits"] == 1
+    assert len(fetches) == 2
+
+    time.sleep(0.1)
+    restarted.get_or_fetch("AI news", {"topic": "news"}, fetch)
+    assert len(fetches) == 3
+    restarted.close()
+
+
+def test_news_node_and_search_tool_share_the_search_cache(monkeypatch):
+    from app.nodes.ai_news_node import AINewsNode
+    from app.repositories.search_cache import search_cache
+
+    class CountingTavily:
+        calls = 0
+
+        def search(self, **kwargs):
+            CountingTavily.calls += 1
+            return {"results": [{"url": "https://example.com/a", "content": "A"}]}
+
+    monkeypatch.setattr("app.nodes.ai_news_node.tavily.TavilyClient", lambda api_key=None: CountingTavily())
+    AINewsNode(llm=None)._search_news("weekly")
+    # A fresh node (e.g. after the in-process news cache expired) reuses the stored Tavily response
+    assert AINewsNode(llm=None)._search_news("weekly") == [{"url": "https://example.com/a", "content": "A"}]
+    assert CountingTavily.calls == 1
+    assert search_cache.stats()["disk_writes"] == 1
@@ -0,0 +1,62 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.common.tracing import Trace, exporter, root_span, should_sample, span
+from app.main import app
+
+client = TestClient(app)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SAMPLED = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+def test_should_sample_honours_traceparent_flag(monkeypatch):
+    monkeypatch.setenv("TRACE_SAMPLE_RATE", "1")
+    trace = should_sample(SAMPLED)
+    assert trace.trace_id == TRACE_ID and trace.parent_id == "00f067aa0ba902b7"
+    assert should_sample(f"00-{TRACE_ID}-00f067aa0ba902b7-00") is None
+    assert should_sample("garbage") is not None
+    monkeypatch.setenv("TRACE_SAMPLE_RATE", "0")
+    assert should_sample() is None
+
+
+def test_spans_nest_and_are_noops_outside_a_trace(monkeypatch):
+    monkeypatch.setenv("TRACE_EXPORT", "none")
+    with span("orphan") as orphan:
+        assert orphan is None
+
+    trace = Trace()
+    with root_span(trace, "root") as root:
+        with span("child", k="v") as child:
+            pass
+    assert [s.name for s in trace.spans] == ["child", "root"]
+    assert child.parent_id == root.span_id
+    assert "child;dur=" in trace.server_timing()
+
+
+def test_sampled_chat_request_reports_server_timing_and_exports_otlp(fake_services, tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACE_EXPORT", str(path))
+    payload = {"provider": "Groq", "model": "trace-model", "usecase": "Basic Chatbot", "message": "What is a span?"}
+
+    r = client.post("/chat", json=payload, headers={"traceparent": SAMPLED})
+    assert r.status_code == 200
+    timing = r.headers["server-timing"]
+    for name in ("chat.run", "node.chatbot", "llm", "total"):
+        assert f"{name};dur=" in timing
+    assert r.headers["x-trace-id"] == TRACE_ID
+
+    exporter.flush()
+    spans = json.loads(path.read_text().splitlines()[-1])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {s["name"]: s for s in spans}
+    assert by_name["POST /chat"]["parentSpanId"] == "00f067aa0ba902b7"
+    assert by_name["llm"]["parentSpanId"] == by_name["node.chatbot"]["spanId"]
+    assert {s["traceId"] for s in spans} == {TRACE_ID}
+
+
+def test_unsampled_request_has_no_server_timing(monkeypatch):
+    monkeypatch.setenv("TRACE_SAMPLE_RATE", "0")
+    r = client.get("/stats/cache")
+    assert r.status_code == 200
+    assert "server-timing" not in r.headers
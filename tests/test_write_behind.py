@@ -0,0 +1,56 @@
+import time
+
+from app.repositories.write_behind import WriteBehindQueue
+
+
+class RecordingManager:
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+
+    def store_qa_pairs(self, items):
+        time.sleep(self.delay)
+        self.batches.append(list(items))
+        return True
+
+
+def test_not_running_falls_back_to_caller():
+    q = WriteBehindQueue()
+    assert q.submit(RecordingManager(), "q", "a", "Basic Chatbot") is False
+
+
+def test_coalesces_by_batch_size_and_drains_on_stop():
+    q = WriteBehindQueue(max_batch_size=4, flush_interval=60)
+    manager = RecordingManager()
+    q.start()
+    for i in range(10):
+        assert q.submit(manager, f"q{i}", f"a{i}", "Basic Chatbot")
+    q.stop()
+    assert [len(b) for b in manager.batches] == [4, 4, 2]
+    stats = q.stats()
+    assert stats["written"] == 10 and stats["queue_depth"] == 0 and stats["batches"] == 3
+
+
+def test_time_trigger_flushes_partial_batch():
+    q = WriteBehindQueue(max_batch_size=100, flush_interval=0.05)
+    manager = RecordingManager()
+    q.start()
+    q.submit(manager, "q", "a", "Basic Chatbot")
+    deadline = time.monotonic() + 2
+    while not manager.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(manager.batches) == 1
+    q.stop()
+
+
+def test_submit_does_not_wait_for_slow_writes():
+    q = WriteBehindQueue(max_batch_size=1, flush_interval=60)
+    manager = RecordingManager(delay=0.2)
+    q.start()
+    t0 = time.perf_counter()
+    for i in range(5):
+        q.submit(manager, f"q{i}", "a", "Basic Chatbot")
+    assert time.perf_counter() - t0 < 0.1
+    assert q.flush(timeout=5)
+    assert q.stats()["written"] == 5
+    q.stop()